@@ -0,0 +1,126 @@
+import json
+import os
+import sys
+import traceback
+
+# Make sure plugin's modules are importable when run as Abaqus/CAE noGUI script
+__pluginDirectory = os.path.dirname(os.path.realpath(__file__))
+if __pluginDirectory not in sys.path:
+    sys.path.insert(0, __pluginDirectory)
+
+# Sweep specifications are loaded and expanded without Abaqus/CAE
+from ImpactTestConfig import caseNames, expandSweep, loadSweep, setConfigValue, validateWithLibrary
+
+
+# Build and write input files for all sweep cases in current Abaqus/CAE session
+def runSweep(filename):
+    from abaqus import mdb
+    from ImpactTestLibrary import importProjectile
+    from ImpactTestKernel import ImpactTestKernel, geometryFingerprint, meshedModels, releaseMeshedModel
+    from ImpactTestStore import ImpactTestStore
+    from ImpactTestSurrogate import skippedCases
+    prefix, cases, incremental = loadSweep(filename)
+    # Invalid cases are reported without being built
+    errors = validateWithLibrary([case for (name, case) in cases])
+    # Cases whose outcome is predicted confidently are reported along with their prediction without being built
+    skipped = skippedCases([(name, case) for (name, case), messages in zip(cases, errors) if not messages])
+    # Import each of sweep's projectiles only once - default model serves as a template for all cases. Each case
+    # creates only materials it uses
+    built = [case for (name, case), messages in zip(cases, errors) if not messages and name not in skipped]
+    for projectileType in sorted(set(str(case['projectile']['type']) for case in built)):
+        importProjectile(
+            'Model-1',
+            projectileType,
+            refresh=any(
+                case.get('refreshPartCache', False) for case in built
+                if str(case['projectile']['type']) == projectileType
+            )
+        )
+    # Index of the last case of each geometry fingerprint - source models of incremental builds are released after it
+    lastCases = {}
+    if incremental:
+        for i, ((name, case), messages) in enumerate(zip(cases, errors)):
+            if not messages and name not in skipped:
+                lastCases[geometryFingerprint(case)] = i
+    manifest = []
+    for i, ((name, case), messages) in enumerate(zip(cases, errors)):
+        case['modelName'] = name
+        entry = {
+            'name': name,
+            'config': case
+        }
+        if messages:
+            entry['status'] = 'invalid'
+            entry['errors'] = messages
+            manifest.append(entry)
+            continue
+        if name in skipped:
+            entry['status'] = 'predicted'
+            entry['prediction'] = skipped[name]
+            manifest.append(entry)
+            continue
+        inputFile = os.path.abspath(name + ".inp")
+        store = None
+        if case.get('store'):
+            store = ImpactTestStore.fromConfig(case)
+            entry['key'] = store.key(case)
+            entry['store'] = store.directory
+            if store.lookup(entry['key'], ".inp") is not None:
+                # The same model was already built, by this or any earlier sweep
+                store.link(entry['key'], ".inp", inputFile)
+                entry['status'] = 'done'
+                entry['input'] = inputFile
+                entry['stored'] = True
+                estimate = store.entry(entry['key']).get('estimate')
+                if estimate is not None:
+                    entry['estimate'] = estimate
+                manifest.append(entry)
+                continue
+        # Input file may be a link to stored input file of earlier sweep, which must not be overwritten
+        if os.path.islink(inputFile):
+            os.remove(inputFile)
+        try:
+            kernel = ImpactTestKernel(case, name, template='Model-1', incremental=incremental)
+            kernel.run()
+            entry['status'] = 'done'
+            entry['input'] = inputFile
+            if kernel.estimate is not None:
+                entry['estimate'] = dict(
+                    (key, kernel.estimate[key]) for key in
+                    ('increments', 'stableIncrement', 'projectedWallTime', 'overBudget', 'meshElementSize')
+                )
+            if store is not None:
+                store.store(entry['key'], inputFile, config=case, estimate=entry.get('estimate'))
+        except Exception:
+            # Single failing case must not abort the whole sweep
+            entry['status'] = 'failed'
+            entry['error'] = traceback.format_exc()
+        finally:
+            # Input file is already written - free the memory occupied by the model unless later cases are derived
+            # from it, along with source models no later case is derived from
+            if name in mdb.models.keys() and name not in meshedModels.values():
+                del mdb.models[name]
+            for fingerprint in [key for key in meshedModels.keys() if lastCases.get(key, -1) <= i]:
+                releaseMeshedModel(fingerprint)
+        manifest.append(entry)
+    writeManifest(manifest, prefix + "-manifest.json")
+    return manifest
+
+
+# Write sweep manifest describing each case's configuration, status and input file
+def writeManifest(manifest, filename):
+    with open(filename, 'w') as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+
+
+# Obtain script arguments - Abaqus/CAE passes them after '--' separator
+def __scriptArguments(argv):
+    if '--' in argv:
+        return argv[argv.index('--') + 1:]
+    return argv[1:]
+
+
+# Run as 'abaqus cae noGUI=ImpactTestBatch.py -- sweep.json'
+if __name__ == "__main__":
+    for sweep in __scriptArguments(sys.argv):
+        runSweep(sweep)
@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+
+from ImpactTestLibrary import PARTS_DIRECTORY, PLUGIN_DIRECTORY
+
+# Default location of projectile mesh cache and its size limit in [MB]
+CACHE_DIRECTORY = os.path.join(PLUGIN_DIRECTORY, "MeshCache")
+MAX_SIZE = 1024
+# Version of cached entries' format - entries of other versions are never matched
+CACHE_VERSION = 1
+# Description of cached entry, written last so incomplete entries are never matched
+ENTRY_FILE = "entry.json"
+
+# Hashes of files by their path, modification time and size - source files are hashed once per session
+__fileHashes = {}
+
+
+# SHA-1 hash of file's contents
+def fileHash(path):
+    status = os.stat(path)
+    stamp = (path, status.st_mtime, status.st_size)
+    if stamp not in __fileHashes:
+        digest = hashlib.sha1()
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b''):
+                digest.update(chunk)
+        __fileHashes[stamp] = digest.hexdigest()
+    return __fileHashes[stamp]
+
+
+# Meshed projectile parts stored as orphan mesh parts in input file format, keyed by projectile's geometry and
+# meshing parameters. Least recently used entries are evicted once total size of the cache exceeds its limit
+class ImpactTestCache():
+    def __init__(self, directory=CACHE_DIRECTORY, maxSize=MAX_SIZE):
+        # Directory holding cache's entries - one subdirectory per key
+        self.directory = os.path.abspath(directory)
+        # Size limit in [B]
+        self.maxSize = int(maxSize * 1024 * 1024)
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+
+    # Key identifying projectile's mesh - hashes of its geometry and components' configuration along with seeding, and
+    # whether projectile is halved for half model
+    def key(self, projectileType, meshElementSize, deviationFactor, minSizeFactor, partsDirectory=PARTS_DIRECTORY,
+            half=False):
+        directory = os.path.join(partsDirectory, str(projectileType))
+        description = [
+            CACHE_VERSION,
+            fileHash(os.path.join(directory, "Projectile.sat")),
+            fileHash(os.path.join(directory, "elements.cfg")),
+            repr(float(meshElementSize)),
+            repr(float(deviationFactor)),
+            repr(float(minSizeFactor))
+        ]
+        # Halved projectiles' meshes are told apart by trailing marker, whole ones' descriptions have none
+        if half:
+            description.append('half')
+        description = json.dumps(description)
+        return hashlib.sha1(description.encode('utf-8')).hexdigest()
+
+    # Input files of cached parts of given names, None if cache has no complete entry for the key
+    def lookup(self, key, names):
+        entry = os.path.join(self.directory, key)
+        if not os.path.exists(os.path.join(entry, ENTRY_FILE)):
+            return None
+        paths = [os.path.join(entry, name + ".inp") for name in names]
+        if not all(os.path.exists(path) for path in paths):
+            return None
+        # Mark entry as recently used
+        os.utime(entry, None)
+        return paths
+
+    # Store meshed parts under the key, then evict least recently used entries exceeding size limit
+    def store(self, key, parts):
+        entry = os.path.join(self.directory, key)
+        temporary = entry + ".tmp"
+        if os.path.exists(temporary):
+            shutil.rmtree(temporary)
+        os.makedirs(temporary)
+        for part in parts:
+            with open(os.path.join(temporary, part.name + ".inp"), 'w') as file:
+                for line in orphanPartLines(part):
+                    file.write(line)
+                    file.write("\n")
+        with open(os.path.join(temporary, ENTRY_FILE), 'w') as file:
+            json.dump(
+                {
+                    'parts': [part.name for part in parts],
+                    'created': time.time()
+                },
+                file
+            )
+        if os.path.exists(entry):
+            shutil.rmtree(entry)
+        os.rename(temporary, entry)
+        self.evict()
+
+    # Remove least recently used entries until the cache fits into its size limit
+    def evict(self):
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if not os.path.isdir(path) or name.endswith(".tmp"):
+                continue
+            size = sum(
+                os.path.getsize(os.path.join(path, filename)) for filename in os.listdir(path)
+            )
+            entries.append((os.path.getmtime(path), size, path))
+            total += size
+        for used, size, path in sorted(entries):
+            if total <= self.maxSize:
+                break
+            shutil.rmtree(path)
+            total -= size
+
+
+# Input file lines defining part's mesh as orphan mesh part
+def orphanPartLines(part):
+    labels = [node.label for node in part.nodes]
+    yield "*Part, name=" + part.name
+    yield "*Node"
+    for node in part.nodes:
+        yield "%d, %.12g, %.12g, %.12g" % ((node.label,) + tuple(node.coordinates))
+    elementType = None
+    for element in part.elements:
+        if str(element.type) != elementType:
+            elementType = str(element.type)
+            yield "*Element, type=" + elementType
+        yield "%d, " % element.label + ", ".join([str(labels[i]) for i in element.connectivity])
+    yield "*End Part"
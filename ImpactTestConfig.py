@@ -0,0 +1,255 @@
+import argparse
+import json
+import os
+import sys
+
+import numpy
+
+# Limits of configuration's numeric values in model's units - [m], [s], [kg] - shared with plugin's GUI, which shows
+# lengths in [mm]. Layers' values are given once for all layers
+LIMITS = {
+    'projectile.velocity': (100.0, 2000.0, 'm/s'),
+    'armor.radius': (0.05, 0.12, 'm'),
+    'armor.innerRadius': (0.01, 0.045, 'm'),
+    'armor.obliquity': (0.0, 60.0, 'deg'),
+    'armor.layers.thickness': (0.0005, 0.15, 'm'),
+    'armor.layers.spacing': (0.0, 0.1, 'm'),
+    'meshElementSize': (0.00005, 0.002, 'm'),
+    'failureCoefficient': (0.01, 100.0, '-')
+}
+# Dotted paths of layers' values in LIMITS
+LAYER_PREFIX = 'armor.layers.'
+
+
+# Load sweep specification - JSON file naming base configuration file and parameter axes, f.e.:
+# {
+#   "base": "base.cfg",
+#   "modelName": "Sweep",
+#   "incremental": true,
+#   "axes": {
+#     "projectile.velocity": [600.0, 800.0],
+#     "armor.obliquity": [0.0, 30.0]
+#   }
+# }
+# Instead of axes the specification may give space-filling "design" of parameters' ranges, see ImpactTestDesign, and
+# instead of base and axes it may list complete, named configurations under "cases" key. Returns model name prefix,
+# list of (model name, configuration) pairs and incremental build flag
+def loadSweep(filename):
+    with open(filename) as file:
+        spec = json.load(file)
+    incremental = spec.get('incremental', True)
+    if 'cases' in spec:
+        cases = [(str(config['modelName']), config) for config in spec['cases']]
+        prefix = spec.get('modelName') or os.path.splitext(os.path.basename(filename))[0]
+        return str(prefix), cases, incremental
+    # Base configuration path is relative to the sweep file
+    base = os.path.join(
+        os.path.dirname(os.path.abspath(filename)),
+        str(spec['base'])
+    )
+    with open(base) as file:
+        config = json.load(file)
+    # Prefix of generated model names - sweep's own, base configuration's or sweep file's name
+    prefix = spec.get('modelName') or config.get('modelName')
+    if not prefix:
+        prefix = os.path.splitext(os.path.basename(filename))[0]
+    if 'design' in spec:
+        from ImpactTestDesign import designConfigs
+        configs = designConfigs(config, spec['design'])[0]
+    else:
+        configs = expandSweep(config, spec.get('axes', {}))
+    cases = list(zip(caseNames(str(prefix), len(configs)), configs))
+    return str(prefix), cases, incremental
+
+
+# Get value from nested configuration object under dotted path, f.e. 'armor.layers.0.thickness'
+def getConfigValue(config, path):
+    node = config
+    for key in path.split('.'):
+        node = node[int(key)] if isinstance(node, list) else node[key]
+    return node
+
+
+# Set value in nested configuration object under dotted path, f.e. 'armor.layers.0.thickness'
+def setConfigValue(config, path, value):
+    keys = path.split('.')
+    node = config
+    for key in keys[:-1]:
+        node = node[int(key)] if isinstance(node, list) else node[key]
+    key = keys[-1]
+    if isinstance(node, list):
+        node[int(key)] = value
+    else:
+        node[key] = value
+
+
+# Flatten nested configuration object into mapping of dotted paths to its values, f.e. 'armor.layers.0.thickness'
+def flattenConfig(config, prefix=''):
+    items = enumerate(config) if isinstance(config, list) else config.items()
+    flat = {}
+    for key, value in items:
+        path = prefix + str(key)
+        if isinstance(value, (dict, list)):
+            flat.update(flattenConfig(value, path + '.'))
+        else:
+            flat[path] = value
+    return flat
+
+
+# Points of parameter grid as array - one row per case, one column per axis, ordered like itertools.product, so the
+# last axis varies fastest. Returns axes' paths along with the array of their values
+def sweepGrid(axes):
+    # Axes may be given as mapping (ordered by path) or as list of [path, values] pairs
+    if isinstance(axes, dict):
+        axes = sorted(axes.items())
+    paths = [str(path) for (path, values) in axes]
+    if not axes:
+        return paths, numpy.empty((1, 0), dtype=object)
+    indices = numpy.indices([len(values) for (path, values) in axes]).reshape(len(axes), -1).T
+    points = numpy.empty(indices.shape, dtype=object)
+    for column, (path, values) in enumerate(axes):
+        # Values may be lists themselves, so the object array is filled item by item
+        array = numpy.empty(len(values), dtype=object)
+        for i, value in enumerate(values):
+            array[i] = value
+        points[:, column] = array[indices[:, column]]
+    return paths, points
+
+
+# Expand base configuration into list of configurations - one for each point of parameter grid
+def expandSweep(config, axes):
+    paths, points = sweepGrid(axes)
+    # Parsing serialized configuration is cheaper than deep copying it for each case
+    serialized = json.dumps(config)
+    configs = []
+    for point in points:
+        case = json.loads(serialized)
+        for path, value in zip(paths, point):
+            setConfigValue(case, path, value)
+        configs.append(case)
+    return configs
+
+
+# Generate model names for sweep cases
+def caseNames(prefix, count):
+    width = max(3, len(str(count)))
+    return [prefix + "-" + str(i + 1).zfill(width) for i in range(count)]
+
+
+# Values under dotted path of all configurations as float array - NaN where value is missing or isn't a number
+def configColumn(configs, path):
+    column = numpy.empty(len(configs))
+    for i, config in enumerate(configs):
+        try:
+            column[i] = float(getConfigValue(config, path))
+        except (KeyError, IndexError, TypeError, ValueError):
+            column[i] = numpy.nan
+    return column
+
+
+# Validate configurations all at once - numeric values are checked against LIMITS column by column, materials and
+# projectiles against given names of available ones, unless they are None. Returns list of error messages for each
+# configuration, empty for valid ones
+def validateConfigs(configs, materials=None, projectiles=None):
+    errors = [[] for config in configs]
+    # Layers of all configurations are flattened, along with indices of configurations owning them
+    layers = []
+    owners = []
+    for i, config in enumerate(configs):
+        try:
+            configLayers = config['armor']['layers']
+        except (KeyError, TypeError):
+            configLayers = None
+        if not isinstance(configLayers, list) or not configLayers:
+            errors[i].append("armor.layers must be a non-empty list")
+            continue
+        layers.extend(configLayers)
+        owners.extend([i] * len(configLayers))
+    owners = numpy.array(owners, dtype=int)
+    columns = {}
+    for path in sorted(LIMITS):
+        minimum, maximum, unit = LIMITS[path]
+        if path.startswith(LAYER_PREFIX):
+            values = configColumn(layers, path[len(LAYER_PREFIX):])
+            rows = owners
+            label = "layer's " + path[len(LAYER_PREFIX):]
+        else:
+            values = configColumn(configs, path)
+            rows = numpy.arange(len(configs))
+            label = path
+        columns[path] = values
+        missing = numpy.isnan(values)
+        with numpy.errstate(invalid='ignore'):
+            outside = (values < minimum) | (values > maximum)
+        for j in numpy.nonzero(missing)[0]:
+            errors[rows[j]].append("%s is missing or isn't a number" % label)
+        for j in numpy.nonzero(outside)[0]:
+            errors[rows[j]].append(
+                "%s %g [%s] is out of range %g - %g [%s]" % (label, values[j], unit, minimum, maximum, unit)
+            )
+    with numpy.errstate(invalid='ignore'):
+        overlapping = columns['armor.innerRadius'] >= columns['armor.radius']
+    for i in numpy.nonzero(overlapping)[0]:
+        errors[i].append("armor.innerRadius must be smaller than armor.radius")
+    for i, config in enumerate(configs):
+        if config.get('axisymmetric') and columns['armor.obliquity'][i] != 0.0:
+            errors[i].append("axisymmetric model requires zero armor.obliquity")
+        projectileType = config.get('projectile', {}).get('type')
+        if projectileType is None:
+            errors[i].append("projectile.type is missing")
+        elif projectiles is not None and str(projectileType) not in projectiles:
+            errors[i].append("projectile %s isn't in the part catalog" % projectileType)
+    if materials is not None:
+        materials = set(materials)
+        for i, layer in zip(owners, layers):
+            material = layer.get('material') if isinstance(layer, dict) else None
+            if material is None or str(material) not in materials:
+                errors[i].append("layer's material %s isn't in the material index" % material)
+        if isinstance(projectiles, dict):
+            # Catalog maps projectiles to their components' entries of elements.cfg
+            for i, config in enumerate(configs):
+                components = projectiles.get(str(config.get('projectile', {}).get('type')), [])
+                for component in components:
+                    if str(component['material']) not in materials:
+                        errors[i].append("projectile's material %s isn't in the material index" % component['material'])
+    return errors
+
+
+# Validate configurations against plugin's material index and part catalog
+def validateWithLibrary(configs):
+    import ImpactTestLibrary
+    return validateConfigs(configs, ImpactTestLibrary.materialNames(), ImpactTestLibrary.partCatalog())
+
+
+# Named configurations of configuration or sweep specification file
+def loadCases(filename):
+    with open(filename) as file:
+        spec = json.load(file)
+    if 'base' in spec or 'cases' in spec:
+        return loadSweep(filename)[1]
+    name = spec.get('modelName') or os.path.splitext(os.path.basename(filename))[0]
+    return [(str(name), spec)]
+
+
+# Run as 'python ImpactTestConfig.py base.cfg sweep.json ...' to validate configurations without Abaqus/CAE
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate configuration and sweep specification files")
+    parser.add_argument('files', nargs='+', help="configuration or sweep specification files")
+    parser.add_argument('-n', '--no-library', action='store_true', help="skip material index and part catalog checks")
+    args = parser.parse_args()
+    cases = []
+    for filename in args.files:
+        cases += loadCases(filename)
+    configs = [config for (name, config) in cases]
+    if args.no_library:
+        errors = validateConfigs(configs)
+    else:
+        errors = validateWithLibrary(configs)
+    invalid = 0
+    for (name, config), messages in zip(cases, errors):
+        if messages:
+            invalid += 1
+            for message in messages:
+                print("%s: %s" % (name, message))
+    print("%d of %d configurations valid" % (len(cases) - invalid, len(cases)))
+    sys.exit(1 if invalid else 0)
@@ -0,0 +1,243 @@
+import argparse
+import json
+import os
+import sys
+
+import numpy
+
+from ImpactTestConfig import caseNames, getConfigValue, setConfigValue, validateConfigs
+
+# Number of bits of Sobol sequence's points
+SOBOL_BITS = 30
+# Degrees, coefficients and initial direction numbers of Sobol sequence's dimensions after the first one - primitive
+# polynomials and direction numbers of Joe and Kuo
+SOBOL_DIRECTIONS = (
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+    (4, 4, (1, 3, 5, 13)),
+    (5, 2, (1, 1, 5, 5, 17)),
+    (5, 4, (1, 1, 5, 5, 5)),
+    (5, 7, (1, 1, 7, 11, 19)),
+    (5, 11, (1, 1, 5, 1, 1)),
+    (5, 13, (1, 1, 1, 3, 11)),
+    (5, 14, (1, 3, 5, 5, 31)),
+    (6, 1, (1, 3, 3, 9, 7, 49)),
+    (6, 13, (1, 1, 1, 15, 21, 21)),
+    (6, 16, (1, 3, 1, 13, 27, 49))
+)
+# Rounds of drawing more points when some of them violate configuration's constraints, each drawing twice as many
+MAX_DRAWS = 8
+
+
+# Latin hypercube design of given number of points in unit hypercube - each dimension's range is split into as many
+# strata as there are points, and each stratum holds exactly one point
+def latinHypercube(count, dimensions, seed=0):
+    random = numpy.random.RandomState(seed)
+    points = numpy.empty((count, dimensions))
+    for i in range(dimensions):
+        points[:, i] = (random.permutation(count) + random.uniform(size=count)) / count
+    return points
+
+
+# Direction numbers of Sobol sequence's dimensions as integers of SOBOL_BITS bits
+def sobolDirections(dimensions):
+    if dimensions > len(SOBOL_DIRECTIONS) + 1:
+        raise ValueError("Sobol design supports at most %d dimensions" % (len(SOBOL_DIRECTIONS) + 1))
+    directions = numpy.zeros((dimensions, SOBOL_BITS), dtype=numpy.int64)
+    # First dimension is van der Corput sequence in base 2
+    directions[0] = [1 << (SOBOL_BITS - i - 1) for i in range(SOBOL_BITS)]
+    for d in range(1, dimensions):
+        degree, coefficients, initial = SOBOL_DIRECTIONS[d - 1]
+        numbers = list(initial)
+        for i in range(degree, SOBOL_BITS):
+            number = numbers[i - degree] ^ (numbers[i - degree] << degree)
+            for k in range(1, degree):
+                if (coefficients >> (degree - 1 - k)) & 1:
+                    number ^= numbers[i - k] << k
+            numbers.append(number)
+        directions[d] = [numbers[i] << (SOBOL_BITS - i - 1) for i in range(SOBOL_BITS)]
+    return directions
+
+
+# Points of Sobol sequence in unit hypercube, starting with given index - point at the origin is skipped
+def sobolSequence(count, dimensions, start=0):
+    directions = sobolDirections(dimensions)
+    points = numpy.empty((count, dimensions))
+    state = numpy.zeros(dimensions, dtype=numpy.int64)
+    # Gray code ordering - each point differs from the previous one by direction of its index's lowest zero bit
+    for index in range(start + count + 1):
+        if index > start:
+            points[index - start - 1] = state / float(1 << SOBOL_BITS)
+        bit = 0
+        while (index >> bit) & 1:
+            bit += 1
+        state ^= directions[:, bit]
+    return points
+
+
+# Prime numbers used as bases of Halton sequence's dimensions
+def primes(count):
+    result = []
+    candidate = 2
+    while len(result) < count:
+        if all(candidate % prime for prime in result):
+            result.append(candidate)
+        candidate += 1
+    return result
+
+
+# Points of Halton sequence in unit hypercube, starting with given index - point at the origin is skipped
+def haltonSequence(count, dimensions, start=0):
+    indices = numpy.arange(start + 1, start + count + 1)
+    points = numpy.empty((count, dimensions))
+    for d, base in enumerate(primes(dimensions)):
+        # Radical inverse - index's digits in given base mirrored around the decimal point
+        remaining = indices.copy()
+        values = numpy.zeros(count)
+        factor = 1.0 / base
+        while numpy.any(remaining):
+            values += factor * (remaining % base)
+            remaining //= base
+            factor /= base
+        points[:, d] = values
+    return points
+
+
+# Design methods by name - functions of number of points, dimensions, number of points drawn already and seed.
+# Sequences continue where previous points ended, Latin hypercubes are whole designs of given number of points
+METHODS = {
+    'lhs': lambda count, dimensions, start, seed: latinHypercube(count, dimensions, seed),
+    'sobol': lambda count, dimensions, start, seed: sobolSequence(count, dimensions, start),
+    'halton': lambda count, dimensions, start, seed: haltonSequence(count, dimensions, start)
+}
+# Design methods whose points are drawn again as a whole at larger size when some of them are rejected, so selected
+# points always come from single design - Latin hypercubes merged with each other aren't stratified anymore
+REDRAWN_METHODS = ('lhs',)
+
+
+# Expand wildcards of dotted path over configuration's lists and dictionaries, f.e. 'armor.layers.*.thickness' gives
+# path of each layer's thickness
+def expandPath(config, path):
+    keys = path.split('.')
+    if '*' not in keys:
+        return [path]
+    i = keys.index('*')
+    prefix = '.'.join(keys[:i])
+    node = getConfigValue(config, prefix) if prefix else config
+    items = range(len(node)) if isinstance(node, list) else sorted(node.keys())
+    paths = []
+    for item in items:
+        paths += expandPath(config, '.'.join(keys[:i] + [str(item)] + keys[i + 1:]))
+    return paths
+
+
+# Parameters of design - dotted paths along with their ranges, either [minimum, maximum] or {"values": [...]} of
+# choices, ordered by path
+def designParameters(config, ranges):
+    parameters = []
+    for path in sorted(ranges):
+        for expanded in expandPath(config, str(path)):
+            parameters.append((expanded, ranges[path]))
+    return parameters
+
+
+# Map points of unit hypercube to parameters' values - ranges are scaled linearly, choices are picked by equal shares
+def parameterValues(parameters, points):
+    values = []
+    for point in points:
+        row = []
+        for (path, spec), u in zip(parameters, point):
+            if isinstance(spec, dict):
+                choices = spec['values']
+                row.append(choices[min(int(u * len(choices)), len(choices) - 1)])
+            else:
+                row.append(float(spec[0]) + u * (float(spec[1]) - float(spec[0])))
+        values.append(row)
+    return values
+
+
+# Configurations of space-filling design over base configuration - design settings give method, number of samples,
+# seed and parameters' ranges. Points whose configurations violate constraints, f.e. innerRadius < radius, are
+# replaced by further points of the sequence, or Latin hypercube is drawn again twice as large and valid points are
+# selected from it. Returns configurations along with their points in unit hypercube
+def designConfigs(config, design):
+    method = str(design.get('method', 'lhs'))
+    if method not in METHODS:
+        raise ValueError("Unknown design method: %s" % method)
+    count = int(design['samples'])
+    seed = int(design.get('seed', 0))
+    parameters = designParameters(config, design['ranges'])
+    serialized = json.dumps(config)
+    configs = []
+    points = []
+    drawn = 0
+    size = count
+    for i in range(MAX_DRAWS):
+        if method in REDRAWN_METHODS:
+            configs = []
+            points = []
+            drawn = 0
+        candidates = METHODS[method](size, len(parameters), drawn, seed)
+        drawn += size
+        cases = []
+        for row in parameterValues(parameters, candidates):
+            case = json.loads(serialized)
+            for (path, spec), value in zip(parameters, row):
+                setConfigValue(case, path, value)
+            cases.append(case)
+        for case, point, errors in zip(cases, candidates, validateConfigs(cases)):
+            if not errors and len(configs) < count:
+                configs.append(case)
+                points.append([float(u) for u in point])
+        if len(configs) == count:
+            break
+        size *= 2
+    else:
+        raise ValueError("Only %d of %d design points satisfy configuration's constraints" % (len(configs), count))
+    return configs, points, [path for (path, spec) in parameters]
+
+
+# Write design's configurations as <name>.cfg files and design manifest <prefix>-design.json, which lists them as
+# sweep's cases along with their design points, so it may be built as sweep directly
+def writeDesign(config, design, prefix, directory):
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+    configs, points, paths = designConfigs(config, design)
+    for name, case in zip(caseNames(prefix, len(configs)), configs):
+        case['modelName'] = name
+        with open(os.path.join(directory, name + ".cfg"), 'w') as file:
+            json.dump(case, file)
+    filename = os.path.join(directory, prefix + "-design.json")
+    with open(filename, 'w') as file:
+        json.dump(
+            {
+                'modelName': prefix,
+                'design': design,
+                'parameters': paths,
+                'points': points,
+                'cases': configs
+            },
+            file,
+            indent=2,
+            sort_keys=True
+        )
+    return filename
+
+
+# Run as 'python ImpactTestDesign.py sweep.json --output design' - sweep specification gives base configuration and
+# "design" settings
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Plan space-filling sweep design")
+    parser.add_argument('sweep', help="sweep specification with base configuration and design settings")
+    parser.add_argument('-o', '--output', default=None, help="directory of configurations and design manifest")
+    args = parser.parse_args()
+    with open(args.sweep) as file:
+        spec = json.load(file)
+    with open(os.path.join(os.path.dirname(os.path.abspath(args.sweep)), str(spec['base']))) as file:
+        base = json.load(file)
+    prefix = spec.get('modelName') or base.get('modelName') or os.path.splitext(os.path.basename(args.sweep))[0]
+    print(writeDesign(base, spec['design'], str(prefix), args.output or os.getcwd()))
+    sys.exit(0)
@@ -0,0 +1,232 @@
+import glob
+import json
+import math
+import os
+import re
+
+import numpy
+
+# Node index pairs of hexahedron's edges
+HEXAHEDRON_EDGES = (
+    (0, 1), (1, 2), (2, 3), (3, 0),
+    (4, 5), (5, 6), (6, 7), (7, 4),
+    (0, 4), (1, 5), (2, 6), (3, 7)
+)
+# Node indices of tetrahedron's faces
+TETRAHEDRON_FACES = (
+    (0, 1, 2),
+    (0, 1, 3),
+    (1, 2, 3),
+    (0, 2, 3)
+)
+# Clock time columns of status file, f.e. 01:23:45
+CLOCK = re.compile(r'^(\d+):(\d{2}):(\d{2})$')
+
+# Calibrations by directory, along with status files' modification times they were computed from
+__calibrations = {}
+
+
+# Lengths of rows of array of vectors
+def vectorLengths(vectors):
+    return numpy.sqrt(numpy.sum(vectors * vectors, axis=1))
+
+
+# Characteristic lengths of hexahedral elements - their shortest edges
+def hexahedronLengths(coordinates, connectivity):
+    lengths = [
+        vectorLengths(coordinates[connectivity[:, a]] - coordinates[connectivity[:, b]])
+        for a, b in HEXAHEDRON_EDGES
+    ]
+    return numpy.min(lengths, axis=0)
+
+
+# Characteristic lengths of tetrahedral elements - their shortest altitudes
+def tetrahedronLengths(coordinates, connectivity):
+    points = [coordinates[connectivity[:, i]] for i in range(4)]
+    volumes = numpy.abs(
+        numpy.einsum('ij,ij->i', points[1] - points[0], numpy.cross(points[2] - points[0], points[3] - points[0]))
+    ) / 6.0
+    areas = [
+        0.5 * vectorLengths(numpy.cross(points[b] - points[a], points[c] - points[a]))
+        for a, b, c in TETRAHEDRON_FACES
+    ]
+    return 3.0 * volumes / numpy.max(areas, axis=0)
+
+
+# Smallest characteristic length of mesh given by node coordinates and elements' node indices. Four node elements of
+# planar, f.e. axisymmetric, meshes are quadrilaterals rather than tetrahedra
+def characteristicLength(coordinates, connectivity, planar=False):
+    coordinates = numpy.asarray(coordinates, dtype=float)
+    connectivity = numpy.asarray(connectivity, dtype=int)
+    if connectivity.shape[1] == 8:
+        return float(numpy.min(hexahedronLengths(coordinates, connectivity)))
+    if connectivity.shape[1] == 4 and not planar:
+        return float(numpy.min(tetrahedronLengths(coordinates, connectivity)))
+    # Other elements - shortest distance between consecutive nodes
+    count = connectivity.shape[1]
+    return float(min(
+        numpy.min(vectorLengths(coordinates[connectivity[:, i]] - coordinates[connectivity[:, (i + 1) % count]]))
+        for i in range(count)
+    ))
+
+
+# Node coordinates and elements' node indices of Abaqus/CAE part's mesh, grouped by elements' number of nodes
+def partMesh(part):
+    coordinates = numpy.array([node.coordinates for node in part.nodes], dtype=float)
+    groups = {}
+    for element in part.elements:
+        groups.setdefault(len(element.connectivity), []).append(element.connectivity)
+    return coordinates, [numpy.array(groups[count], dtype=int) for count in sorted(groups)]
+
+
+# Dilatational wave speed in [m/s] of isotropic elastic material
+def waveSpeed(density, youngsModulus, poissonsRatio):
+    return math.sqrt(
+        youngsModulus * (1.0 - poissonsRatio) / (density * (1.0 + poissonsRatio) * (1.0 - 2.0 * poissonsRatio))
+    )
+
+
+# Dilatational wave speed in [m/s] of Abaqus/CAE material - its first density, elastic and equation of state table
+# rows are used. Isotropic elasticity gives the speed directly, otherwise bulk modulus of Us-Up equation of state is
+# combined with shear modulus of shear elasticity, if there's any. None if material doesn't define enough of them
+def materialWaveSpeed(material):
+    density = getattr(material, 'density', None)
+    if density is None or not density.table:
+        return None
+    density = float(density.table[0][0])
+    elastic = getattr(material, 'elastic', None)
+    # Elasticity is isotropic unless stated otherwise
+    elasticType = str(getattr(elastic, 'type', 'ISOTROPIC')) if elastic is not None else None
+    if elasticType == 'ISOTROPIC' and elastic.table:
+        youngsModulus, poissonsRatio = elastic.table[0][:2]
+        return waveSpeed(density, youngsModulus, poissonsRatio)
+    eos = getattr(material, 'eos', None)
+    if eos is None or str(getattr(eos, 'type', '')) != 'USUP' or not eos.table:
+        return None
+    # Reference sound speed c0 of Us-Up equation of state is the bulk wave speed
+    bulkModulus = density * float(eos.table[0][0]) ** 2
+    shearModulus = float(elastic.table[0][0]) if elasticType == 'SHEAR' and elastic.table else 0.0
+    return math.sqrt((bulkModulus + 4.0 / 3.0 * shearModulus) / density)
+
+
+# Number of increments and elapsed time in [s] of finished or running Abaqus/Explicit job, read from its status file.
+# Wallclock time is preferred to CPU time if status file reports both
+def readStatus(filename):
+    last = None
+    with open(filename) as file:
+        for line in file:
+            fields = line.split()
+            if len(fields) < 4 or not fields[0].isdigit():
+                continue
+            clocks = [CLOCK.match(field) for field in fields]
+            clocks = [clock for clock in clocks if clock is not None]
+            if clocks:
+                hours, minutes, seconds = [int(group) for group in clocks[-1].groups()]
+                last = (int(fields[0]), hours * 3600 + minutes * 60 + seconds)
+    return last
+
+
+# Solver time in [s] per element and increment, the median of previous runs found in directory - their status files
+# along with input files. None if there are no finished runs
+def calibrate(directory):
+    from ImpactTestInput import InputIndex
+    directory = os.path.abspath(directory)
+    runs = []
+    for status in sorted(glob.glob(os.path.join(directory, "*.sta"))):
+        inputFile = os.path.splitext(status)[0] + ".inp"
+        if os.path.exists(inputFile):
+            runs.append((status, inputFile, os.path.getmtime(status)))
+    stamp = [(status, modified) for (status, inputFile, modified) in runs]
+    cached = __calibrations.get(directory)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    samples = []
+    for status, inputFile, modified in runs:
+        progress = readStatus(status)
+        if progress is None or progress[0] == 0 or progress[1] == 0:
+            continue
+        with InputIndex(inputFile) as index:
+            elements = sum(count for (name, nodes, count) in index.counts())
+        if elements:
+            samples.append(float(progress[1]) / (progress[0] * elements))
+    calibration = float(numpy.median(samples)) if samples else None
+    __calibrations[directory] = (stamp, calibration)
+    return calibration
+
+
+# Pre-flight estimate of explicit job's cost - stable time increment from elements' characteristic lengths and
+# materials' wave speeds, number of increments and solver time projected from previous runs
+class ImpactTestEstimator():
+    # Initialize estimator with configuration's 'estimate' entry - true or dictionary of budget and action
+    def __init__(self, settings):
+        if not isinstance(settings, dict):
+            settings = {}
+        # Budget of projected solver time in [h] and of number of increments, unlimited if not given
+        self.maxWallTime = settings.get('maxWallTime')
+        self.maxIncrements = settings.get('maxIncrements')
+        # Action taken when budget is exceeded - 'flag' reports it, 'coarsen' coarsens the mesh
+        self.action = settings.get('action', 'flag')
+        # Number of coarsening attempts
+        self.maxIterations = int(settings.get('maxIterations', 3))
+        # Directory of previous runs' status and input files
+        self.calibration = settings.get('calibration', os.getcwd())
+
+    # Estimate job's cost - parts are dictionaries of part's name, element count, smallest characteristic length in
+    # [m] and wave speed in [m/s]
+    def estimate(self, parts, timePeriod):
+        warnings = []
+        for part in parts:
+            if part['waveSpeed'] is None:
+                # Part still counts towards elements, but not towards stable increment
+                part['stableIncrement'] = None
+                warnings.append("%s: material's wave speed unknown, part left out of stable increment" % part['name'])
+            else:
+                part['stableIncrement'] = part['length'] / part['waveSpeed']
+        stableIncrements = [part['stableIncrement'] for part in parts if part['stableIncrement'] is not None]
+        stableIncrement = min(stableIncrements) if stableIncrements else None
+        increments = int(math.ceil(timePeriod / stableIncrement)) if stableIncrement else None
+        elements = sum(part['elements'] for part in parts)
+        calibration = calibrate(self.calibration) if os.path.isdir(self.calibration) else None
+        wallTime = None
+        if calibration is not None and increments is not None:
+            wallTime = calibration * increments * elements
+        report = {
+            'parts': parts,
+            'timePeriod': timePeriod,
+            'stableIncrement': stableIncrement,
+            'increments': increments,
+            'elements': elements,
+            'calibration': calibration,
+            'projectedWallTime': wallTime,
+            'maxWallTime': self.maxWallTime,
+            'maxIncrements': self.maxIncrements,
+            'warnings': warnings
+        }
+        report['overBudget'] = self.excess(report) > 1.0
+        return report
+
+    # Ratio of estimated cost to budget - the larger of solver time's and increments' ratios
+    def excess(self, report):
+        ratios = [0.0]
+        if self.maxWallTime and report['projectedWallTime'] is not None:
+            ratios.append(report['projectedWallTime'] / (self.maxWallTime * 3600.0))
+        if self.maxIncrements and report['increments'] is not None:
+            ratios.append(float(report['increments']) / self.maxIncrements)
+        return max(ratios)
+
+    # Factor to multiply mesh element size by to fit into budget - solver time scales with the fourth power of
+    # inverse element size, number of increments with its first power
+    def coarseningFactor(self, report):
+        factors = [1.1]
+        if self.maxWallTime and report['projectedWallTime'] is not None:
+            factors.append((report['projectedWallTime'] / (self.maxWallTime * 3600.0)) ** 0.25)
+        if self.maxIncrements and report['increments'] is not None:
+            factors.append(float(report['increments']) / self.maxIncrements)
+        return min(2.0, max(factors))
+
+    # Write estimate report to <model>-estimate.json in working directory
+    def write(self, modelName, report):
+        filename = os.path.abspath(modelName + "-estimate.json")
+        with open(filename, 'w') as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+        return filename
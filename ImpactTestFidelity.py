@@ -0,0 +1,284 @@
+import argparse
+import json
+import math
+import os
+import sys
+
+import numpy
+
+from ImpactTestConfig import LIMITS, flattenConfig, loadSweep
+from ImpactTestResults import targetPathLength
+from ImpactTestScheduler import DEFAULT_COMMAND as SOLVE_COMMAND, ImpactTestScheduler
+from ImpactTestStore import IGNORED_KEYS
+from ImpactTestV50 import BUILD_COMMAND, RESULTS_COMMAND, solveCases
+
+# Ratio of coarse to fine element size, unless coarse element size is given
+DEFAULT_COARSENING = 3.0
+# Margin of perforation threshold - coarse result is marginal if perforating projectile's residual velocity is below
+# this fraction of impact velocity, or if stopped projectile penetrated beyond this fraction of target's path length
+# short of its whole length
+DEFAULT_MARGIN = 0.1
+# Number of nearest cases in parameter space whose coarse results are compared with case's own
+DEFAULT_NEIGHBOURS = 4
+# Neighbours farther than this many times the nearest one's distance aren't compared - on grids of parameters only
+# adjacent cases, including diagonal ones, are compared
+DEFAULT_REACH = 1.5
+# Difference of neighbouring cases' residual velocities, as a fraction of impact velocity, counting as disagreement
+DEFAULT_DISAGREEMENT = 0.25
+# Suffixes of coarse and fine models' names
+COARSE_SUFFIX = "-C"
+FINE_SUFFIX = "-F"
+
+
+# Features of configurations for finding neighbouring cases - values varying between cases, except model's element
+# size and entries which don't affect the model. Numbers are scaled by typical spacing of their distinct values, so
+# adjacent cases of grid's axis are unit distance apart, other values are one-hot encoded, so cases differing by one
+# choice are unit distance apart as well
+def parameterFeatures(configs):
+    flat = [flattenConfig(config) for config in configs]
+    paths = set()
+    for values in flat:
+        paths.update(values.keys())
+    columns = []
+    for path in sorted(paths):
+        if path.split('.')[0] in IGNORED_KEYS or path == 'meshElementSize':
+            continue
+        values = [item.get(path) for item in flat]
+        if all(value == values[0] for value in values):
+            continue
+        if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in values):
+            column = numpy.array(values, dtype=float)
+            spacing = numpy.median(numpy.diff(numpy.unique(column)))
+            columns.append((column - column.min()) / spacing)
+        else:
+            for choice in sorted(set(str(value) for value in values)):
+                columns.append(numpy.array([str(value) == choice for value in values], dtype=float) / math.sqrt(2.0))
+    if not columns:
+        return numpy.zeros((len(configs), 0))
+    return numpy.column_stack(columns)
+
+
+# Reasons for promoting cases to fine element size, given their coarse results' summaries, None for failed ones -
+# 'margin' if the result is close to perforation threshold, 'neighbours' if it disagrees with any of the nearest
+# cases' results in parameter space. Returns lists of reasons by index of promoted case
+def promotedCases(configs, summaries, margin=DEFAULT_MARGIN, neighbours=DEFAULT_NEIGHBOURS,
+                  disagreement=DEFAULT_DISAGREEMENT, reach=DEFAULT_REACH):
+    reasons = {}
+    solved = [i for i, summary in enumerate(summaries) if summary is not None]
+    for i in solved:
+        summary = summaries[i]
+        velocity = float(configs[i]['projectile']['velocity'])
+        if summary['perforated']:
+            marginal = summary['residualVelocity'] < margin * velocity
+        else:
+            marginal = summary['penetration'] > (1.0 - margin) * targetPathLength(configs[i])
+        if marginal:
+            reasons.setdefault(i, []).append('margin')
+    count = min(int(neighbours), len(solved) - 1)
+    if count < 1:
+        return reasons
+    points = parameterFeatures(configs)[solved]
+    distances = numpy.sqrt(((points[:, numpy.newaxis, :] - points[numpy.newaxis, :, :]) ** 2).sum(axis=2))
+    numpy.fill_diagonal(distances, numpy.inf)
+    nearest = numpy.argsort(distances, axis=1, kind='mergesort')[:, :count]
+    rows = numpy.arange(len(solved))[:, numpy.newaxis]
+    near = distances[rows, nearest] <= reach * distances[rows, nearest[:, :1]]
+    outcomes = numpy.array([summaries[i]['perforated'] for i in solved])
+    residuals = numpy.array([summaries[i]['residualVelocity'] for i in solved], dtype=float)
+    velocities = numpy.array([float(configs[i]['projectile']['velocity']) for i in solved])
+    flipped = outcomes[nearest] != outcomes[:, numpy.newaxis]
+    jumps = numpy.abs(residuals[nearest] - residuals[:, numpy.newaxis]) > disagreement * velocities[:, numpy.newaxis]
+    for row in numpy.nonzero(((flipped | jumps) & near).any(axis=1))[0]:
+        reasons.setdefault(solved[row], []).append('neighbours')
+    return reasons
+
+
+# Coarse-to-fine sweep - every case is built and solved with coarse element size first, then only cases whose coarse
+# results are close to perforation threshold or disagree with their neighbours' are built and solved again with fine
+# element size. Both results are linked in single results table
+class ImpactTestFidelity():
+    def __init__(self, cases, prefix, coarse=None, fine=None, margin=DEFAULT_MARGIN, neighbours=DEFAULT_NEIGHBOURS,
+                 disagreement=DEFAULT_DISAGREEMENT, workers=1, directory=None, cpus=None, cpusPerJob=None,
+                 buildCommand=BUILD_COMMAND, solveCommand=SOLVE_COMMAND, resultsCommand=RESULTS_COMMAND):
+        # Named configurations of the sweep
+        self.cases = cases
+        self.prefix = str(prefix)
+        # Element sizes in [m] - fine defaults to case's own, coarse to DEFAULT_COARSENING times fine
+        self.coarse = coarse
+        self.fine = fine
+        self.margin = float(margin)
+        self.neighbours = int(neighbours)
+        self.disagreement = float(disagreement)
+        self.workers = int(workers)
+        # Working directory of models of both stages, their results and results table
+        self.directory = os.path.abspath(directory or os.getcwd())
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+        self.scheduler = ImpactTestScheduler(
+            os.path.join(self.directory, self.prefix + "-queue.json"),
+            budget=cpus,
+            cpusPerJob=cpusPerJob,
+            command=solveCommand
+        )
+        self.buildCommand = buildCommand
+        self.resultsCommand = resultsCommand
+
+    # Fine element size of case's configuration in [m]
+    def fineSize(self, config):
+        return float(self.fine if self.fine is not None else config['meshElementSize'])
+
+    # Coarse element size of case's configuration in [m], within element size limits - None if it isn't coarser than
+    # fine one or lies outside the limits, so the case is solved in single stage with fine element size
+    def coarseSize(self, config):
+        low, high = LIMITS['meshElementSize'][:2]
+        if self.coarse is not None:
+            size = float(self.coarse)
+        else:
+            size = min(DEFAULT_COARSENING * self.fineSize(config), high)
+        if size <= self.fineSize(config) or not low <= size <= high:
+            return None
+        return size
+
+    # Configurations of given cases with stage's element size and model name suffix
+    def stageCases(self, indices, suffix, size):
+        configs = []
+        for i in indices:
+            name, config = self.cases[i]
+            config = json.loads(json.dumps(config))
+            config['meshElementSize'] = size(config)
+            config['modelName'] = name + suffix
+            configs.append(config)
+        return configs
+
+    # Solve all cases coarse, then promoted cases fine. Cases without valid coarse element size are solved fine only.
+    # Returns results table
+    def run(self):
+        single = [i for i, (name, config) in enumerate(self.cases) if self.coarseSize(config) is None]
+        staged = [i for i in range(len(self.cases)) if i not in single]
+        coarse = {}
+        if staged:
+            coarse = solveCases(
+                self.stageCases(staged, COARSE_SUFFIX, self.coarseSize),
+                self.prefix + "-coarse",
+                self.directory,
+                self.scheduler,
+                workers=self.workers,
+                buildCommand=self.buildCommand,
+                resultsCommand=self.resultsCommand
+            )
+        summaries = [coarse.get(name + COARSE_SUFFIX) for (name, config) in self.cases]
+        promoted = promotedCases(
+            [config for (name, config) in self.cases],
+            summaries,
+            self.margin,
+            self.neighbours,
+            self.disagreement
+        )
+        fine = {}
+        if promoted or single:
+            fine = solveCases(
+                self.stageCases(sorted(set(promoted) | set(single)), FINE_SUFFIX, self.fineSize),
+                self.prefix + "-fine",
+                self.directory,
+                self.scheduler,
+                workers=self.workers,
+                buildCommand=self.buildCommand,
+                resultsCommand=self.resultsCommand
+            )
+        return self.writeTable(summaries, promoted, fine, single)
+
+    # Write results table to <prefix>-fidelity.json - each case's coarse and fine results, reasons of its promotion,
+    # whether it was solved in single stage and its result of the finest element size solved
+    def writeTable(self, summaries, promoted, fine, single):
+        rows = []
+        for i, (name, config) in enumerate(self.cases):
+            coarseSummary = summaries[i]
+            fineSummary = fine.get(name + FINE_SUFFIX)
+            if fineSummary is not None:
+                fidelity = 'fine'
+            elif coarseSummary is not None:
+                fidelity = 'coarse'
+            else:
+                fidelity = None
+            rows.append(
+                {
+                    'name': name,
+                    'config': config,
+                    'coarse': {
+                        'model': name + COARSE_SUFFIX,
+                        'meshElementSize': self.coarseSize(config),
+                        'results': coarseSummary
+                    } if i not in single else None,
+                    'fine': {
+                        'model': name + FINE_SUFFIX,
+                        'meshElementSize': self.fineSize(config),
+                        'results': fineSummary
+                    } if i in promoted or i in single else None,
+                    'promoted': promoted.get(i, []),
+                    'singleStage': i in single,
+                    'fidelity': fidelity,
+                    'results': fineSummary if fineSummary is not None else coarseSummary,
+                    # Whether fine result confirmed coarse one's outcome
+                    'agreed': coarseSummary['perforated'] == fineSummary['perforated']
+                    if fineSummary is not None and coarseSummary is not None else None
+                }
+            )
+        table = {
+            'margin': self.margin,
+            'neighbours': self.neighbours,
+            'disagreement': self.disagreement,
+            'promoted': len(promoted),
+            'singleStage': len(single),
+            'cases': rows
+        }
+        with open(os.path.join(self.directory, self.prefix + "-fidelity.json"), 'w') as file:
+            json.dump(table, file, indent=2, sort_keys=True)
+        return table
+
+
+# Run as 'python ImpactTestFidelity.py sweep.json --coarse 0.001 --workers 4 --cpus 16 --cpus-per-job 4'
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve sweep coarse, then refine cases close to perforation threshold")
+    parser.add_argument('sweep', help="sweep specification file")
+    parser.add_argument('--coarse', type=float, default=None,
+                        help="coarse element size in [m], defaults to %g times fine one" % DEFAULT_COARSENING)
+    parser.add_argument('--fine', type=float, default=None, help="fine element size in [m], defaults to case's own")
+    parser.add_argument('-m', '--margin', type=float, default=DEFAULT_MARGIN,
+                        help="margin of perforation threshold as a fraction of velocity and path length")
+    parser.add_argument('-k', '--neighbours', type=int, default=DEFAULT_NEIGHBOURS,
+                        help="nearest cases compared with each case")
+    parser.add_argument('-d', '--disagreement', type=float, default=DEFAULT_DISAGREEMENT,
+                        help="neighbours' residual velocity difference as a fraction of velocity")
+    parser.add_argument('-w', '--workers', type=int, default=1, help="number of Abaqus/CAE sessions building models")
+    parser.add_argument('-o', '--output', default=None, help="working directory of models and results table")
+    parser.add_argument('--cpus', type=int, default=None, help="total number of cores, defaults to all")
+    parser.add_argument('--cpus-per-job', type=int, default=None, help="cores assigned to each job")
+    parser.add_argument('--build-command', default=BUILD_COMMAND, help="model building command template")
+    parser.add_argument('--solve-command', default=SOLVE_COMMAND, help="job command template")
+    parser.add_argument('--results-command', default=RESULTS_COMMAND, help="results summarizing command template")
+    args = parser.parse_args()
+    prefix, cases, incremental = loadSweep(args.sweep)
+    table = ImpactTestFidelity(
+        cases,
+        prefix,
+        coarse=args.coarse,
+        fine=args.fine,
+        margin=args.margin,
+        neighbours=args.neighbours,
+        disagreement=args.disagreement,
+        workers=args.workers,
+        directory=args.output,
+        cpus=args.cpus,
+        cpusPerJob=args.cpus_per_job,
+        buildCommand=args.build_command,
+        solveCommand=args.solve_command,
+        resultsCommand=args.results_command
+    ).run()
+    solved = [row for row in table['cases'] if row['fidelity'] is not None]
+    print("%d of %d cases solved, %d refined, %d in single stage" % (
+        len(solved),
+        len(table['cases']),
+        table['promoted'],
+        table['singleStage']
+    ))
+    sys.exit(0 if len(solved) == len(table['cases']) else 1)
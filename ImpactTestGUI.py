@@ -2,7 +2,6 @@ import json
 import os
 
 import math
-from pickle import Unpickler
 
 from Tkinter import *
 import ttk
@@ -10,8 +9,9 @@ import tkFileDialog
 
 from abaqus import mdb, session
 from abaqusConstants import *
-from material import createMaterialFromDataString
 
+import ImpactTestLibrary
+from ImpactTestConfig import LIMITS
 from ImpactTestKernel import ImpactTestKernel
 
 # List of available parts to be used in the model
@@ -207,14 +207,7 @@ class ImpactTestGUI():
             modelName = "Model-1"
         # GUI isn't needed anymore
         self.master.destroy()
-        # # Remove redundant parts
-        for part in self.parts():
-            if part == self.projectile.get():
-                continue
-            for m_part in mdb.models["Model-1"].parts.keys():
-                if m_part[:-3] == ("Projectile-" + part):
-                    del mdb.models["Model-1"].parts[m_part]
-        # Run kernel
+        # Run kernel - only chosen projectile's parts are imported
         ImpactTestKernel(config, modelName).run()
 
     # Save model's configuration to JSON-formatted file for later use
@@ -346,60 +339,32 @@ class ImpactTestGUI():
         )
         self.layupWidgets.append(tup)
 
-    # Yield loaded materials' names
+    # Yield available materials' names - materials are listed from material index and created only when used
     def materials(self):
-        for m in mdb.models['Model-1'].materials.keys():
+        for m in ImpactTestLibrary.materialNames():
             yield m
 
-    # Check floats in editable fields for validity
+    # Check floats in editable fields for validity - limits are shared with configuration validation, lengths are
+    # converted from [m] to [mm]
     def verifyFloats(self):
-        # Allow layers to be between 0.5 and 150.0 [mm] thick
         for (label, matvar, material, thickvar, thickness, spacevar, spacing) in self.layupWidgets:
-            self.verifyStringVarFloat(
-                thickvar,
-                treshold=0.5,
-                maximum=150.0
-            )
-            self.verifyStringVarFloat(
-                spacevar,
-                treshold=0.0,
-                maximum=100.0
-            )
-        # Allow target radius to be between 30.0 and 120.0 [mm].
-        self.verifyStringVarFloat(
-            self.radius,
-            treshold=50.0,
-            maximum=120.0
-        )
-        # Allow target inner radius to be between 10.0 and 45.0 [mm].
-        self.verifyStringVarFloat(
-            self.innerRadius,
-            treshold=10.0,
-            maximum=45.0
-        )
-        # Allow target obliquity to be between 0 (normal) and 60 [deg]
-        self.verifyStringVarFloat(
-            self.obliquity,
-            treshold=0.0,
-            maximum=60.0
-        )
-        # Allow projectile initial velocity to be between 100.0 and 2000.0 [m/s]
-        self.verifyStringVarFloat(
-            self.velocity,
-            treshold=100.0,
-            maximum=2000.0
-        )
-        # Allow element size to be between 0.05 and 2.0 [mm]
-        self.verifyStringVarFloat(
-            self.elementSize,
-            treshold=0.05,
-            maximum=2.0
-        )
-        # Allow failure coefficient to be between 0.01 and 100.0 [-]
+            self.verifyStringVarLimits(thickvar, 'armor.layers.thickness', 1000.0)
+            self.verifyStringVarLimits(spacevar, 'armor.layers.spacing', 1000.0)
+        self.verifyStringVarLimits(self.radius, 'armor.radius', 1000.0)
+        self.verifyStringVarLimits(self.innerRadius, 'armor.innerRadius', 1000.0)
+        self.verifyStringVarLimits(self.obliquity, 'armor.obliquity')
+        self.verifyStringVarLimits(self.velocity, 'projectile.velocity')
+        self.verifyStringVarLimits(self.elementSize, 'meshElementSize', 1000.0)
+        self.verifyStringVarLimits(self.failureCoefficient, 'failureCoefficient')
+
+    # Verify if StringVar's value fits in limits of configuration's value under dotted path, shown in units scaled by
+    # given factor
+    def verifyStringVarLimits(self, strvar, path, scale=1.0):
+        minimum, maximum, unit = LIMITS[path]
         self.verifyStringVarFloat(
-            self.failureCoefficient,
-            treshold=0.01,
-            maximum=100.0
+            strvar,
+            treshold=minimum * scale,
+            maximum=maximum * scale
         )
 
     # Verify if StringVar's value is valid float and fits in limits
@@ -694,7 +659,7 @@ class ImpactTestGUI():
             thickness = 0.5
             # Default spacing is 0.0 [mm]
             spacing = 0.0
-            if 'material' in layer and layer['material'] in self.materials():
+            if 'material' in layer and layer['material'] in self.armorMaterials:
                 material = layer['material']
             if 'thickness' in layer:
                 # Convert [m] to [mm]
@@ -719,90 +684,20 @@ class ImpactTestGUI():
             row[3].set(thickness)
             row[5].set(spacing)
 
-# Import parts from Parts folder subdirectories
-def importParts(modelName="Model-1"):
+# List available parts from Parts folder subdirectories and import given projectile's parts to model. ACIS files of
+# projectiles other than the chosen one are never opened
+def importParts(modelName="Model-1", projectileType=None):
     # Clear list of available parts
     del availableParts[:]
-    # Make sure Parts directory exists or create one
-    __directory = os.path.dirname(os.path.realpath(__file__)) + "\\Parts\\"
-    if not os.path.exists(__directory):
-        os.makedirs(__directory)
-    # List subdirectories
-    directories = os.listdir(__directory)
-    for __dir in directories:
-        name = __dir
-        __dir = __directory + __dir
-        if os.path.isdir(__dir):
-            # Open part file
-            projectile = __dir + "\\Projectile.sat"
-            projectile = mdb.openAcis(projectile)
-            # Open part configuration describing part material and ID in AcisFile
-            config = __dir + "\\elements.cfg"
-            config = json.load(
-                open(config)
-            )
-            config = [dict([(str(k), str(v)) for k, v in x.iteritems()]) for x in config]
-            # Create projectile component and assign it material
-            for i in range(len(config)):
-                p_name = "Projectile-" + name + "-" + str(i).zfill(2)
-                conf_el = config[i]
-                element = mdb.models[modelName].PartFromGeometryFile(
-                    p_name,
-                    projectile,
-                    THREE_D,
-                    DEFORMABLE_BODY,
-                    bodyNum=int(conf_el['id'])
-                )
-                cells = element.cells.getSequenceFromMask(
-                    mask=
-                    (
-                        '[#1 ]',
-                    ),
-                )
-                region = element.Set(
-                    cells=cells,
-                    name='volume'
-                )
-                section = mdb.models[modelName].HomogeneousSolidSection(
-                    p_name,
-                    str(conf_el['material'])
-                )
-                element.SectionAssignment(
-                    sectionName=p_name,
-                    region=region,
-                )
-            # Append subdirectory's name to available parts list
-            availableParts.append(name)
+    availableParts.extend(sorted(ImpactTestLibrary.partCatalog().keys()))
+    if projectileType is not None:
+        return ImpactTestLibrary.importProjectile(modelName, projectileType)
+    return []
 
-# Import materials to model
-def importMaterials(modelName ="Model-1"):
-    # Make sure Materials directory exists
-    __directory = os.path.dirname(os.path.realpath(__file__)) + "\\Materials\\"
-    if not os.path.exists(__directory):
-        os.makedirs(__directory)
-    # List all files in directory
-    directory = os.listdir(__directory)
-    materials = []
-    for file in directory:
-        # Import all materials from all material libraries
-        if file.endswith(".lib"):
-            f = open(
-                __directory + "\\" + file,
-                'r'
-            )
-            # Unpickle library file
-            lib = Unpickler(f).load()
-            f.close()
-            for (a, b, name, c, mat) in lib:
-                # Create materials from actual material datastrings
-                if b != -1:
-                    createMaterialFromDataString(
-                        modelName,
-                        mat['Vendor material name'],
-                        mat['version'],
-                        mat['Data']
-                    )
-    return materials
+# Import materials to model - all of them unless names are given. Materials are read from material index instead of
+# unpickling every library
+def importMaterials(modelName="Model-1", names=None):
+    return ImpactTestLibrary.importMaterials(modelName, names)
 
 # Adjust Abaqus GUI to be less demanding and run plugin's GUI
 def __startWindow():
@@ -814,8 +709,8 @@ def __startWindow():
     # session.journalOptions.setValues(replayGeometry=INDEX)
     gui = ImpactTestGUI()
 
-# Import materials, then parts, then create plugin's GUI window
+# List available parts, then create plugin's GUI window - parts and materials are imported by the kernel once they
+# are chosen
 def run():
-    importMaterials()
     importParts()
     __startWindow()
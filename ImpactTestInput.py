@@ -0,0 +1,416 @@
+import json
+import mmap
+import os
+import sys
+
+
+# Head of input file's keyword block - keyword line with its first data line, or a run of comment lines
+class KeywordBlock():
+    def __init__(self, line=None, firstData=None, comments=None):
+        # Keyword line, None for comment blocks and data preceding first keyword
+        self.line = line
+        # First data line following keyword line, if any
+        self.firstData = firstData
+        # Comment lines of comment block
+        self.comments = comments or []
+        # Lower-case keyword, f.e. '*end assembly', and its lower-case parameters
+        self.keyword = None
+        self.parameters = {}
+        if line is not None and line.startswith('*'):
+            self.keyword, self.parameters = parseKeyword(line)
+
+    # Lines of the block read so far
+    def head(self):
+        if self.comments:
+            return list(self.comments)
+        return [line for line in (self.line, self.firstData) if line is not None]
+
+
+# Split keyword line into lower-case keyword and dictionary of lower-case parameter names and their values
+def parseKeyword(line):
+    fields = [field.strip() for field in line.split(',')]
+    keyword = ' '.join(fields[0].lower().split())
+    parameters = {}
+    for field in fields[1:]:
+        if not field:
+            continue
+        if '=' in field:
+            name, value = field.split('=', 1)
+            parameters[name.strip().lower()] = value.strip().strip('"')
+        else:
+            parameters[field.lower()] = True
+    return keyword, parameters
+
+
+# Check whether line is a comment line
+def isCommentLine(line):
+    return line.startswith('**')
+
+
+# Check whether line is a data line
+def isDataLine(line):
+    return not line.startswith('*')
+
+
+# Line iterator allowing to look one line ahead
+class LineReader():
+    def __init__(self, file):
+        self.file = file
+        self.buffer = None
+
+    def peek(self):
+        if self.buffer is None:
+            line = self.file.readline()
+            if not line:
+                return None
+            self.buffer = line.rstrip('\r\n')
+        return self.buffer
+
+    def next(self):
+        line = self.peek()
+        self.buffer = None
+        return line
+
+
+# Yield data lines up to the next keyword or comment line
+def dataLines(reader):
+    while True:
+        line = reader.peek()
+        if line is None or not isDataLine(line):
+            return
+        yield reader.next()
+
+
+# Iterate over keyword blocks of input file, yielding each block's head and iterator of its remaining data lines.
+# Data lines are read lazily, so blocks of any size are never held in memory
+def keywordBlocks(file):
+    reader = LineReader(file)
+    while reader.peek() is not None:
+        line = reader.next()
+        if isCommentLine(line):
+            comments = [line]
+            while reader.peek() is not None and isCommentLine(reader.peek()):
+                comments.append(reader.next())
+            yield KeywordBlock(comments=comments), iter([])
+            continue
+        firstData = None
+        if isDataLine(line):
+            # Data not preceded by keyword line, f.e. after comment interrupting keyword's data
+            firstData, line = line, None
+        elif reader.peek() is not None and isDataLine(reader.peek()):
+            firstData = reader.next()
+        data = dataLines(reader)
+        yield KeywordBlock(line, firstData), data
+        # Skip data lines not consumed by the caller
+        for remaining in data:
+            pass
+
+
+# Predicate matching keyword blocks of given keyword, optionally with given parameter values
+def isKeyword(keyword, **parameters):
+    keyword = ' '.join(keyword.lower().split())
+    parameters = dict((name.lower(), str(value).lower()) for name, value in parameters.items())
+
+    def predicate(block):
+        if block.keyword != keyword:
+            return False
+        for name, value in parameters.items():
+            if str(block.parameters.get(name, '')).lower() != value:
+                return False
+        return True
+    return predicate
+
+
+# Predicate matching comment blocks containing given comment line
+def isComment(comment):
+    def predicate(block):
+        return comment in block.comments
+    return predicate
+
+
+# Predicate matching keyword blocks of given keyword whose first data line starts with given text
+def hasData(keyword, prefix):
+    matchesKeyword = isKeyword(keyword)
+
+    def predicate(block):
+        return matchesKeyword(block) and block.firstData is not None and block.firstData.startswith(prefix)
+    return predicate
+
+
+# Single-pass input file rewriter - copies keyword blocks to temporary file, inserting, replacing or removing blocks
+# at anchors given by predicates, then replaces the original file with the result
+class InputRewriter():
+    def __init__(self, filename):
+        self.filename = filename
+        # List of hooks - [position, predicate, lines, once, fired]
+        self.hooks = []
+
+    # Insert lines before first block matching predicate. Lines may be any iterable, f.e. generator, or a function
+    # of matched block returning one
+    def insertBefore(self, predicate, lines, once=True):
+        self.hooks.append(['before', predicate, lines, once, False])
+
+    # Insert lines after first block matching predicate
+    def insertAfter(self, predicate, lines, once=True):
+        self.hooks.append(['after', predicate, lines, once, False])
+
+    # Replace all blocks matching predicate with lines
+    def replace(self, predicate, lines, once=False):
+        self.hooks.append(['replace', predicate, lines, once, False])
+
+    # Remove all blocks matching predicate
+    def remove(self, predicate):
+        self.replace(predicate, [])
+
+    # Rewrite the input file in one pass. Raises ValueError if any insertion anchor hasn't been found
+    def rewrite(self):
+        temporary = self.filename + ".tmp"
+        try:
+            with open(self.filename) as source:
+                with open(temporary, 'w') as target:
+                    for block, data in keywordBlocks(source):
+                        self.__write(target, self.__fire('before', block), block)
+                        replacements = self.__fire('replace', block)
+                        if replacements:
+                            self.__write(target, replacements, block)
+                        else:
+                            self.__writeLines(target, block.head())
+                            self.__writeLines(target, data)
+                        self.__write(target, self.__fire('after', block), block)
+            missing = [hook for hook in self.hooks if hook[0] != 'replace' and not hook[4]]
+            if missing:
+                raise ValueError("Input file %s lacks %d anchor(s)" % (self.filename, len(missing)))
+            replaceFile(temporary, self.filename)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+
+    # Find hooks of given position matching block and mark them as fired
+    def __fire(self, position, block):
+        matched = []
+        for hook in self.hooks:
+            if hook[0] != position or (hook[3] and hook[4]):
+                continue
+            if hook[1](block):
+                hook[4] = True
+                matched.append(hook)
+        return matched
+
+    # Write lines of fired hooks
+    def __write(self, target, hooks, block):
+        for hook in hooks:
+            lines = hook[2]
+            if callable(lines):
+                lines = lines(block)
+            self.__writeLines(target, lines)
+
+    # Write lines, adding line endings
+    def __writeLines(self, target, lines):
+        for line in lines:
+            target.write(line)
+            target.write("\n")
+
+
+# Replace target file with source file - atomically where the platform allows it
+def replaceFile(source, target):
+    if hasattr(os, 'replace'):
+        os.replace(source, target)
+        return
+    # Windows' rename fails when target exists
+    if os.name == 'nt' and os.path.exists(target):
+        os.remove(target)
+    os.rename(source, target)
+
+
+# Keyword line's entry of input file index - keyword with its parameters, byte offsets of the keyword line, its data
+# and the end of its data, and names of part and instance it belongs to
+class IndexEntry():
+    def __init__(self, line, start, data, end, part=None, instance=None):
+        self.line = line
+        self.start = start
+        self.data = data
+        self.end = end
+        self.part = part
+        self.instance = instance
+        self.keyword, self.parameters = parseKeyword(line)
+
+    def toList(self):
+        return [self.line, self.start, self.data, self.end, self.part, self.instance]
+
+
+# Byte-offset index of input file's keyword lines. The index is stored next to the input file and rebuilt when the
+# input file's modification time or size changes, lookups read only the requested block through memory map
+class InputIndex():
+    def __init__(self, filename, cache=True):
+        self.filename = os.path.abspath(filename)
+        # Index file stored next to the input file
+        self.indexFilename = self.filename + ".idx"
+        self.entries = None
+        self.file = None
+        self.map = None
+        if cache:
+            self.entries = self.__loadIndex()
+        if self.entries is None:
+            self.entries = self.__buildIndex()
+            if cache:
+                self.__saveIndex()
+        # Parts of instances by instance name
+        self.instances = dict(
+            (entry.parameters.get('name'), entry.parameters.get('part'))
+            for entry in self.entries if entry.keyword == '*instance'
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    # Release memory map of input file
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    # Entries of given keyword, optionally restricted to part, instance and parameter values
+    def find(self, keyword, part=None, instance=None, **parameters):
+        predicate = isKeyword(keyword, **parameters)
+        return [
+            entry for entry in self.entries if predicate(entry) and
+            (part is None or entry.part == part) and
+            (instance is None or entry.instance == instance)
+        ]
+
+    # First entry matching the criteria of find, None if there's no such entry
+    def first(self, keyword, part=None, instance=None, **parameters):
+        entries = self.find(keyword, part, instance, **parameters)
+        return entries[0] if entries else None
+
+    # Data lines of entry, read through memory map
+    def dataLines(self, entry):
+        if entry.end <= entry.data:
+            return []
+        text = self.__map()[entry.data:entry.end].decode('latin-1')
+        return [line for line in text.splitlines() if line]
+
+    # Number of nodes or elements defined by *Node or *Element entry, or number of labels of set entry
+    def labelCount(self, entry):
+        lines = self.dataLines(entry)
+        if entry.keyword in ('*node', '*element'):
+            # Definitions of elements with many nodes are continued in lines ending with comma
+            return len([line for line in lines if not line.rstrip().endswith(',')])
+        if 'generate' in entry.parameters:
+            count = 0
+            for line in lines:
+                fields = [int(field) for field in line.split(',') if field.strip()]
+                step = fields[2] if len(fields) > 2 else 1
+                count += (fields[1] - fields[0]) // step + 1
+            return count
+        return sum(len([field for field in line.split(',') if field.strip()]) for line in lines)
+
+    # Element blocks of part or instance's part
+    def elementBlocks(self, name):
+        return self.find('*Element', part=self.instances.get(name, name))
+
+    # Node blocks of part or instance's part
+    def nodeBlocks(self, name):
+        return self.find('*Node', part=self.instances.get(name, name))
+
+    # Number of nodes of part or instance's part
+    def nodeCount(self, name):
+        return sum(self.labelCount(entry) for entry in self.nodeBlocks(name))
+
+    # Number of elements of part or instance's part
+    def elementCount(self, name):
+        return sum(self.labelCount(entry) for entry in self.elementBlocks(name))
+
+    # Names of instances with their node and element counts
+    def counts(self):
+        return [
+            (name, self.nodeCount(name), self.elementCount(name))
+            for name in sorted(self.instances.keys())
+        ]
+
+    # Open memory map of input file on first lookup
+    def __map(self):
+        if self.map is None:
+            self.file = open(self.filename, 'rb')
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self.map
+
+    # Modification time and size identifying indexed input file's version
+    def __stamp(self):
+        status = os.stat(self.filename)
+        return [status.st_mtime, status.st_size]
+
+    # Load index stored next to the input file, None if it is missing or out of date
+    def __loadIndex(self):
+        if not os.path.exists(self.indexFilename):
+            return None
+        try:
+            with open(self.indexFilename) as file:
+                stored = json.load(file)
+        except ValueError:
+            return None
+        if stored.get('stamp') != self.__stamp():
+            return None
+        return [IndexEntry(*entry) for entry in stored['entries']]
+
+    # Store index next to the input file
+    def __saveIndex(self):
+        temporary = self.indexFilename + ".tmp"
+        with open(temporary, 'w') as file:
+            json.dump(
+                {
+                    'stamp': self.__stamp(),
+                    'entries': [entry.toList() for entry in self.entries]
+                },
+                file
+            )
+        replaceFile(temporary, self.indexFilename)
+
+    # Scan input file once, recording offsets of keyword lines and their data along with enclosing part and instance
+    def __buildIndex(self):
+        entries = []
+        part = None
+        instance = None
+        offset = 0
+        current = None
+        with open(self.filename, 'rb') as file:
+            for raw in file:
+                line = raw.decode('latin-1').rstrip('\r\n')
+                if line.startswith('*'):
+                    # Keyword and comment lines end data of the previous keyword
+                    if current is not None:
+                        current.end = offset
+                        current = None
+                    if not isCommentLine(line):
+                        current = IndexEntry(line, offset, offset + len(raw), offset + len(raw), part, instance)
+                        keyword = current.keyword
+                        if keyword == '*part':
+                            part = current.part = current.parameters.get('name')
+                        elif keyword == '*end part':
+                            part = None
+                        elif keyword == '*instance':
+                            instance = current.instance = current.parameters.get('name')
+                        elif keyword == '*end instance':
+                            instance = None
+                        elif instance is None and 'instance' in current.parameters:
+                            # Assembly-level sets and surfaces referring to instance
+                            current.instance = current.parameters['instance']
+                        entries.append(current)
+                offset += len(raw)
+        if current is not None:
+            current.end = offset
+        return entries
+
+
+# Run as 'python ImpactTestInput.py Job-1.inp' to list node and element counts of input file's instances
+if __name__ == "__main__":
+    for filename in sys.argv[1:]:
+        with InputIndex(filename) as index:
+            for name, nodes, elements in index.counts():
+                print("%s: %s - %d nodes, %d elements" % (filename, name, nodes, elements))
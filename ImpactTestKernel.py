@@ -1,3 +1,5 @@
+import hashlib
+import json
 import math
 import multiprocessing
 import os
@@ -7,21 +9,118 @@ import part, mesh
 from abaqusConstants import *
 import regionToolset
 
+import ImpactTestLibrary
+from ImpactTestInput import InputIndex, InputRewriter, hasData, isComment, isKeyword
+from ImpactTestProfiler import ImpactTestProfiler
+
+# Seeding of projectile's parts - deviation and minimum size factors
+PROJECTILE_DEVIATION_FACTOR = 0.1
+PROJECTILE_MIN_SIZE_FACTOR = 0.1
+# Graded seeding of target's outer parts - default growth ratio of radial element size and maximum radial element size
+# as multiple of mesh element size
+GRADING_GROWTH_RATIO = 1.3
+GRADING_MAX_SIZE_FACTOR = 32.0
+# Automatic inner radius - damage zone's radius as multiple of projectile's radius, minimum number of elements between
+# projectile's surface and inner radius, and maximum inner radius as fraction of target's radius
+INNER_RADIUS_FACTOR = 3.0
+INNER_RADIUS_MIN_ELEMENTS = 4
+INNER_RADIUS_MAX_FRACTION = 0.8
+# Half model - half of extent of bounding boxes selecting entities on either side of symmetry plane in [m]
+HALF_MODEL_BOUND = 1000.0
+# Adaptive impact step - step time as multiple of projectile's clearance time, clearance distance margin and
+# projectile monitor filters' cutoff frequency as multiple of inverse step time
+ADAPTIVE_TIME_FACTOR = 3.0
+ADAPTIVE_CLEARANCE_MARGIN = 1.25
+ADAPTIVE_CUTOFF_FACTOR = 100.0
+# Output request profiles - field output variables, number of intervals and region, either whole model or impact
+# region made of projectile and target's inner parts, number of history output intervals and whole projectile's
+# history output variables
+OUTPUT_PROFILES = {
+    'ballistic-minimal': {
+        'fieldVariables': ('S', 'PEEQ', 'U', 'V', 'STATUS'),
+        'fieldIntervals': 50,
+        'fieldRegion': 'impact',
+        'historyIntervals': 200,
+        'projectileHistory': ('MASS', 'XC', 'UC', 'VC', 'ALLKE', 'ALLIE', 'ALLPD')
+    },
+    'thermal': {
+        'fieldVariables': ('S', 'PEEQ', 'U', 'V', 'NT', 'HFL', 'STATUS', 'SDEG'),
+        'fieldIntervals': 100,
+        'fieldRegion': 'impact',
+        'historyIntervals': 500,
+        'projectileHistory': ('MASS', 'XC', 'UC', 'VC', 'ALLKE', 'ALLIE', 'ALLPD', 'ALLHF')
+    },
+    'full-debug': {
+        'fieldVariables': (
+            'S', 'SVAVG', 'PE', 'ER', 'ERV', 'PEVAVG', 'PEEQ', 'PEEQVAVG', 'LE', 'U', 'V', 'A', 'RF', 'CSTRESS', 'NT',
+            'HFL', 'RFL', 'EVF', 'STATUS', 'SDEG'
+        ),
+        'fieldIntervals': 1000,
+        'fieldRegion': 'model',
+        'historyIntervals': 1000,
+        'projectileHistory': ()
+    }
+}
+DEFAULT_OUTPUT_PROFILE = 'ballistic-minimal'
+# Field output variables written at nodes, the remaining ones are written at elements
+NODAL_OUTPUTS = ('U', 'V', 'A', 'RF', 'NT', 'RFL')
+# Fully built models by fingerprint of their geometry-affecting inputs - source models for incremental builds
+meshedModels = {}
+# Mesh element sizes in [m] of fully built models by their names - configured sizes, unless cost estimate coarsened
+# their meshes
+meshSizes = {}
+
+
+# Compute fingerprint of configuration's inputs affecting model's geometry, mesh and materials - models sharing the
+# fingerprint differ only by projectile's velocity
+def geometryFingerprint(config):
+    # Two dimensional model is neither cut in half nor written to input file, like in ImpactTestKernel
+    axisymmetric = bool(config.get('axisymmetric', False))
+    estimateSettings = config.get('estimate', False)
+    inputs = {
+        'projectileType': str(config['projectile']['type']),
+        'layers': config['armor']['layers'],
+        'radius': config['armor']['radius'],
+        'innerRadius': config['armor']['innerRadius'],
+        # Recommended inner radius depends only on projectile's type and inputs above
+        'autoInnerRadius': config.get('autoInnerRadius', False),
+        'meshElementSize': config['meshElementSize'],
+        # Cost estimate's budget decides how much the mesh is coarsened
+        'coarsening': estimateSettings if isinstance(estimateSettings, dict) and
+        estimateSettings.get('action') == 'coarsen' else None,
+        'targetGrading': config.get('targetGrading', False),
+        'halfModel': bool(config.get('halfModel', False)) and not axisymmetric,
+        'axisymmetric': axisymmetric,
+        # Fast target is written into the input file instead of being meshed in the model
+        'fastTarget': bool(config.get('fastTarget', False)) and not axisymmetric,
+        # Obliquity shapes target layers' sketches and sweeps as well as projectile's placement
+        'obliquity': config['armor']['obliquity'],
+        # Displacements at failure are adjusted in copied materials, so they can't be adjusted again
+        'failureCoefficient': config['failureCoefficient'],
+        # Projectile monitor is copied along with the model's outputs
+        'adaptiveStep': bool(config.get('adaptiveStep', False)),
+        'outputProfile': config.get('outputProfile', DEFAULT_OUTPUT_PROFILE)
+    }
+    return hashlib.sha1(
+        json.dumps(inputs, sort_keys=True).encode('utf-8')
+    ).hexdigest()
+
+
+# Forget source model of given fingerprint and delete it from the session - no later model will be derived from it
+def releaseMeshedModel(fingerprint):
+    name = meshedModels.pop(fingerprint, None)
+    meshSizes.pop(name, None)
+    if name in mdb.models.keys():
+        del mdb.models[name]
 
 
 class ImpactTestKernel():
-    # Initialize impact test kernel basing on configuration passed
-    def __init__(self, config, modelName="Model-1"):
+    # Initialize impact test kernel basing on configuration passed. If template model name is given, the model is
+    # copied from the template instead of importing parts and materials again. In incremental mode the model is copied
+    # from already meshed model of the same geometry if there is one
+    def __init__(self, config, modelName="Model-1", template=None, incremental=False):
         # Model name - used both as model's name, job's name and input file name
         self.modelName = str(modelName)
-        # Create new model database if not default
-        if modelName != "Model-1":
-            mdb.Model(self.modelName)
-            # If model is other than default parts and materials must be imported again
-            from ImpactTestGUI import importMaterials, importParts
-            importMaterials(self.modelName)
-            importParts(self.modelName)
-            del mdb.models['Model-1']
         # Type of projectile - describing subdirectory name
         self.projectileType = str(config['projectile']['type'])
         # Projectile's velocity in [m/s]
@@ -32,36 +131,202 @@ class ImpactTestKernel():
         self.targetRadius = config['armor']['radius']
         # Target center semi-minor axis in [m]
         self.targetInnerRadius = config['armor']['innerRadius']
+        # Inner radius given in configuration, replaced by recommended one if it's computed automatically
+        self.configuredInnerRadius = self.targetInnerRadius
+        # Optional automatic inner radius - true or dictionary of damage zone's factor. Inner radius is computed from
+        # projectile's bounding box, obliquity and target's thickness
+        self.autoInnerRadius = config.get('autoInnerRadius', False)
         # List of target layers - describing layers thickness in [m] and material
         self.targetLayers = config['armor']['layers']
-        # Average mesh element size in [m] used to seed parts
+        # Average mesh element size in [m] used to seed parts - cost estimate may coarsen it, configured size is kept
+        # for geometry fingerprint
         self.meshElementSize = config['meshElementSize']
+        self.configuredMeshElementSize = self.meshElementSize
         # Failure coefficient to adjust material properties easily
         self.failureCoefficient = config['failureCoefficient']
+        # Optional job resources - number of CPUs/domains and percentage of memory, all CPUs and 90 [%] by default
+        self.jobResources = config.get('job', {})
+        # Write target layers' mesh directly to input file instead of building them in Abaqus/CAE
+        self.fastTarget = config.get('fastTarget', False)
+        # Replace fake surface sets of Abaqus/CAE-built target with surface sets of all instances' elements in job's
+        # input file, along with general contact between them. Input file of fast target always has them
+        self.contactSurfaces = config.get('contactSurfaces', False)
+        # Optional projectile mesh cache - true or dictionary of cache's directory and size limit in [MB]
+        self.meshCache = config.get('meshCache', False)
+        # Whether projectile's parts are orphan meshes loaded from mesh cache
+        self.projectileMeshCached = False
+        # Optional pre-flight cost estimate - true or dictionary of solver time/increments budget and action taken
+        # when it's exceeded
+        self.estimateSettings = config.get('estimate', False)
+        # Report of the last cost estimate
+        self.estimate = None
+        # Optional graded radial seeding of target's outer parts - true or dictionary of growth ratio and maximum element
+        # size in [m]. Outer parts are seeded four times coarser than inner parts otherwise
+        self.targetGrading = config.get('targetGrading', False)
+        # Build only half of the model on side of positive X coordinates, with symmetry boundary conditions on its cut
+        # faces - projectile's velocity lies in YZ plane, so the problem is symmetric
+        self.halfModel = config.get('halfModel', False)
+        # Build two dimensional axisymmetric model of zero obliquity impact out of target layers' and projectile's
+        # sections, meshed with CAX4RT elements. Projectile's components need their profiles in elements.cfg
+        self.axisymmetric = config.get('axisymmetric', False)
+        if self.axisymmetric:
+            if self.targetObliquity != 0:
+                raise ValueError("Axisymmetric model requires zero obliquity, got %s" % self.targetObliquity)
+            # Two dimensional model is neither cut in half, written to input file nor cached
+            self.halfModel = False
+            self.fastTarget = False
+            self.meshCache = False
+        # Optional adaptive impact step - true or dictionary of time factor, clearance margin and cutoff factor. Step
+        # is shortened to the time projectile needs to clear the target, and halted once it has cleared it
+        self.adaptiveStep = config.get('adaptiveStep', False)
+        # Output request profile - name of one of OUTPUT_PROFILES or dictionary of profile's name and its overridden
+        # settings
+        self.outputProfile = config.get('outputProfile', DEFAULT_OUTPUT_PROFILE)
+        # Number of contact pairs included in general contact
+        self.contactPairs = 0
+        # Profiler of model preparation stages, enabled by 'profile' entry or IMPACTTEST_PROFILE variable
+        self.profiler = ImpactTestProfiler.fromConfig(self.modelName, config, self.__modelCounters)
         # Auxilliary list to store layer names, thicknesses and spacings in [m]
         self.assemblyOrder = []
         # Auxillary list of projectile component names
         self.projectileComponents = []
+        # Axial coordinate in [m] of axisymmetric projectile's nose in its components' profiles
+        self.projectileNose = float('inf')
+        # Register model as a source for incremental builds once it's built
+        self.incremental = incremental
+        # Fingerprint of geometry-affecting inputs, identifying source model for incremental builds
+        self.fingerprint = geometryFingerprint(config)
+        # Name of meshed model this model is derived from, if any
+        self.sourceModel = None
+        if incremental:
+            source = meshedModels.get(self.fingerprint)
+            if source in mdb.models.keys():
+                self.sourceModel = source
+                # Copied mesh may be coarser than configured one
+                self.meshElementSize = meshSizes.get(source, self.meshElementSize)
+        # Create new model database if not default
+        if self.sourceModel is not None:
+            # Geometry, mesh, interactions and step are copied from the source model
+            mdb.Model(
+                name=self.modelName,
+                objectToCopy=mdb.models[self.sourceModel]
+            )
+        elif template is not None:
+            # Parts and materials already imported to template model are copied along with it
+            mdb.Model(
+                name=self.modelName,
+                objectToCopy=mdb.models[template]
+            )
+            self.__removeRedundantProjectiles()
+        elif modelName != "Model-1":
+            mdb.Model(self.modelName)
+            del mdb.models['Model-1']
+        # Import only chosen projectile's parts, unless model already has them
+        ImpactTestLibrary.importProjectile(
+            self.modelName,
+            self.projectileType,
+            refresh=config.get('refreshPartCache', False)
+        )
+        # Create only materials of target layers and projectile's components, unless model already has them
+        ImpactTestLibrary.importMaterials(self.modelName, ImpactTestLibrary.referencedMaterials(config))
 
     # Perform all possible steps of model preparation
     def run(self):
-        self.adjustDisplacementsAtFailure()
-        self.setModelConstants()
-        self.prepareProjectileParts()
-        self.createTargetParts()
-        self.createModelAssembly()
-        self.createProjectileMesh()
-        self.createTargetMesh()
-        self.createFakeSurfaceSets()
-        self.createInteractionProperties()
-        self.createInteractions()
-        self.createTieConstraints()
-        self.applyInitialFields()
-        self.applyBoundaryConditions()
-        self.createStep()
-        self.adjustOutputs()
-        self.createJob()
-        # self.injectContactToInput()
+        if self.sourceModel is not None:
+            self.runDerived()
+            return
+        if self.axisymmetric:
+            self.runAxisymmetric()
+            return
+        stages = [
+            self.adjustDisplacementsAtFailure,
+            self.setModelConstants,
+            self.prepareProjectileParts,
+            self.sizeInnerRadius,
+            self.createTargetParts,
+            self.createModelAssembly,
+            self.createProjectileMesh,
+            self.createTargetMesh,
+            self.estimateCost,
+            self.createFakeSurfaceSets,
+            self.createInteractionProperties,
+            self.createInteractions,
+            self.createTieConstraints,
+            self.applyInitialFields,
+            self.applyBoundaryConditions,
+            self.createStep,
+            self.adjustOutputs,
+            self.createJob
+        ]
+        if self.fastTarget:
+            stages.append(self.injectTargetToInput)
+        elif self.contactSurfaces:
+            stages.append(self.injectContactToInput)
+        self.__runStages(stages)
+        if self.incremental:
+            meshedModels[self.fingerprint] = self.modelName
+            meshSizes[self.modelName] = self.meshElementSize
+
+    # Perform only steps depending on inputs excluded from geometry fingerprint on model copied from source model
+    def runDerived(self):
+        stages = [
+            self.sizeInnerRadius,
+            self.__updateProjectileVelocity,
+            self.__updateStep,
+            self.estimateCost,
+            self.createJob
+        ]
+        if self.fastTarget:
+            stages.append(self.injectTargetToInput)
+        elif self.contactSurfaces:
+            stages.append(self.injectContactToInput)
+        self.__runStages(stages)
+
+    # Perform all steps of axisymmetric model preparation - its own parts, assembly, mesh, constraints, fields and
+    # boundary conditions, along with steps shared with three dimensional models
+    def runAxisymmetric(self):
+        self.__runStages(
+            [
+                self.adjustDisplacementsAtFailure,
+                self.setModelConstants,
+                self.prepareProjectileParts,
+                self.sizeInnerRadius,
+                self.createAxisymmetricParts,
+                self.createAxisymmetricAssembly,
+                self.createAxisymmetricMesh,
+                self.estimateCost,
+                self.createFakeSurfaceSets,
+                self.createInteractionProperties,
+                self.createInteractions,
+                self.createAxisymmetricTieConstraints,
+                self.applyAxisymmetricInitialFields,
+                self.applyAxisymmetricBoundaryConditions,
+                self.createStep,
+                self.adjustOutputs,
+                self.createJob
+            ]
+        )
+        if self.incremental:
+            meshedModels[self.fingerprint] = self.modelName
+            meshSizes[self.modelName] = self.meshElementSize
+
+    # Run model preparation stages one after another, then write profiler's run report
+    def __runStages(self, stages):
+        try:
+            for stage in stages:
+                self.profiler.run(stage)
+        finally:
+            self.profiler.write()
+
+    # Model size counters reported along with each stage - element counts per part, number of instances and number
+    # of contact pairs
+    def __modelCounters(self):
+        model = mdb.models[self.modelName]
+        return {
+            'elements': dict((name, len(part.elements)) for name, part in model.parts.items()),
+            'instances': len(model.rootAssembly.instances),
+            'contactPairs': self.contactPairs
+        }
 
     # Set absolute zero temperature and Stefan-Boltzmann constant
     def setModelConstants(self):
@@ -73,6 +338,10 @@ class ImpactTestKernel():
 
     # Create separate part for each target layer
     def createTargetParts(self):
+        if self.fastTarget:
+            # Target layers will be written directly to input file
+            self.__registerTargetLayers()
+            return
         self.__createTargetSketches()
         i = 1
         for layer in self.targetLayers:
@@ -152,6 +421,8 @@ class ImpactTestKernel():
                     )
                 )
             )
+            if self.halfModel:
+                self.__halvePart(part)
             # Outer part
             part = mdb.models[self.modelName].Part(
                 outer_name,
@@ -233,6 +504,8 @@ class ImpactTestKernel():
             )
             # Cut outer target layer in two
             self.__partitionTargetLayer(part)
+            if self.halfModel:
+                self.__removeNegativeHalf(part)
 
     # Create model assembly out of target layers and projectile core and casing
     def createModelAssembly(self):
@@ -249,6 +522,9 @@ class ImpactTestKernel():
             spacing = element[2]
             offset -= thickness + previousSpacing
             verticalOffset = -math.sin(math.pi * self.targetObliquity / 180.0) * offset
+            previousSpacing = spacing
+            if self.fastTarget:
+                continue
             # Outer target part instance
             part = mdb.models[self.modelName].parts[outer_name]
             assembly.Instance(
@@ -276,7 +552,6 @@ class ImpactTestKernel():
                     offset
                 )
             )
-            previousSpacing = spacing
         offset = self.assemblyOrder[0][1]
         # Projectile offset preventing possible overlapping with target
         stdOffset = 0.0005 + offset / math.cos(math.pi * self.targetObliquity / 180.0)
@@ -331,7 +606,7 @@ class ImpactTestKernel():
     # Create job for the model
     def createJob(self):
         # Allow use of multiple CPUs/cores
-        cpus=multiprocessing.cpu_count()
+        cpus = int(self.jobResources.get('cpus', multiprocessing.cpu_count()))
         job = mdb.Job(
             name=self.modelName,
             model=self.modelName,
@@ -341,7 +616,7 @@ class ImpactTestKernel():
             waitMinutes=0,
             waitHours=0,
             queue=None,
-            memory=90,
+            memory=int(self.jobResources.get('memory', 90)),
             memoryUnits=PERCENTAGE,
             getMemoryFromAnalysis=True,
             explicitPrecision=SINGLE,
@@ -366,43 +641,171 @@ class ImpactTestKernel():
         mdb.models[self.modelName].TempDisplacementDynamicsStep(
             name='Impact',
             previous='Initial',
-            timePeriod=self.__calculateTargetAbsoluteThickness() * 25.0 / self.projectileVelocity
+            timePeriod=self.__calculateStepTime()
         )
 
-    # Create proper field/history output requests
+    # Adjust existing impact step's duration and projectile monitor's filters to projectile's velocity
+    def __updateStep(self):
+        timePeriod = self.__calculateStepTime()
+        mdb.models[self.modelName].steps['Impact'].setValues(
+            timePeriod=timePeriod
+        )
+        if self.adaptiveStep:
+            for name in ('Projectile-clearance', 'Projectile-velocity'):
+                mdb.models[self.modelName].filters[name].setValues(
+                    cutoffFrequency=self.__adaptiveSetting('cutoffFactor', ADAPTIVE_CUTOFF_FACTOR) / timePeriod
+                )
+
+    # Compute impact step's duration in [s] - multiple of time needed by projectile to clear the target if step is
+    # adaptive, fixed multiple of target's thickness otherwise
+    def __calculateStepTime(self):
+        if self.adaptiveStep:
+            return self.__adaptiveSetting('timeFactor', ADAPTIVE_TIME_FACTOR) * self.__calculateClearanceDistance() / \
+                self.projectileVelocity
+        return self.__calculateTargetAbsoluteThickness() * 25.0 / self.projectileVelocity
+
+    # Compute distance in [m] projectile travels until its tail clears target's last layer, along with margin
+    def __calculateClearanceDistance(self):
+        assembly = mdb.models[self.modelName].rootAssembly
+        # Axisymmetric projectile travels along Y axis, three dimensional one along Z axis
+        axis = 1 if self.axisymmetric else 2
+        # Projectile's instances are looked up by name, since models derived from meshed models have no components
+        tail = max(
+            instance.nodes.getBoundingBox()['high'][axis] for name, instance in assembly.instances.items()
+            if name.startswith("Projectile-")
+        )
+        # Projectile travels towards target's back face along direction inclined by obliquity
+        distance = (tail + self.__calculateTargetAbsoluteThickness()) / math.cos(math.pi * self.targetObliquity / 180.0)
+        return distance * self.__adaptiveSetting('clearanceMargin', ADAPTIVE_CLEARANCE_MARGIN)
+
+    # Setting of adaptive impact step, default value if it's not configured
+    def __adaptiveSetting(self, key, default):
+        if isinstance(self.adaptiveStep, dict):
+            return float(self.adaptiveStep.get(key, default))
+        return default
+
+    # Create field/history output requests of configured output profile
     def adjustOutputs(self):
-        mdb.models[self.modelName].historyOutputRequests['H-Output-1'].setValues(
-            numIntervals=1000
+        model = mdb.models[self.modelName]
+        profile = self.__getOutputProfile()
+        model.historyOutputRequests['H-Output-1'].setValues(
+            numIntervals=profile['historyIntervals']
+        )
+        if profile['fieldRegion'] == 'model':
+            model.fieldOutputRequests['F-Output-1'].setValues(
+                variables=tuple(profile['fieldVariables']),
+                numIntervals=profile['fieldIntervals']
+            )
+        else:
+            # Field output is limited to projectile and target's inner parts, penetrated by the projectile
+            assembly = model.rootAssembly
+            model.fieldOutputRequests['F-Output-1'].setValues(
+                variables=tuple(profile['fieldVariables']),
+                numIntervals=profile['fieldIntervals'],
+                region=assembly.sets['Projectile-volume']
+            )
+            if not self.fastTarget:
+                # Fast target's inner set and its field output are written to input file along with target layers
+                model.FieldOutputRequest(
+                    name='F-Target-inner',
+                    createStepName='Impact',
+                    region=self.__createTargetInnerSet(assembly),
+                    variables=tuple(profile['fieldVariables']),
+                    numIntervals=profile['fieldIntervals']
+                )
+        if profile['projectileHistory']:
+            # Whole projectile's motion and energies give its residual velocity without nodal history output
+            model.HistoryOutputRequest(
+                name='H-Projectile',
+                createStepName='Impact',
+                region=model.rootAssembly.sets['Projectile-volume'],
+                variables=tuple(profile['projectileHistory']),
+                numIntervals=profile['historyIntervals']
+            )
+        if self.adaptiveStep:
+            self.__createProjectileMonitor()
+
+    # Settings of configured output profile
+    def __getOutputProfile(self):
+        settings = self.outputProfile
+        if not isinstance(settings, dict):
+            settings = {'name': settings}
+        name = settings.get('name', DEFAULT_OUTPUT_PROFILE)
+        if name not in OUTPUT_PROFILES:
+            raise ValueError("Unknown output profile: %s" % name)
+        profile = dict(OUTPUT_PROFILES[name])
+        profile.update((key, value) for key, value in settings.items() if key != 'name')
+        return profile
+
+    # Create set of target's inner parts' cells - or faces, if they are axisymmetric sections
+    def __createTargetInnerSet(self, assembly):
+        if self.axisymmetric:
+            faces = None
+            for layer in self.assemblyOrder:
+                items = assembly.instances[layer[0] + "I"].faces
+                faces = items if faces is None else faces + items
+            return assembly.Set(
+                name='Target-inner',
+                faces=faces
+            )
+        cells = None
+        for layer in self.assemblyOrder:
+            items = assembly.instances[layer[0] + "I"].cells.getSequenceFromMask(
+                mask=
+                (
+                    '[#1 ]',
+                ),
+            )
+            cells = items if cells is None else cells + items
+        return assembly.Set(
+            name='Target-inner',
+            cells=cells
+        )
+
+    # Monitor projectile's motion - filtered velocity shows its residual velocity, and the analysis is halted once
+    # projectile's displacement exceeds clearance distance
+    def __createProjectileMonitor(self):
+        model = mdb.models[self.modelName]
+        cutoffFrequency = self.__adaptiveSetting('cutoffFactor', ADAPTIVE_CUTOFF_FACTOR) / self.__calculateStepTime()
+        model.ButterworthFilter(
+            name='Projectile-clearance',
+            cutoffFrequency=cutoffFrequency,
+            operation=MAX,
+            invariant=FIRST,
+            halt=ON,
+            limit=self.__calculateClearanceDistance()
+        )
+        model.ButterworthFilter(
+            name='Projectile-velocity',
+            cutoffFrequency=cutoffFrequency,
+            invariant=FIRST
         )
-        mdb.models[self.modelName].fieldOutputRequests['F-Output-1'].setValues(
+        region = model.rootAssembly.sets['Projectile-volume']
+        model.HistoryOutputRequest(
+            name='Projectile-clearance',
+            createStepName='Impact',
+            region=region,
             variables=(
-                'S',
-                'SVAVG',
-                'PE',
-                'ER',
-                'ERV',
-                'PEVAVG',
-                'PEEQ',
-                'PEEQVAVG',
-                'LE',
                 'U',
+            ),
+            numIntervals=1000,
+            filter='Projectile-clearance'
+        )
+        model.HistoryOutputRequest(
+            name='Projectile-velocity',
+            createStepName='Impact',
+            region=region,
+            variables=(
                 'V',
-                'A',
-                'RF',
-                'CSTRESS',
-                'NT',
-                'HFL',
-                'RFL',
-                'EVF',
-                'STATUS',
-                'SDEG',
             ),
-            numIntervals=1000
+            numIntervals=1000,
+            filter='Projectile-velocity'
         )
 
-    # Create appropriate boundary conditions for the model
     def applyBoundaryConditions(self):
         self.__encastreTargetSides()
+        if self.halfModel:
+            self.__applySymmetry()
 
     # Create initial fields of velocity and temperature
     def applyInitialFields(self):
@@ -451,6 +854,8 @@ class ImpactTestKernel():
 
     # Mesh each target layer
     def createTargetMesh(self):
+        if self.fastTarget:
+            return
         for element in self.assemblyOrder:
             name = element[0]
             inner_part = mdb.models[self.modelName].parts[name + "I"]
@@ -490,6 +895,8 @@ class ImpactTestKernel():
                 deviationFactor=0.1,
                 minSizeFactor=0.1
             )
+            if self.targetGrading:
+                self.__seedOuterPartRadially(outer_part)
             # Assign all target parts C3D8RT explicit element type with hourglass control and element deletion enabled
             elemType1 = mesh.ElemType(
                 elemCode=C3D8RT,
@@ -521,8 +928,141 @@ class ImpactTestKernel():
             inner_part.generateMesh()
             outer_part.generateMesh()
 
+    # Seed outer part's radial edges with single bias, so that element size grows geometrically from inner part's
+    # element size at the tie to target's outer bound. Radial edges of oblique target lie along its semi-major axis,
+    # so they are graded over their length stretched by 1 / cos(obliquity), like in createTargetSketches
+    def __seedOuterPartRadially(self, part):
+        from ImpactTestTarget import gradedSizes
+        growthRatio, maxSize = self.__getTargetGrading()
+        stretch = 1.0 / math.cos(math.pi * self.targetObliquity / 180.0)
+        length = (self.targetRadius - self.targetInnerRadius) * stretch
+        sizes = gradedSizes(length, self.meshElementSize, growthRatio, maxSize)
+        # Radial edges lie on partition plane and on layer's front and back faces - or are front and back edges of
+        # axisymmetric section. Smallest elements are placed at their inner ends - start of the edge if its first vertex
+        # is the inner one, its end otherwise
+        tolerance = self.meshElementSize * 1.0e-3
+        radial, depth = (0, 1) if self.axisymmetric else (1, 2)
+        starting = None
+        ending = None
+        for i, edge in enumerate(part.edges):
+            vertices = edge.getVertices()
+            if len(vertices) != 2:
+                continue
+            first = part.vertices[vertices[0]].pointOn[0]
+            second = part.vertices[vertices[1]].pointOn[0]
+            if abs(first[depth] - second[depth]) > tolerance:
+                continue
+            if not self.axisymmetric and max(abs(first[0]), abs(second[0])) > tolerance:
+                continue
+            edges = part.edges[i:i + 1]
+            if abs(first[radial]) < abs(second[radial]):
+                starting = edges if starting is None else starting + edges
+            else:
+                ending = edges if ending is None else ending + edges
+        if starting is None and ending is None:
+            return
+        seeds = {}
+        if starting is not None:
+            seeds['end1Edges'] = starting
+        if ending is not None:
+            seeds['end2Edges'] = ending
+        part.seedEdgeByBias(
+            biasMethod=SINGLE,
+            ratio=sizes[-1] / sizes[0],
+            number=len(sizes),
+            constraint=FINER,
+            **seeds
+        )
+
+    # Growth ratio and maximum element size in [m] of graded seeding of target's outer parts, None if it's disabled
+    def __getTargetGrading(self):
+        if not self.targetGrading:
+            return None
+        settings = self.targetGrading if isinstance(self.targetGrading, dict) else {}
+        return (
+            float(settings.get('growthRatio', GRADING_GROWTH_RATIO)),
+            float(settings.get('maxElementSize', self.meshElementSize * GRADING_MAX_SIZE_FACTOR))
+        )
+
+    # Estimate job's stable time increment, number of increments and solver time. If the estimate exceeds budget, the
+    # job is either flagged or its mesh is coarsened until it fits. Models derived from meshed models are only flagged
+    def estimateCost(self):
+        if not self.estimateSettings:
+            return
+        from ImpactTestConfig import LIMITS
+        from ImpactTestEstimator import ImpactTestEstimator
+        estimator = ImpactTestEstimator(self.estimateSettings)
+        report = estimator.estimate(self.__estimatedParts(), self.__calculateStepTime())
+        iterations = 0
+        # Mesh is never coarsened beyond element size limit of configurations
+        maxSize = LIMITS['meshElementSize'][1]
+        while report['overBudget'] and estimator.action == 'coarsen' and self.sourceModel is None and \
+                iterations < estimator.maxIterations and self.meshElementSize < maxSize:
+            self.meshElementSize = min(self.meshElementSize * estimator.coarseningFactor(report), maxSize)
+            self.__remesh()
+            report = estimator.estimate(self.__estimatedParts(), self.__calculateStepTime())
+            iterations += 1
+        if report['overBudget'] and estimator.action == 'coarsen' and self.meshElementSize >= maxSize:
+            report['warnings'].append(
+                "mesh element size reached its limit of %g [m], estimate is still over budget" % maxSize
+            )
+        report['meshElementSize'] = self.meshElementSize
+        report['coarsened'] = iterations
+        for warning in report['warnings']:
+            print("Warning: " + warning)
+        self.estimate = report
+        estimator.write(self.modelName, report)
+        self.profiler.runInfo('estimate', dict((key, report[key]) for key in report if key != 'parts'))
+
+    # Element counts, smallest characteristic lengths and wave speeds of all meshed parts, including target layers
+    # written directly to input file
+    def __estimatedParts(self):
+        from ImpactTestEstimator import characteristicLength, materialWaveSpeed, partMesh
+        model = mdb.models[self.modelName]
+        parts = []
+        for name, part in model.parts.items():
+            if not len(part.elements):
+                continue
+            coordinates, groups = partMesh(part)
+            parts.append(
+                {
+                    'name': name,
+                    'elements': sum(len(connectivity) for connectivity in groups),
+                    'length': min(
+                        characteristicLength(coordinates, connectivity, self.axisymmetric) for connectivity in groups
+                    ),
+                    'waveSpeed': materialWaveSpeed(model.materials[model.sections[name].material])
+                }
+            )
+        if self.fastTarget:
+            for name, layer, nodes, hexes in self.__createTargetWriter().layerMeshes():
+                parts.append(
+                    {
+                        'name': name,
+                        'elements': len(hexes),
+                        'length': characteristicLength(nodes, hexes),
+                        'waveSpeed': materialWaveSpeed(model.materials[str(layer['material'])])
+                    }
+                )
+        return parts
+
+    # Mesh all parts again with current mesh element size
+    def __remesh(self):
+        for part in mdb.models[self.modelName].parts.values():
+            # Axisymmetric parts are sections, having faces but no cells
+            if len(part.cells) or self.axisymmetric:
+                part.deleteMesh()
+        if self.axisymmetric:
+            self.createAxisymmetricMesh()
+            return
+        self.createProjectileMesh()
+        self.createTargetMesh()
+
     # Mesh projectile's core and casing
     def createProjectileMesh(self):
+        if self.projectileMeshCached:
+            # Parts are already meshed
+            return
         for part in self.projectileComponents:
             part = mdb.models[self.modelName].parts[part]
             # Make projectile's part TET free meshed - more refined meshes have to be applied manually
@@ -540,8 +1080,8 @@ class ImpactTestKernel():
             # Seed part with default mesh element size
             part.seedPart(
                 size=self.meshElementSize,
-                deviationFactor=0.1,
-                minSizeFactor=0.1
+                deviationFactor=PROJECTILE_DEVIATION_FACTOR,
+                minSizeFactor=PROJECTILE_MIN_SIZE_FACTOR
             )
             # Assign part C3D4T explicit element type
             part.setElementType(
@@ -549,17 +1089,16 @@ class ImpactTestKernel():
                     part_cells,
                 ),
                 elemTypes=(
-                    mesh.ElemType(
-                        elemCode=C3D4T,
-                        elemLibrary=EXPLICIT,
-                        secondOrderAccuracy=OFF,
-                        elemDeletion=ON,
-                        maxDegradation=0.99
-                    ),
+                    self.__projectileElementType(),
                 )
             )
             # Mesh part
             part.generateMesh()
+        if self.meshCache:
+            self.__openMeshCache().store(
+                self.__meshCacheKey(),
+                [mdb.models[self.modelName].parts[part] for part in self.projectileComponents]
+            )
 
     # Create common outer and inner target part sketches for all target layers
     def __createTargetSketches(self):
@@ -657,11 +1196,18 @@ class ImpactTestKernel():
 
     # Create 'encastre' boundary condition on sides of each target layer
     def __encastreTargetSides(self):
+        if self.fastTarget:
+            # Boundary condition is written to input file along with target layers
+            return
         assembly = mdb.models[self.modelName].rootAssembly
         # Create list of selections
         faces = []
         for layer in self.assemblyOrder:
             name = layer[0] + "O"
+            if self.halfModel:
+                # Half of outer part has single side face
+                faces.append(self.__findLayerFace(assembly.instances[name], self.targetRadius, layer[1]))
+                continue
             faces.append(assembly.instances[name].faces.getSequenceFromMask(
                 mask=
                 (
@@ -688,33 +1234,12 @@ class ImpactTestKernel():
     # Create uniform velocity field on projectile
     def __applyProjectileVelocity(self):
         assembly = mdb.models[self.modelName].rootAssembly
-        # Create selection out of casing's and core's cells
-        cells = None
-        for part in self.projectileComponents:
-            if cells is None:
-                cells = assembly.instances[part].cells.getSequenceFromMask(
-                    mask=
-                    (
-                        '[#1 ]',
-                    ),
-                )
-            else:
-                cells = cells + assembly.instances[part].cells.getSequenceFromMask(
-                    mask=
-                    (
-                        '[#1 ]',
-                    ),
-                )
-        # Create set
+        # Create set out of casing's and core's cells
         region = assembly.Set(
-            cells=cells,
-            name='Projectile-volume'
+            name='Projectile-volume',
+            **self.__projectileRegion(assembly)
         )
-        # Convert [deg] to [rad]
-        radians = self.targetObliquity * math.pi / 180.0
-        # Compute velocity vector components
-        velocityY = self.projectileVelocity * math.sin(radians)
-        velocityZ = -self.projectileVelocity * math.cos(radians)
+        velocityY, velocityZ = self.__calculateVelocityComponents()
         # Create velocity field
         mdb.models[self.modelName].Velocity(
             name='Projectile-velocity',
@@ -727,45 +1252,60 @@ class ImpactTestKernel():
             omega=0.0
         )
 
+    # Adjust existing velocity field to projectile's velocity
+    def __updateProjectileVelocity(self):
+        if self.axisymmetric:
+            mdb.models[self.modelName].predefinedFields['Projectile-velocity'].setValues(
+                velocity2=-self.projectileVelocity
+            )
+            return
+        velocityY, velocityZ = self.__calculateVelocityComponents()
+        mdb.models[self.modelName].predefinedFields['Projectile-velocity'].setValues(
+            velocity2=velocityY,
+            velocity3=velocityZ
+        )
+
+    # Compute projectile's velocity vector components in [m/s]
+    def __calculateVelocityComponents(self):
+        # Convert [deg] to [rad]
+        radians = self.targetObliquity * math.pi / 180.0
+        velocityY = self.projectileVelocity * math.sin(radians)
+        velocityZ = -self.projectileVelocity * math.cos(radians)
+        return velocityY, velocityZ
+
     # Create uniform temperature field on both target and projectile
     def __applyInitialTemperature(self):
         assembly = mdb.models[self.modelName].rootAssembly
-        # Create selection out of target's and projectile's cells
-        cells = None
-        for part in self.projectileComponents:
-            if cells is None:
-                cells = assembly.instances[part].cells.getSequenceFromMask(
-                    mask=
-                    (
-                        '[#1 ]',
-                    ),
-                )
-            else:
-                cells = cells + assembly.instances[part].cells.getSequenceFromMask(
-                    mask=
-                    (
-                        '[#1 ]',
-                    ),
-                )
-
+        # Create selection out of target's and projectile's cells - or projectile's elements if it's orphan mesh
+        region = self.__projectileRegion(assembly)
         for layer in self.assemblyOrder:
+            if self.fastTarget:
+                # Target layers' nodes are added to the set in input file
+                break
             name = layer[0]
-            cells = cells + assembly.instances[name + "I"].cells.getSequenceFromMask(
+            cells = assembly.instances[name + "I"].cells.getSequenceFromMask(
                 mask=
                 (
                     '[#1 ]',
                 ),
             )
-            cells = cells + assembly.instances[name + "O"].cells.getSequenceFromMask(
-                mask=
-                (
-                    '[#3 ]',
-                ),
-            )
+            if self.halfModel:
+                # Half of outer part is left with single cell
+                cells = cells + assembly.instances[name + "O"].cells
+            else:
+                cells = cells + assembly.instances[name + "O"].cells.getSequenceFromMask(
+                    mask=
+                    (
+                        '[#3 ]',
+                    ),
+                )
+            if 'cells' in region:
+                cells = region['cells'] + cells
+            region['cells'] = cells
         # Create set
         region = assembly.Set(
-            cells=cells,
-            name='Entire-mass'
+            name='Entire-mass',
+            **region
         )
         # Create temperature field
         mdb.models[self.modelName].Temperature(
@@ -784,75 +1324,154 @@ class ImpactTestKernel():
     # Write job input file, inject surface sets and set interactions between them - it's a workaround that will
     # hopefully solve the problem with setting interior/exterior surface sets in Abaqus
     def injectContactToInput(self):
-        job = mdb.models[self.modelName].jobs[self.modelName]
+        job = mdb.jobs[self.modelName]
         job.writeInput(
             consistencyChecking=OFF
         )
+        target = None
+        rewriter = InputRewriter(self.__getInputFilename())
+        if self.fastTarget:
+            # Input file has just been rewritten, so target layers have to be injected again
+            target = self.__createTargetWriter()
+            self.__addTargetHooks(rewriter, target)
+        self.__addContactHooks(rewriter, target)
+        rewriter.rewrite()
+        self.__checkContactSurfaces(target)
+
+    # Inject target layers' parts, instances, sets, ties and boundary conditions to job input file, along with surface
+    # sets and interactions - fake surfaces created in Abaqus/CAE lie on projectile, since target layers don't exist
+    # there
+    def injectTargetToInput(self):
+        target = self.__createTargetWriter()
+        rewriter = InputRewriter(self.__getInputFilename())
+        self.__addTargetHooks(rewriter, target)
+        self.__addContactHooks(rewriter, target)
+        rewriter.rewrite()
+        self.__checkContactSurfaces(target)
+        self.profiler.runInfo('targetElements', dict(target.instanceElementCounts()))
+
+    # Set up replacement of fake surfaces and interactions created in Abaqus/CAE with surface sets of all instances'
+    # elements and general contact between them
+    def __addContactHooks(self, rewriter, target):
+        for surface in ('Exterior', 'Interior-Brown', 'Interior-Purple'):
+            rewriter.remove(isKeyword('*Surface', name=surface))
+        for keyword in ('*Contact', '*Contact Inclusions', '*Contact Property Assignment'):
+            rewriter.remove(isKeyword(keyword))
+        rewriter.insertBefore(isKeyword('*End Assembly'), self.__surfaceSetLines(target))
+        rewriter.insertAfter(hasData('*Initial Conditions', 'Entire-mass'), self.__interactionLines())
+
+    # Check that rewritten input file's Exterior and Interior-Brown surfaces include elements of all target layers'
+    # instances - projectile would pass through the target unopposed otherwise
+    def __checkContactSurfaces(self, target):
         filename = self.__getInputFilename()
-        lines = self.__obtainLines(filename)
-        lines = self.__insertInteractions(lines)
-        lines = self.__insertSurfaceSet(lines)
-        self.__overrideInput(lines, filename)
-
-    # Load original input file and read its lines
-    def __obtainLines(self, filename):
-        with open(filename) as file:
-            lines = [line.strip('\n') for line in file.readlines()]
-            file.close()
-        return lines
-
-    # Insert surface set definition to input file lines
-    def __insertSurfaceSet(self, lines):
-        newlines = []
-        newlines.append('**')
-        newlines.append('** ELEMENT SURFACE SETS')
-        newlines.append('**')
-        for inst in mdb.models[self.modelName].rootAssembly.instances.values():
-            newlines.append('** %s' % inst.name)
-            newlines.append('** %s' % inst.name)
-        index = self.__getEndAssemblyIdx(lines)
-        lines[index:index] = newlines
-        # TODO: Implement surface set definition insertion
-        return lines
-
-    # Insert interaction definition to input file lines
-    def __insertInteractions(self, lines):
-        newlines = []
-        newlines.append('**')
-        newlines.append('** INTERACTIONS')
-        newlines.append('**')
-        index = self.__getLastMaterialConstantIdx(lines)
-        lines[index:index] = newlines
-        # TODO: Implement interaction definition insertion
-        return lines
-
-    # Override input file with modified lines
-    def __overrideInput(self, lines, filename):
-        with open(filename, 'w') as file:
-            for line in lines:
-                file.write("%s\n" % line)
-            file.close()
-        return
-
-    # Obtain input filename
+        targets = [name for name, count in self.__instanceElementCounts(target) if name.startswith('Target-')]
+        with InputIndex(filename, cache=False) as index:
+            for surface in ('Exterior', 'Interior-Brown'):
+                elsets = []
+                for entry in index.find('*Surface', name=surface):
+                    elsets += [line.split(',')[0].strip() for line in index.dataLines(entry)]
+                missing = [name for name in targets if name + '-elements' not in elsets]
+                if not targets or missing:
+                    raise ValueError(
+                        "Surface %s of %s lacks target instances' elements: %s" % (
+                            surface,
+                            filename,
+                            ', '.join(missing) or 'no target instances'
+                        )
+                    )
+
+    # Create writer of target layers' input file definitions
+    def __createTargetWriter(self):
+        from ImpactTestTarget import ImpactTestTarget
+        return ImpactTestTarget(
+            self.targetLayers,
+            self.targetRadius,
+            self.targetInnerRadius,
+            self.targetObliquity,
+            self.meshElementSize,
+            self.__getTargetGrading(),
+            self.halfModel
+        )
+
+    # Set up insertion of target layers' definitions at their anchors in input file
+    def __addTargetHooks(self, rewriter, target):
+        rewriter.insertBefore(isComment('** ASSEMBLY'), target.partLines())
+        rewriter.insertAfter(isKeyword('*Assembly'), target.instanceLines())
+        rewriter.insertBefore(isKeyword('*End Assembly'), target.assemblyLines())
+        rewriter.insertAfter(isKeyword('*End Assembly'), target.modelLines())
+        profile = self.__getOutputProfile()
+        if profile['fieldRegion'] != 'model':
+            rewriter.insertBefore(isKeyword('*End Step'), self.__targetOutputLines(profile))
+
+    # Yield field output definition of fast target's inner parts - same as the one created in Abaqus/CAE for
+    # projectile
+    def __targetOutputLines(self, profile):
+        nodal = [variable for variable in profile['fieldVariables'] if variable in NODAL_OUTPUTS]
+        elemental = [variable for variable in profile['fieldVariables'] if variable not in NODAL_OUTPUTS]
+        yield '**'
+        yield '** FIELD OUTPUT: F-Target-inner'
+        yield '**'
+        yield '*Output, field, number interval=%d' % profile['fieldIntervals']
+        if nodal:
+            yield '*Node Output, nset=Target-inner'
+            yield ', '.join(nodal)
+        if elemental:
+            yield '*Element Output, elset=Target-inner, directions=YES'
+            yield ', '.join(elemental)
+
+    # Yield surface set definitions - exterior faces of all instances and interior faces of target's and projectile's
+    # instances, exposed as elements are deleted
+    def __surfaceSetLines(self, target):
+        counts = self.__instanceElementCounts(target)
+        yield '**'
+        yield '** ELEMENT SURFACE SETS'
+        yield '**'
+        for name, count in counts:
+            yield '*Elset, elset=%s-elements, instance=%s, generate' % (name, name)
+            yield ' 1, %d, 1' % count
+        yield '*Surface, type=ELEMENT, name=Exterior'
+        for name, count in counts:
+            yield '%s-elements, ' % name
+        yield '*Surface, type=ELEMENT, name=Interior-Brown'
+        for name, count in counts:
+            if name.startswith('Target-'):
+                yield '%s-elements, INTERIOR' % name
+        yield '*Surface, type=ELEMENT, name=Interior-Purple'
+        for name, count in counts:
+            if name.startswith('Projectile-'):
+                yield '%s-elements, INTERIOR' % name
+
+    # Names and element counts of Abaqus/CAE model's instances, and of fast target's instances if it's given.
+    # Dependent instances' elements are labelled consecutively starting from 1
+    def __instanceElementCounts(self, target):
+        counts = [
+            (instance.name, len(instance.elements)) for instance in
+            mdb.models[self.modelName].rootAssembly.instances.values()
+        ]
+        if target is not None:
+            counts += target.instanceElementCounts()
+        return counts
+
+    # Yield general contact definition between surface sets - same pairs as in createInteractions
+    def __interactionLines(self):
+        yield '**'
+        yield '** INTERACTIONS'
+        yield '**'
+        yield '** Interaction: Contact'
+        yield '*Contact, op=NEW'
+        yield '*Contact Inclusions'
+        yield 'Exterior, '
+        yield 'Exterior, Interior-Brown'
+        yield 'Interior-Brown, Exterior'
+        yield 'Interior-Purple, '
+        yield 'Interior-Brown, Interior-Purple'
+        yield 'Interior-Purple, Interior-Brown'
+        yield '*Contact Property Assignment'
+        yield ' ,  , InteractionProperties'
+
+    # Obtain input filename - job's input file is written to the working directory
     def __getInputFilename(self):
-        fname = __file__
-        for i in range(0, 7):
-            fname = os.path.dirname(fname)
-        fname = fname + "/Commands/"+self.modelName+".inp"
-        return fname
-
-    # Obtain line index under which our properties should be inserted
-    def __getLastMaterialConstantIdx(self, lines):
-        for line in reversed(lines):
-            if line.startswith('Entire-mass'):
-                return lines.index(line) + 1
-
-    # Find index of the line after '*End Assembly [...]' line
-    def __getEndAssemblyIdx(self, lines):
-        for line in reversed(lines):
-            if line.startswith('*End Assembly'):
-                return lines.index(line) - 1
+        return os.path.abspath(self.modelName + ".inp")
 
     # Adjust materials' displacement criterion for J-C damage evolution to failure coefficient
     def adjustDisplacementsAtFailure(self):
@@ -886,17 +1505,30 @@ class ImpactTestKernel():
     def createFakeSurfaceSets(self):
         # FIXME: Make Surface objects actually re-definable as mesh surfaces
         assembly = mdb.models[self.modelName].rootAssembly
-        faces = assembly.instances['Target-L001I'].faces
-        faces = faces.getSequenceFromMask(
-            mask=
-            (
-                '[#2 ]',
-            ),
-        )
-        faceSet = assembly.Set(
-            faces=faces,
-            name='Fake-contact-set'
-        )
+        instance = 'Target-L001I'
+        if self.fastTarget:
+            # Target layers don't exist in Abaqus/CAE model
+            instance = self.projectileComponents[0]
+        if self.fastTarget and self.projectileMeshCached:
+            # Orphan mesh has no faces, single element is selected instead
+            faceSet = assembly.Set(
+                elements=assembly.instances[instance].elements[0:1],
+                name='Fake-contact-set'
+            )
+        else:
+            faces = assembly.instances[instance].faces
+            if not self.axisymmetric:
+                # Axisymmetric section has single face
+                faces = faces.getSequenceFromMask(
+                    mask=
+                    (
+                        '[#2 ]',
+                    ),
+                )
+            faceSet = assembly.Set(
+                faces=faces,
+                name='Fake-contact-set'
+            )
         assembly.SurfaceFromElsets(
             name="Interior-Brown",
             elementSetSeq=
@@ -949,40 +1581,42 @@ class ImpactTestKernel():
         ext = mdb.models[self.modelName].rootAssembly.surfaces['Exterior']
         inb = mdb.models[self.modelName].rootAssembly.surfaces['Interior-Brown']
         inp = mdb.models[self.modelName].rootAssembly.surfaces['Interior-Purple']
+        pairs = (
+            (
+                ext,
+                SELF
+            ),
+            (
+                ext,
+                inb
+            ),
+            (
+                inb,
+                ext
+            ),
+            (
+                inp,
+                SELF
+            ),
+            (
+                inb,
+                inp
+            ),
+            (
+                inp,
+                inb
+            ),
+            (
+                inp,
+                SELF
+            )
+        )
         mdb.models[self.modelName].interactions['Contact'].includedPairs.setValuesInStep(
             stepName='Initial',
             useAllstar=OFF,
-            addPairs=(
-                (
-                    ext,
-                    SELF
-                ),
-                (
-                    ext,
-                    inb
-                ),
-                (
-                    inb,
-                    ext
-                ),
-                (
-                    inp,
-                    SELF
-                ),
-                (
-                    inb,
-                    inp
-                ),
-                (
-                    inp,
-                    inb
-                ),
-                (
-                    inp,
-                    SELF
-                )
-            )
+            addPairs=pairs
         )
+        self.contactPairs = len(pairs)
         mdb.models[self.modelName].interactions['Contact'].contactPropertyAssignments.appendInStep(
             stepName='Initial',
             assignments=(
@@ -995,26 +1629,36 @@ class ImpactTestKernel():
         )
 
     def createTieConstraints(self):
+        if self.fastTarget:
+            # Ties are written to input file along with target layers
+            return
         for layer in self.assemblyOrder:
             name = layer[0]
             inner_name = name + "I"
             outer_name = name + "O"
             assembly = mdb.models[self.modelName].rootAssembly
-            inner_faces = assembly.instances[inner_name].faces.getSequenceFromMask(
-                mask=(
-                  '[#1 ]',
-                ),
-            )
+            if self.halfModel:
+                # Halves of layer's parts meet at single face
+                inner_faces = self.__findLayerFace(assembly.instances[inner_name], self.targetInnerRadius, layer[1])
+            else:
+                inner_faces = assembly.instances[inner_name].faces.getSequenceFromMask(
+                    mask=(
+                      '[#1 ]',
+                    ),
+                )
             assembly.Surface(
                 side1Faces=inner_faces,
                 name=inner_name + "_TIE"
             )
             inner_region = assembly.surfaces[inner_name+"_TIE"]
-            outer_faces = assembly.instances[outer_name].faces.getSequenceFromMask(
-                mask=(
-                  '[#a0 ]',
-                ),
-            )
+            if self.halfModel:
+                outer_faces = self.__findLayerFace(assembly.instances[outer_name], self.targetInnerRadius, layer[1])
+            else:
+                outer_faces = assembly.instances[outer_name].faces.getSequenceFromMask(
+                    mask=(
+                      '[#a0 ]',
+                    ),
+                )
             assembly.Surface(
                 side1Faces=outer_faces,
                 name=outer_name + "_TIE"
@@ -1029,7 +1673,582 @@ class ImpactTestKernel():
                 constraintEnforcement=SURFACE_TO_SURFACE
             )
 
+    # Create axisymmetric sections of target layers' inner and outer parts, and replace projectile's parts with
+    # sections drawn from their components' profiles. Sections lie in XY plane, with Y axis as axis of symmetry
+    def createAxisymmetricParts(self):
+        model = mdb.models[self.modelName]
+        self.__registerTargetLayers()
+        for layer, element in zip(self.targetLayers, self.assemblyOrder):
+            name = element[0]
+            thickness = element[1]
+            for part_name, start, end in (
+                    (name + "I", 0.0, self.targetInnerRadius),
+                    (name + "O", self.targetInnerRadius, self.targetRadius)
+            ):
+                part = self.__createAxisymmetricPart(
+                    part_name,
+                    [
+                        (start, 0.0),
+                        (end, 0.0),
+                        (end, thickness),
+                        (start, thickness)
+                    ]
+                )
+                # Assign target layer its material
+                model.HomogeneousSolidSection(
+                    part_name,
+                    str(layer['material'])
+                )
+                part.SectionAssignment(
+                    sectionName=part_name,
+                    region=regionToolset.Region(
+                        faces=part.faces
+                    )
+                )
+        profiles = ImpactTestLibrary.projectileProfiles(self.projectileType)
+        for i, profile in enumerate(profiles):
+            name = ImpactTestLibrary.componentName(self.projectileType, i)
+            if profile is None:
+                raise ValueError("Projectile's component %s has no axisymmetric profile in elements.cfg" % name)
+            self.projectileNose = min([axial for radius, axial in profile] + [self.projectileNose])
+            # Closing point is implied
+            if profile[0] == profile[-1]:
+                profile = profile[:-1]
+            # Section of the same name is already assigned its component's material
+            del model.parts[name]
+            part = self.__createAxisymmetricPart(name, profile)
+            part.SectionAssignment(
+                sectionName=name,
+                region=regionToolset.Region(
+                    faces=part.faces
+                )
+            )
+
+    # Create axisymmetric part out of closed outline given by points in [m]
+    def __createAxisymmetricPart(self, name, points):
+        model = mdb.models[self.modelName]
+        sketch = model.ConstrainedSketch(name + "-Section", self.targetRadius * 2.0)
+        # Axis of symmetry
+        sketch.ConstructionLine(
+            point1=(0.0, -self.targetRadius),
+            point2=(0.0, self.targetRadius)
+        )
+        for point1, point2 in zip(points, points[1:] + points[:1]):
+            sketch.Line(
+                point1=point1,
+                point2=point2
+            )
+        part = model.Part(
+            name,
+            dimensionality=AXISYMMETRIC,
+            type=DEFORMABLE_BODY
+        )
+        part.BaseShell(
+            sketch=sketch
+        )
+        return part
+
+    # Create axisymmetric model assembly - target layers placed one behind another below XZ plane and projectile
+    # above them, travelling along Y axis
+    def createAxisymmetricAssembly(self):
+        assembly = mdb.models[self.modelName].rootAssembly
+        assembly.DatumCsysByDefault(CARTESIAN)
+        offset = 0.0
+        previousSpacing = 0.0
+        for element in self.assemblyOrder:
+            name = element[0]
+            offset -= element[1] + previousSpacing
+            previousSpacing = element[2]
+            for part_name in (name + "O", name + "I"):
+                assembly.Instance(
+                    name=part_name,
+                    part=mdb.models[self.modelName].parts[part_name],
+                    dependent=ON
+                )
+            assembly.translate(
+                instanceList=
+                (
+                    name + "O",
+                    name + "I"
+                ),
+                vector=
+                (
+                    0.0,
+                    offset,
+                    0.0
+                )
+            )
+        for part in self.projectileComponents:
+            assembly.Instance(
+                name=part,
+                part=mdb.models[self.modelName].parts[part],
+                dependent=ON
+            )
+        # Projectile's nose placed 0.5 [mm] away from the target, like in three dimensional models
+        assembly.translate(
+            instanceList=
+            self.projectileComponents,
+            vector=
+            (
+                0.0,
+                0.0005 - self.projectileNose,
+                0.0
+            )
+        )
+
+    # Mesh target layers' sections with structured and projectile's sections with free quad dominated mesh
+    def createAxisymmetricMesh(self):
+        model = mdb.models[self.modelName]
+        for element in self.assemblyOrder:
+            for part_name, size in (
+                    (element[0] + "I", self.meshElementSize),
+                    (element[0] + "O", self.meshElementSize * 4.0)
+            ):
+                part = model.parts[part_name]
+                part.setMeshControls(
+                    regions=part.faces,
+                    elemShape=QUAD,
+                    technique=STRUCTURED
+                )
+                part.seedPart(
+                    size=size,
+                    deviationFactor=0.1,
+                    minSizeFactor=0.1
+                )
+                if part_name.endswith("O") and self.__getTargetGrading() is not None:
+                    self.__seedOuterPartRadially(part)
+                part.setElementType(
+                    regions=(
+                        part.faces,
+                    ),
+                    elemTypes=self.__axisymmetricElementTypes()
+                )
+                part.generateMesh()
+        for part_name in self.projectileComponents:
+            part = model.parts[part_name]
+            part.setMeshControls(
+                regions=part.faces,
+                elemShape=QUAD_DOMINATED,
+                technique=FREE,
+                algorithm=ADVANCING_FRONT
+            )
+            part.seedPart(
+                size=self.meshElementSize,
+                deviationFactor=PROJECTILE_DEVIATION_FACTOR,
+                minSizeFactor=PROJECTILE_MIN_SIZE_FACTOR
+            )
+            part.setElementType(
+                regions=(
+                    part.faces,
+                ),
+                elemTypes=self.__axisymmetricElementTypes()
+            )
+            part.generateMesh()
+
+    # Explicit element types of axisymmetric parts - CAX4RT quadrilaterals and CAX3T triangles
+    def __axisymmetricElementTypes(self):
+        return (
+            mesh.ElemType(
+                elemCode=CAX4RT,
+                elemLibrary=EXPLICIT,
+                secondOrderAccuracy=OFF,
+                hourglassControl=ENHANCED,
+                distortionControl=DEFAULT,
+                elemDeletion=ON,
+                maxDegradation=0.99
+            ),
+            mesh.ElemType(
+                elemCode=CAX3T,
+                elemLibrary=EXPLICIT,
+                secondOrderAccuracy=OFF,
+                elemDeletion=ON,
+                maxDegradation=0.99
+            )
+        )
+
+    # Tie inner and outer section of each target layer along their common edge
+    def createAxisymmetricTieConstraints(self):
+        assembly = mdb.models[self.modelName].rootAssembly
+        for layer in self.assemblyOrder:
+            name = layer[0]
+            for part_name in (name + "I", name + "O"):
+                assembly.Surface(
+                    side1Edges=self.__findSectionEdge(assembly.instances[part_name], self.targetInnerRadius, layer[1]),
+                    name=part_name + "_TIE"
+                )
+            mdb.models[self.modelName].Tie(
+                name=name + "_TIE",
+                master=assembly.surfaces[name + "O_TIE"],
+                slave=assembly.surfaces[name + "I_TIE"],
+                positionToleranceMethod=COMPUTED,
+                adjust=ON,
+                constraintEnforcement=SURFACE_TO_SURFACE
+            )
+
+    # Find target section's edge at given radius in [m] - inner section's rim, outer section's inner rim or side. Part's
+    # coordinates are used, as edges of dependent instances are indexed like part's edges
+    def __findSectionEdge(self, instance, radius, thickness):
+        edge = instance.part.edges.findAt(
+            (
+                (
+                    radius,
+                    0.5 * thickness,
+                    0.0
+                ),
+            )
+        )[0]
+        return instance.edges[edge.index:edge.index + 1]
+
+    # Create velocity field along axis of symmetry on projectile and temperature field on the whole model
+    def applyAxisymmetricInitialFields(self):
+        assembly = mdb.models[self.modelName].rootAssembly
+        region = assembly.Set(
+            name='Projectile-volume',
+            **self.__projectileRegion(assembly)
+        )
+        mdb.models[self.modelName].Velocity(
+            name='Projectile-velocity',
+            region=region,
+            field='',
+            distributionType=MAGNITUDE,
+            velocity1=0.0,
+            velocity2=-self.projectileVelocity,
+            velocity3=0.0,
+            omega=0.0
+        )
+        faces = self.__projectileRegion(assembly)['faces']
+        for layer in self.assemblyOrder:
+            faces = faces + assembly.instances[layer[0] + "I"].faces + assembly.instances[layer[0] + "O"].faces
+        region = assembly.Set(
+            name='Entire-mass',
+            faces=faces
+        )
+        mdb.models[self.modelName].Temperature(
+            name='Temperature',
+            createStepName='Initial',
+            region=region,
+            distributionType=UNIFORM,
+            crossSectionDistribution=CONSTANT_THROUGH_THICKNESS,
+            # 293.15 [K] equals to 20 [*C]
+            magnitudes=
+            (
+                293.15,
+            )
+        )
+
+    # Fix outer edges of target layers' sections and prevent radial displacement of edges lying on axis of symmetry
+    def applyAxisymmetricBoundaryConditions(self):
+        assembly = mdb.models[self.modelName].rootAssembly
+        edges = None
+        for layer in self.assemblyOrder:
+            items = self.__findSectionEdge(assembly.instances[layer[0] + "O"], self.targetRadius, layer[1])
+            edges = items if edges is None else edges + items
+        region = assembly.Set(
+            edges=edges,
+            name='Target-sides'
+        )
+        mdb.models[self.modelName].EncastreBC(
+            name='Fix-sides',
+            createStepName='Initial',
+            region=region,
+            localCsys=None
+        )
+        tolerance = self.meshElementSize * 1.0e-3
+        edges = None
+        for instance in assembly.instances.values():
+            items = instance.edges.getByBoundingBox(
+                xMin=-tolerance,
+                yMin=-HALF_MODEL_BOUND,
+                zMin=-HALF_MODEL_BOUND,
+                xMax=tolerance,
+                yMax=HALF_MODEL_BOUND,
+                zMax=HALF_MODEL_BOUND
+            )
+            edges = items if edges is None else edges + items
+        region = assembly.Set(
+            edges=edges,
+            name='Axis'
+        )
+        mdb.models[self.modelName].XsymmBC(
+            name='Axis',
+            createStepName='Initial',
+            region=region,
+            localCsys=None
+        )
+
     def prepareProjectileParts(self):
         for part_name in mdb.models[self.modelName].parts.keys():
             if part_name.startswith("Projectile-"+self.projectileType):
                 self.projectileComponents.append(part_name)
+        # Replace projectile's parts with cached meshes before they are instanced
+        if self.meshCache:
+            paths = self.__openMeshCache().lookup(self.__meshCacheKey(), self.projectileComponents)
+            if paths is not None:
+                self.__importCachedProjectileMesh(paths)
+        # Cached meshes of half model are already halved
+        if self.halfModel and not self.projectileMeshCached:
+            for part in self.projectileComponents:
+                self.__halvePart(mdb.models[self.modelName].parts[part])
+
+    # Cut part by YZ plane and remove its half of negative X coordinates
+    def __halvePart(self, part):
+        datum = part.DatumPlaneByPrincipalPlane(
+            principalPlane=YZPLANE,
+            offset=0.0
+        )
+        part.PartitionCellByDatumPlane(
+            datumPlane=part.datums[datum.id],
+            cells=part.cells
+        )
+        self.__removeNegativeHalf(part)
+
+    # Remove part's cells of negative X coordinates - part has to be partitioned by YZ plane already. Removed cells
+    # are left as shells, so their faces not bounding any remaining cell are removed as well
+    def __removeNegativeHalf(self, part):
+        tolerance = self.meshElementSize * 1.0e-3
+        part.RemoveCells(
+            cellList=part.cells.getByBoundingBox(
+                xMin=-HALF_MODEL_BOUND,
+                yMin=-HALF_MODEL_BOUND,
+                zMin=-HALF_MODEL_BOUND,
+                xMax=tolerance,
+                yMax=HALF_MODEL_BOUND,
+                zMax=HALF_MODEL_BOUND
+            )
+        )
+        faces = self.__findFreeFaces(part)
+        if faces is not None:
+            part.RemoveFaces(
+                faceList=faces,
+                deleteCells=False
+            )
+        if self.__findFreeFaces(part) is not None or any(cell.pointOn[0][0] < -tolerance for cell in part.cells):
+            raise ValueError("Negative half of part %s hasn't been removed" % part.name)
+
+    # Find part's faces bounding none of its cells, None if there are no such faces
+    def __findFreeFaces(self, part):
+        faces = None
+        for i, face in enumerate(part.faces):
+            if not face.getCells():
+                faces = part.faces[i:i + 1] if faces is None else faces + part.faces[i:i + 1]
+        return faces
+
+    # Find half target layer's face crossing positive X axis at given radius in [m] - inner part's rim, outer part's
+    # inner rim or side. Part's coordinates are used, as faces of dependent instances are indexed like part's faces.
+    # Layer's faces are swept along oblique path, like in createTargetParts
+    def __findLayerFace(self, instance, radius, thickness):
+        depth = 0.5 * thickness
+        face = instance.part.faces.findAt(
+            (
+                (
+                    radius,
+                    -depth * math.sin(math.pi * self.targetObliquity / 180.0),
+                    depth
+                ),
+            )
+        )[0]
+        return instance.faces[face.index:face.index + 1]
+
+    # Create symmetry boundary condition on faces of instances lying on YZ plane - or their nodes, if instances are
+    # orphan meshes loaded from mesh cache
+    def __applySymmetry(self):
+        assembly = mdb.models[self.modelName].rootAssembly
+        tolerance = self.meshElementSize * 1.0e-3
+        bounds = {
+            'xMin': -tolerance,
+            'yMin': -HALF_MODEL_BOUND,
+            'zMin': -HALF_MODEL_BOUND,
+            'xMax': tolerance,
+            'yMax': HALF_MODEL_BOUND,
+            'zMax': HALF_MODEL_BOUND
+        }
+        faces = None
+        nodes = None
+        for instance in assembly.instances.values():
+            if len(instance.cells):
+                items = instance.faces.getByBoundingBox(**bounds)
+                faces = items if faces is None else faces + items
+            else:
+                items = instance.nodes.getByBoundingBox(**bounds)
+                nodes = items if nodes is None else nodes + items
+        # Geometry and mesh can't be combined in one set
+        for name, key, items in (('Symmetry-plane', 'faces', faces), ('Symmetry-nodes', 'nodes', nodes)):
+            if items is None:
+                continue
+            region = assembly.Set(
+                name=name,
+                **{key: items}
+            )
+            mdb.models[self.modelName].XsymmBC(
+                name=name,
+                createStepName='Initial',
+                region=region,
+                localCsys=None
+            )
+
+    # Replace configured inner radius with the one recommended for projectile, obliquity and target's thickness, and
+    # report estimated target element counts of both
+    def sizeInnerRadius(self):
+        if not self.autoInnerRadius:
+            return
+        projectileRadius, projectileLength = self.__calculateProjectileDimensions()
+        settings = self.autoInnerRadius if isinstance(self.autoInnerRadius, dict) else {}
+        factor = float(settings.get('factor', INNER_RADIUS_FACTOR))
+        radians = math.pi * self.targetObliquity / 180.0
+        # Damage zone, widened along inclined direction by projectile's path through the target. Inner part's sketch
+        # is stretched along that direction by 1 / cos(obliquity) already
+        radius = max(
+            factor * projectileRadius,
+            (factor * projectileRadius + self.__calculateTargetAbsoluteThickness() * math.tan(radians)) *
+            math.cos(radians),
+            projectileRadius + INNER_RADIUS_MIN_ELEMENTS * self.meshElementSize
+        )
+        self.targetInnerRadius = min(radius, INNER_RADIUS_MAX_FRACTION * self.targetRadius)
+        configuredElements = self.__estimateTargetElements(self.configuredInnerRadius)
+        elements = self.__estimateTargetElements(self.targetInnerRadius)
+        self.profiler.runInfo(
+            'innerRadius',
+            {
+                'projectileRadius': projectileRadius,
+                'projectileLength': projectileLength,
+                'configured': self.configuredInnerRadius,
+                'recommended': radius,
+                'applied': self.targetInnerRadius,
+                'configuredElements': configuredElements,
+                'elements': elements,
+                'elementSaving': configuredElements - elements
+            }
+        )
+
+    # Compute projectile's radius and length in [m] from its parts' bounding boxes - projectile's axis is Z axis of
+    # its parts
+    def __calculateProjectileDimensions(self):
+        radius = 0.0
+        low = None
+        high = None
+        for name, part in mdb.models[self.modelName].parts.items():
+            if not name.startswith("Projectile-" + self.projectileType):
+                continue
+            # Orphan meshes loaded from mesh cache have no cells
+            if len(part.cells):
+                box = part.cells.getBoundingBox()
+            else:
+                box = part.nodes.getBoundingBox()
+            radius = max([radius] + [abs(value) for value in box['low'][:2] + box['high'][:2]])
+            low = box['low'][2] if low is None else min(low, box['low'][2])
+            high = box['high'][2] if high is None else max(high, box['high'][2])
+        return radius, high - low
+
+    # Estimate number of target's elements with given inner radius - as if target was written to input file
+    def __estimateTargetElements(self, innerRadius):
+        from ImpactTestTarget import ImpactTestTarget
+        return ImpactTestTarget(
+            self.targetLayers,
+            self.targetRadius,
+            innerRadius,
+            self.targetObliquity,
+            self.meshElementSize,
+            self.__getTargetGrading(),
+            self.halfModel
+        ).elementCount()
+
+    # Open projectile mesh cache configured by meshCache
+    def __openMeshCache(self):
+        from ImpactTestCache import ImpactTestCache, CACHE_DIRECTORY, MAX_SIZE
+        settings = self.meshCache if isinstance(self.meshCache, dict) else {}
+        return ImpactTestCache(
+            settings.get('directory', CACHE_DIRECTORY),
+            settings.get('maxSize', MAX_SIZE)
+        )
+
+    # Key of projectile's mesh in mesh cache
+    def __meshCacheKey(self):
+        return self.__openMeshCache().key(
+            self.projectileType,
+            self.meshElementSize,
+            PROJECTILE_DEVIATION_FACTOR,
+            PROJECTILE_MIN_SIZE_FACTOR,
+            half=self.halfModel
+        )
+
+    # Replace projectile's parts with orphan mesh parts read from mesh cache, assigning them sections and element
+    # types of meshed parts
+    def __importCachedProjectileMesh(self, paths):
+        model = mdb.models[self.modelName]
+        for name, path in zip(self.projectileComponents, paths):
+            del model.parts[name]
+            model.PartFromInputFile(
+                inputFileName=path
+            )
+            part = model.parts[name]
+            region = part.Set(
+                elements=part.elements,
+                name='volume'
+            )
+            part.SectionAssignment(
+                sectionName=name,
+                region=region
+            )
+            part.setElementType(
+                regions=region,
+                elemTypes=(
+                    self.__projectileElementType(),
+                )
+            )
+        self.projectileMeshCached = True
+
+    # Explicit element type of projectile's parts
+    def __projectileElementType(self):
+        return mesh.ElemType(
+            elemCode=C3D4T,
+            elemLibrary=EXPLICIT,
+            secondOrderAccuracy=OFF,
+            elemDeletion=ON,
+            maxDegradation=0.99
+        )
+
+    # Instances of projectile's parts as set arguments - their cells, faces if parts are axisymmetric sections, or
+    # elements if parts are orphan meshes
+    def __projectileRegion(self, assembly):
+        sequence = None
+        for part in self.projectileComponents:
+            instance = assembly.instances[part]
+            if self.projectileMeshCached:
+                items = instance.elements
+            elif self.axisymmetric:
+                items = instance.faces
+            else:
+                items = instance.cells.getSequenceFromMask(
+                    mask=
+                    (
+                        '[#1 ]',
+                    ),
+                )
+            sequence = items if sequence is None else sequence + items
+        if self.projectileMeshCached:
+            return {'elements': sequence}
+        if self.axisymmetric:
+            return {'faces': sequence}
+        return {'cells': sequence}
+
+    # Add target layers' names, thicknesses and spacings to auxiliary layer list without creating their parts
+    def __registerTargetLayers(self):
+        i = 1
+        for layer in self.targetLayers:
+            self.assemblyOrder.append(
+                (
+                    'Target-L' + str(i).zfill(3),
+                    layer['thickness'],
+                    layer['spacing']
+                )
+            )
+            i += 1
+
+    # Remove parts of projectiles other than selected one, copied from template model
+    def __removeRedundantProjectiles(self):
+        parts = mdb.models[self.modelName].parts
+        for part_name in parts.keys():
+            if not part_name.startswith("Projectile-"):
+                continue
+            if part_name[:-3] != ("Projectile-" + self.projectileType):
+                del parts[part_name]
@@ -0,0 +1,352 @@
+import json
+import os
+import pickle
+import shlex
+import subprocess
+import sys
+import threading
+import time
+
+# Plugin's directories of material libraries and projectile parts
+PLUGIN_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+MATERIALS_DIRECTORY = os.path.join(PLUGIN_DIRECTORY, "Materials")
+PARTS_DIRECTORY = os.path.join(PLUGIN_DIRECTORY, "Parts")
+# Index of materials of all libraries, stored along with material libraries
+INDEX_FILE = "materials.idx"
+# Projectile's parts cached in Abaqus/CAE database, stored in projectile's directory along with their sources' stamps
+PART_CACHE = "Projectile-cache.cae"
+PART_CACHE_STAMP = "Projectile-cache.json"
+# Name of the model holding cached parts
+PART_CACHE_MODEL = "Model-1"
+# Command writing projectile's part cache in separate Abaqus/CAE session, started in the background once parts are
+# created from ACIS file, if it's requested - {script} is this module, {projectile} is projectile's type
+PART_CACHE_COMMAND = "abaqus cae noGUI={script} -- {projectile}"
+# Lock file of part cache being written, so concurrent sessions don't write it at once, and its age in [s] after
+# which it's considered abandoned
+PART_CACHE_LOCK = "Projectile-cache.lock"
+PART_CACHE_LOCK_AGE = 3600.0
+
+
+# Load material index, refreshing entries of libraries added, changed or removed since it was stored. Index maps
+# library's path to its modification time, size and materials, each material's name is mapped to its version and
+# data string
+def loadIndex(directory=MATERIALS_DIRECTORY):
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+    indexFilename = os.path.join(directory, INDEX_FILE)
+    index = {}
+    if os.path.exists(indexFilename):
+        try:
+            with open(indexFilename, 'rb') as file:
+                index = pickle.load(file)
+        except Exception:
+            # Damaged or incompatible index is simply rebuilt
+            index = {}
+    changed = False
+    libraries = {}
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith(".lib"):
+            continue
+        path = os.path.join(directory, filename)
+        status = os.stat(path)
+        stamp = (status.st_mtime, status.st_size)
+        entry = index.get(path)
+        if entry is None or entry['stamp'] != stamp:
+            entry = {
+                'stamp': stamp,
+                'materials': readLibrary(path)
+            }
+            changed = True
+        libraries[path] = entry
+    if changed or len(libraries) != len(index):
+        temporary = indexFilename + ".tmp"
+        with open(temporary, 'wb') as file:
+            pickle.dump(libraries, file, 2)
+        if os.path.exists(indexFilename):
+            os.remove(indexFilename)
+        os.rename(temporary, indexFilename)
+    return libraries
+
+
+# Unpickle material library, returning dictionary of its materials' names and their versions and data strings
+def readLibrary(path):
+    # Libraries are text pickles - line endings are normalized the way text mode reading does on Windows, so they
+    # can be read by Python 3 interpreters as well
+    with open(path, 'rb') as file:
+        data = file.read().replace(b'\r\n', b'\n')
+    if sys.version_info[0] < 3:
+        lib = pickle.loads(data)
+    else:
+        lib = pickle.loads(data, encoding='latin1')
+    materials = {}
+    for (a, b, name, c, mat) in lib:
+        # Entries with -1 are library's folders, not materials
+        if b != -1:
+            materials[mat['Vendor material name']] = (mat['version'], mat['Data'])
+    return materials
+
+
+# Map names of materials of all libraries to their library's path, version and data string
+def materialIndex(directory=MATERIALS_DIRECTORY):
+    materials = {}
+    for path, entry in sorted(loadIndex(directory).items()):
+        for name, (version, data) in entry['materials'].items():
+            materials[name] = (path, version, data)
+    return materials
+
+
+# Sorted names of all available materials
+def materialNames(directory=MATERIALS_DIRECTORY):
+    return sorted(materialIndex(directory).keys())
+
+
+# Create materials of given names in model, skipping ones model already has. All materials are created if no names
+# are given
+def importMaterials(modelName="Model-1", names=None, directory=MATERIALS_DIRECTORY):
+    from abaqus import mdb
+    from material import createMaterialFromDataString
+    existing = mdb.models[modelName].materials.keys()
+    if names is not None and all(name in existing for name in names):
+        # Model already has all of them, f.e. when copied from template
+        return []
+    materials = materialIndex(directory)
+    if names is None:
+        names = materials.keys()
+    imported = []
+    for name in sorted(set(names)):
+        if name in existing or name not in materials:
+            continue
+        path, version, data = materials[name]
+        createMaterialFromDataString(modelName, name, version, data)
+        imported.append(name)
+    return imported
+
+
+# Components of projectile - materials and IDs of its bodies in the ACIS file, as listed in its elements.cfg
+def projectileElements(projectileType, directory=PARTS_DIRECTORY):
+    config = os.path.join(directory, str(projectileType), "elements.cfg")
+    if not os.path.exists(config):
+        return []
+    with open(config) as file:
+        # Lists, such as axisymmetric profiles, are kept as they are
+        return [
+            dict([(str(k), v if isinstance(v, list) else str(v)) for k, v in x.items()]) for x in json.load(file)
+        ]
+
+
+# Names of materials assigned to projectile's components in its elements.cfg
+def projectileMaterials(projectileType, directory=PARTS_DIRECTORY):
+    return [element['material'] for element in projectileElements(projectileType, directory)]
+
+
+# Axisymmetric profiles of projectile's components as listed in their elements.cfg entries - closed outlines of their
+# half-sections given as (radius, axial coordinate) points in [m], in the same coordinates as ACIS file's bodies whose
+# axis is Z axis. None for components without profile
+def projectileProfiles(projectileType, directory=PARTS_DIRECTORY):
+    profiles = []
+    for element in projectileElements(projectileType, directory):
+        profile = element.get('profile')
+        if profile is not None:
+            profile = [(float(radius), float(axial)) for radius, axial in profile]
+        profiles.append(profile)
+    return profiles
+
+
+# Names of materials referenced by model's configuration - target layers' and projectile's materials
+def referencedMaterials(config, directory=PARTS_DIRECTORY):
+    names = [str(layer['material']) for layer in config['armor']['layers']]
+    names += projectileMaterials(config['projectile']['type'], directory)
+    return sorted(set(names))
+
+
+# Catalog of available projectiles - names of Parts subdirectories holding projectile's geometry, mapped to their
+# components listed in elements.cfg. ACIS files aren't opened until projectile is imported
+def partCatalog(directory=PARTS_DIRECTORY):
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+    catalog = {}
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if os.path.isdir(path) and os.path.exists(os.path.join(path, "Projectile.sat")):
+            catalog[name] = projectileElements(name, directory)
+    return catalog
+
+
+# Name of projectile's component part
+def componentName(projectileType, i):
+    return "Projectile-" + str(projectileType) + "-" + str(i).zfill(2)
+
+
+# Import parts of given projectile to model, unless model already has them. Parts are copied from projectile's part
+# cache if it's up to date, otherwise they are created from ACIS file - with refresh, the cache is then written in the
+# background, taking another Abaqus/CAE license
+def importProjectile(modelName, projectileType, directory=PARTS_DIRECTORY, refresh=False):
+    from abaqus import mdb
+    elements = projectileElements(projectileType, directory)
+    names = [componentName(projectileType, i) for i in range(len(elements))]
+    model = mdb.models[modelName]
+    if all(name in model.parts.keys() for name in names):
+        return names
+    # Sections are part of the model, not of the parts, so they are created in either case
+    for name, element in zip(names, elements):
+        model.HomogeneousSolidSection(
+            name,
+            element['material']
+        )
+    if isPartCacheValid(projectileType, directory):
+        copyCachedParts(modelName, projectileType, names, directory)
+    else:
+        createProjectileParts(modelName, projectileType, directory)
+        if refresh:
+            refreshPartCache(projectileType, directory)
+    return names
+
+
+# Start writing projectile's part cache in separate Abaqus/CAE session, unless another session is writing it already.
+# Current model database can't be saved partially, so the cache's parts are created from ACIS file once more there.
+# The session releases the lock once it's done, and so does this session once the command exits - f.e. when Abaqus/CAE
+# can't be found by the shell. Returns whether the session was started
+def refreshPartCache(projectileType, directory=PARTS_DIRECTORY, command=PART_CACHE_COMMAND):
+    lock = os.path.join(directory, str(projectileType), PART_CACHE_LOCK)
+    if os.path.exists(lock) and time.time() - os.path.getmtime(lock) > PART_CACHE_LOCK_AGE:
+        os.remove(lock)
+    # Lock's contents tell this session's lock from locks taken later by other sessions
+    token = "%d %r" % (os.getpid(), time.time())
+    try:
+        handle = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except OSError:
+        return False
+    os.write(handle, token.encode('utf-8'))
+    os.close(handle)
+    script = os.path.join(PLUGIN_DIRECTORY, "ImpactTestLibrary.py")
+    try:
+        process = subprocess.Popen(
+            shlex.split(command.format(script=script, projectile=projectileType), posix=(os.name != 'nt')),
+            cwd=os.path.join(directory, str(projectileType)),
+            shell=(os.name == 'nt')
+        )
+    except OSError:
+        # Abaqus/CAE can't be started - parts are simply created from ACIS file again next time
+        os.remove(lock)
+        return False
+    watcher = threading.Thread(target=releasePartCacheLock, args=(process, lock, token))
+    watcher.daemon = True
+    watcher.start()
+    return True
+
+
+# Wait for part cache writing command to exit, then remove its lock unless it's been removed or taken again already
+def releasePartCacheLock(process, lock, token):
+    process.wait()
+    try:
+        with open(lock) as file:
+            if file.read() == token:
+                os.remove(lock)
+    except (IOError, OSError):
+        pass
+
+
+# Create projectile's parts from its ACIS file and assign them their sections
+def createProjectileParts(modelName, projectileType, directory=PARTS_DIRECTORY):
+    from abaqus import mdb
+    from abaqusConstants import THREE_D, DEFORMABLE_BODY
+    projectile = mdb.openAcis(os.path.join(directory, str(projectileType), "Projectile.sat"))
+    # Create projectile component and assign it material
+    for i, element in enumerate(projectileElements(projectileType, directory)):
+        p_name = componentName(projectileType, i)
+        part = mdb.models[modelName].PartFromGeometryFile(
+            p_name,
+            projectile,
+            THREE_D,
+            DEFORMABLE_BODY,
+            bodyNum=int(element['id'])
+        )
+        cells = part.cells.getSequenceFromMask(
+            mask=
+            (
+                '[#1 ]',
+            ),
+        )
+        region = part.Set(
+            cells=cells,
+            name='volume'
+        )
+        part.SectionAssignment(
+            sectionName=p_name,
+            region=region,
+        )
+
+
+# Modification times and sizes of projectile's ACIS file and elements.cfg
+def partSourcesStamp(projectileType, directory=PARTS_DIRECTORY):
+    stamp = {}
+    for filename in ("Projectile.sat", "elements.cfg"):
+        status = os.stat(os.path.join(directory, str(projectileType), filename))
+        stamp[filename] = [status.st_mtime, status.st_size]
+    return stamp
+
+
+# Check whether projectile's part cache exists and was written from current ACIS file and elements.cfg
+def isPartCacheValid(projectileType, directory=PARTS_DIRECTORY):
+    cache = os.path.join(directory, str(projectileType), PART_CACHE)
+    stampFile = os.path.join(directory, str(projectileType), PART_CACHE_STAMP)
+    if not os.path.exists(cache) or not os.path.exists(stampFile):
+        return False
+    with open(stampFile) as file:
+        try:
+            stamp = json.load(file)
+        except ValueError:
+            return False
+    return stamp == partSourcesStamp(projectileType, directory)
+
+
+# Copy projectile's parts from its part cache to model, skipping ACIS translation
+def copyCachedParts(modelName, projectileType, names, directory=PARTS_DIRECTORY):
+    from abaqus import mdb
+    temporary = "Cache-" + str(projectileType)
+    mdb.openAuxMdb(pathName=os.path.join(directory, str(projectileType), PART_CACHE))
+    try:
+        mdb.copyAuxMdbModel(fromName=PART_CACHE_MODEL, toName=temporary)
+    finally:
+        mdb.closeAuxMdb()
+    for name in names:
+        mdb.models[modelName].Part(
+            name=name,
+            objectToCopy=mdb.models[temporary].parts[name]
+        )
+    del mdb.models[temporary]
+
+
+# Import projectile's parts from ACIS file into new model database and save it as projectile's part cache. Current
+# model database is replaced, so it's meant to be run in separate Abaqus/CAE session. Lock of the cache being written
+# is released once it's done
+def writePartCache(projectileType, directory=PARTS_DIRECTORY):
+    from abaqus import Mdb
+    projectileDirectory = os.path.join(directory, str(projectileType))
+    stampFile = os.path.join(projectileDirectory, PART_CACHE_STAMP)
+    try:
+        # Cache being written must not be taken for valid one
+        if os.path.exists(stampFile):
+            os.remove(stampFile)
+        Mdb()
+        from abaqus import mdb
+        for i, element in enumerate(projectileElements(projectileType, directory)):
+            mdb.models[PART_CACHE_MODEL].HomogeneousSolidSection(
+                componentName(projectileType, i),
+                element['material']
+            )
+        createProjectileParts(PART_CACHE_MODEL, projectileType, directory)
+        mdb.saveAs(pathName=os.path.join(projectileDirectory, PART_CACHE))
+        with open(stampFile, 'w') as file:
+            json.dump(partSourcesStamp(projectileType, directory), file)
+    finally:
+        lock = os.path.join(projectileDirectory, PART_CACHE_LOCK)
+        if os.path.exists(lock):
+            os.remove(lock)
+
+
+# Run as 'abaqus cae noGUI=ImpactTestLibrary.py -- AP' to write part caches of given projectiles, all if none given
+if __name__ == "__main__":
+    arguments = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else sys.argv[1:]
+    for projectileType in arguments or sorted(partCatalog().keys()):
+        writePartCache(projectileType)
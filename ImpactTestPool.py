@@ -0,0 +1,172 @@
+import argparse
+import json
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+from multiprocessing.pool import ThreadPool
+
+from ImpactTestBatch import writeManifest
+from ImpactTestConfig import loadSweep, validateWithLibrary
+from ImpactTestSurrogate import skippedCases
+
+# Command running single worker's Abaqus/CAE session - {script} is batch runner, {spec} is worker's shard file
+DEFAULT_COMMAND = "abaqus cae noGUI={script} -- {spec}"
+
+
+# Split list of cases into given number of contiguous shards. Neighbouring cases of a sweep differ by projectile's
+# velocity only, so keeping them together lets each worker build them incrementally
+def shardCases(cases, shards):
+    shards = max(1, min(shards, len(cases)))
+    size, extra = divmod(len(cases), shards)
+    result = []
+    start = 0
+    for i in range(shards):
+        end = start + size + (1 if i < extra else 0)
+        result.append(cases[start:end])
+        start = end
+    return result
+
+
+# Run single worker's Abaqus/CAE session over its shard of cases in shard's own working directory
+def runWorker(command, directory, prefix, cases, incremental):
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+    spec = os.path.join(directory, prefix + ".json")
+    with open(spec, 'w') as file:
+        json.dump(
+            {
+                'modelName': prefix,
+                'incremental': incremental,
+                'cases': [config for (name, config) in cases]
+            },
+            file,
+            indent=2
+        )
+    script = os.path.join(os.path.dirname(os.path.realpath(__file__)), "ImpactTestBatch.py")
+    args = shlex.split(
+        command.format(script=script, spec=spec),
+        posix=(os.name != 'nt')
+    )
+    with open(os.path.join(directory, prefix + ".log"), 'w') as log:
+        # Abaqus launcher is a batch file on Windows and has to be run by the shell
+        return subprocess.call(
+            args,
+            cwd=directory,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            shell=(os.name == 'nt')
+        )
+
+
+# Gather worker's manifest entries and move its input files to output directory
+def collectWorker(directory, prefix, cases, returnCode, output):
+    entries = {}
+    manifest = os.path.join(directory, prefix + "-manifest.json")
+    if os.path.exists(manifest):
+        with open(manifest) as file:
+            for entry in json.load(file):
+                entries[entry['name']] = entry
+    collected = []
+    for name, config in cases:
+        entry = entries.get(name)
+        if entry is None:
+            # Worker's session crashed before the case was reported
+            entry = {
+                'name': name,
+                'config': config,
+                'status': 'failed',
+                'error': "Worker exited with code %d, see %s" % (
+                    returnCode,
+                    os.path.join(directory, prefix + ".log")
+                )
+            }
+        elif entry['status'] == 'done':
+            source = os.path.join(directory, name + ".inp")
+            target = os.path.join(output, name + ".inp")
+            if os.path.exists(target):
+                os.remove(target)
+            shutil.move(source, target)
+            entry['input'] = os.path.abspath(target)
+        entry['worker'] = prefix
+        collected.append(entry)
+    return collected
+
+
+# Build all cases of a sweep in given number of parallel Abaqus/CAE workers and write combined manifest
+def runPool(filename, workers, output=None, command=DEFAULT_COMMAND, shards=None):
+    prefix, cases, incremental = loadSweep(filename)
+    for name, config in cases:
+        config['modelName'] = name
+    # Invalid cases are reported right away instead of being passed to workers
+    reported = []
+    valid = []
+    for (name, config), messages in zip(cases, validateWithLibrary([config for (name, config) in cases])):
+        if messages:
+            reported.append(
+                {
+                    'name': name,
+                    'config': config,
+                    'status': 'invalid',
+                    'errors': messages
+                }
+            )
+        else:
+            valid.append((name, config))
+    # Cases whose outcome is predicted confidently are reported along with their prediction instead of being built
+    skipped = skippedCases(valid)
+    for name, config in valid:
+        if name in skipped:
+            reported.append(
+                {
+                    'name': name,
+                    'config': config,
+                    'status': 'predicted',
+                    'prediction': skipped[name]
+                }
+            )
+    cases = [(name, config) for (name, config) in valid if name not in skipped]
+    if output is None:
+        output = os.getcwd()
+    output = os.path.abspath(output)
+    if not os.path.exists(output):
+        os.makedirs(output)
+    if shards is None:
+        shards = workers
+    jobs = []
+    # Workers aren't started at all if every case is invalid
+    for i, shard in enumerate(shardCases(cases, shards) if cases else []):
+        shardName = prefix + "-shard-" + str(i + 1).zfill(2)
+        jobs.append((os.path.join(output, shardName), shardName, shard))
+
+    def work(job):
+        directory, shardName, shard = job
+        returnCode = runWorker(command, directory, shardName, shard, incremental)
+        return collectWorker(directory, shardName, shard, returnCode, output)
+
+    pool = ThreadPool(max(1, workers))
+    try:
+        results = pool.map(work, jobs)
+    finally:
+        pool.close()
+        pool.join()
+    manifest = reported + [entry for entries in results for entry in entries]
+    writeManifest(manifest, os.path.join(output, prefix + "-manifest.json"))
+    return manifest
+
+
+# Run as 'python ImpactTestPool.py sweep.json --workers 4'
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build sweep's models in parallel Abaqus/CAE sessions")
+    parser.add_argument('sweep', help="sweep specification file")
+    parser.add_argument('-w', '--workers', type=int, default=2, help="number of parallel Abaqus/CAE sessions")
+    parser.add_argument('-s', '--shards', type=int, default=None, help="number of shards, defaults to workers")
+    parser.add_argument('-o', '--output', default=None, help="directory for input files and manifest")
+    parser.add_argument('-c', '--command', default=DEFAULT_COMMAND, help="worker command template")
+    args = parser.parse_args()
+    manifest = runPool(args.sweep, args.workers, args.output, args.command, args.shards)
+    failed = [entry['name'] for entry in manifest if entry['status'] not in ('done', 'predicted')]
+    for name in failed:
+        print("Failed: " + name)
+    sys.exit(1 if failed else 0)
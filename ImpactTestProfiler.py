@@ -0,0 +1,154 @@
+import csv
+import json
+import os
+import time
+
+# Environment variable enabling profiling of all models - '1' for timings only, 'cprofile' to dump cProfile
+# statistics of each stage as well
+PROFILE_VARIABLE = "IMPACTTEST_PROFILE"
+
+
+# Peak resident set size of current process in [MB], None if it can't be obtained on this platform
+def peakMemory():
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        if os.uname()[0] == 'Darwin':
+            return peak / 1024.0 / 1024.0
+        return peak / 1024.0
+    except ImportError:
+        pass
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [
+                ('cb', wintypes.DWORD),
+                ('PageFaultCount', wintypes.DWORD),
+                ('PeakWorkingSetSize', ctypes.c_size_t),
+                ('WorkingSetSize', ctypes.c_size_t),
+                ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                ('PagefileUsage', ctypes.c_size_t),
+                ('PeakPagefileUsage', ctypes.c_size_t)
+            ]
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize / 1024.0 / 1024.0
+    except Exception:
+        pass
+    return None
+
+
+# CPU time consumed by current process in [s]
+def cpuTime():
+    times = os.times()
+    return times[0] + times[1]
+
+
+# Records wall time, CPU time and peak memory of model preparation stages along with model size counters, and
+# writes them as JSON and CSV run report next to the model's input file
+class ImpactTestProfiler():
+    # Initialize profiler of given model. Counters is a function returning dictionary of model size counters,
+    # evaluated after each stage
+    def __init__(self, modelName, enabled=False, cProfile=False, counters=None, directory=None):
+        self.modelName = modelName
+        self.enabled = enabled
+        # Dump cProfile statistics of each stage to <model>-<stage>.prof
+        self.cProfile = cProfile
+        self.counters = counters
+        # Directory of run report - working directory, where input file is written
+        self.directory = os.path.abspath(directory or os.getcwd())
+        # Stage records in order of execution
+        self.records = []
+        # Additional information reported by stages
+        self.info = {}
+
+    # Create profiler configured by model's configuration 'profile' entry or IMPACTTEST_PROFILE variable. The entry
+    # may be true or dictionary with 'cProfile' flag
+    @staticmethod
+    def fromConfig(modelName, config, counters=None):
+        setting = config.get('profile', False)
+        variable = os.environ.get(PROFILE_VARIABLE, '').strip().lower()
+        enabled = bool(setting) or variable not in ('', '0', 'false', 'no')
+        cProfile = variable == 'cprofile'
+        if isinstance(setting, dict):
+            cProfile = cProfile or bool(setting.get('cProfile', False))
+        return ImpactTestProfiler(modelName, enabled, cProfile, counters)
+
+    # Add information to run report, f.e. number of target elements written directly to input file
+    def runInfo(self, key, value):
+        if self.enabled:
+            self.info[key] = value
+
+    # Run stage, recording its resource usage if profiling is enabled
+    def run(self, stage, *args, **kwargs):
+        if not self.enabled:
+            return stage(*args, **kwargs)
+        name = stage.__name__.lstrip('_')
+        profile = None
+        if self.cProfile:
+            import cProfile
+            profile = cProfile.Profile()
+        wall = time.time()
+        cpu = cpuTime()
+        try:
+            if profile is not None:
+                return profile.runcall(stage, *args, **kwargs)
+            return stage(*args, **kwargs)
+        finally:
+            record = {
+                'stage': name,
+                'wallTime': time.time() - wall,
+                'cpuTime': cpuTime() - cpu,
+                'peakMemory': peakMemory()
+            }
+            if self.counters is not None:
+                record.update(self.counters())
+            self.records.append(record)
+            if profile is not None:
+                profile.dump_stats(os.path.join(self.directory, "%s-%s.prof" % (self.modelName, name)))
+
+    # Write run report to <model>-profile.json and <model>-profile.csv
+    def write(self):
+        if not self.enabled:
+            return None
+        filename = os.path.join(self.directory, self.modelName + "-profile")
+        with open(filename + ".json", 'w') as file:
+            json.dump(
+                {
+                    'modelName': self.modelName,
+                    'stages': self.records,
+                    'wallTime': sum(record['wallTime'] for record in self.records),
+                    'cpuTime': sum(record['cpuTime'] for record in self.records),
+                    'info': self.info
+                },
+                file,
+                indent=2,
+                sort_keys=True
+            )
+        columns = ['stage', 'wallTime', 'cpuTime', 'peakMemory']
+        for record in self.records:
+            for key in sorted(record.keys()):
+                if key not in columns:
+                    columns.append(key)
+        with open(filename + ".csv", 'w') as file:
+            writer = csv.writer(file, lineterminator='\n')
+            writer.writerow(columns)
+            for record in self.records:
+                writer.writerow([self.__csvValue(record.get(column)) for column in columns])
+        return filename + ".json"
+
+    # Flatten counter value for CSV - dictionaries of per-part counts are summed
+    def __csvValue(self, value):
+        if isinstance(value, dict):
+            return sum(value.values())
+        if value is None:
+            return ''
+        return value
@@ -0,0 +1,153 @@
+import json
+import math
+import os
+import sys
+
+# Make sure plugin's modules are importable when run with Abaqus Python
+__pluginDirectory = os.path.dirname(os.path.realpath(__file__))
+if __pluginDirectory not in sys.path:
+    sys.path.insert(0, __pluginDirectory)
+
+# Residual velocity, as a fraction of impact velocity, above which projectile that passed the target counts as
+# perforating - slower projectiles are stuck in the target or rebounding
+PERFORATION_VELOCITY_FRACTION = 0.01
+# Name of step and set of projectile's history output, as created by the kernel
+IMPACT_STEP = 'Impact'
+PROJECTILE_SET = 'PROJECTILE-VOLUME'
+
+
+# Unit vector of projectile's initial direction of travel - along Y axis in axisymmetric models, in YZ plane otherwise
+def travelDirection(config):
+    if config.get('axisymmetric'):
+        return 0.0, -1.0, 0.0
+    radians = math.pi * config['armor']['obliquity'] / 180.0
+    return 0.0, math.sin(radians), -math.cos(radians)
+
+
+# Length in [m] of projectile's path through target's layers and spacings
+def targetPathLength(config):
+    thickness = sum(layer['thickness'] + layer['spacing'] for layer in config['armor']['layers'])
+    if config.get('axisymmetric'):
+        return thickness
+    return thickness / math.cos(math.pi * config['armor']['obliquity'] / 180.0)
+
+
+# Depth in [m] of point past target's strike face along projectile's initial direction of travel, negative in front
+# of the target. Strike face of target's first layer lies in XZ plane in axisymmetric models, in XY plane otherwise
+def strikeDepth(config, point):
+    if config.get('axisymmetric'):
+        return -point[1]
+    return -point[2] / math.cos(math.pi * config['armor']['obliquity'] / 180.0)
+
+
+# Summary of impact given projectile's final center of mass velocity in [m/s], its displacement in [m] and its initial
+# position in [m] - residual velocity along initial direction of travel, penetration of center of mass past target's
+# strike face, its initial stand-off and whether the target was perforated, i.e. projectile's center of mass passed
+# target's rear face and still moves on
+def summarize(config, velocity, displacement, time, center):
+    direction = travelDirection(config)
+    residualVelocity = sum(v * d for v, d in zip(velocity, direction))
+    penetration = strikeDepth(config, [c + u for c, u in zip(center, displacement)])
+    impactVelocity = float(config['projectile']['velocity'])
+    return {
+        'impactVelocity': impactVelocity,
+        'residualVelocity': residualVelocity,
+        'penetration': penetration,
+        'standoff': -strikeDepth(config, center),
+        'time': time,
+        'perforated': bool(
+            residualVelocity > PERFORATION_VELOCITY_FRACTION * impactVelocity and
+            penetration > targetPathLength(config)
+        )
+    }
+
+
+# Initial position in [m] of projectile's center of mass - from its history output if written, otherwise average of
+# initial coordinates of projectile's nodes
+def initialCenter(odb, outputs):
+    if 'XC1' in outputs.keys():
+        return [outputs['XC%d' % i].data[0][1] if 'XC%d' % i in outputs.keys() else 0.0 for i in (1, 2, 3)]
+    coordinates = [
+        node.coordinates for nodes in odb.rootAssembly.nodeSets[PROJECTILE_SET].nodes for node in nodes
+    ]
+    return [
+        sum(point[i] for point in coordinates) / len(coordinates) if i < len(coordinates[0]) else 0.0
+        for i in (0, 1, 2)
+    ]
+
+
+# Read projectile's final center of mass velocity and displacement from job's output database and summarize impact.
+# Requires Abaqus Python and projectile's history output, written by 'ballistic-minimal' and 'thermal' output profiles
+def readResults(odbPath, config):
+    from odbAccess import openOdb
+    odb = openOdb(path=odbPath, readOnly=True)
+    try:
+        step = odb.steps[IMPACT_STEP]
+        outputs = None
+        for name, region in step.historyRegions.items():
+            if name.upper().endswith(PROJECTILE_SET):
+                outputs = region.historyOutputs
+        if outputs is None or 'VC1' not in outputs.keys():
+            raise ValueError("%s has no projectile's history output - use output profile writing it" % odbPath)
+        velocity = [outputs['VC%d' % i].data[-1][1] if 'VC%d' % i in outputs.keys() else 0.0 for i in (1, 2, 3)]
+        displacement = [outputs['UC%d' % i].data[-1][1] if 'UC%d' % i in outputs.keys() else 0.0 for i in (1, 2, 3)]
+        time = outputs['VC1'].data[-1][0]
+        center = initialCenter(odb, outputs)
+    finally:
+        odb.close()
+    return summarize(config, velocity, displacement, time, center)
+
+
+# Path of manifest entry's output file, written next to its input file
+def outputFile(entry, suffix):
+    return os.path.join(os.path.dirname(os.path.abspath(entry['input'])), entry['name'] + suffix)
+
+
+# Whether summary's file exists and measures penetration from target's strike face - earlier summaries measured
+# it from projectile's initial center of mass, and are summarized again
+def isCurrentSummary(path):
+    if path is None or not os.path.exists(path):
+        return False
+    with open(path) as file:
+        return 'standoff' in json.load(file)
+
+
+# Summarize results of all solved cases of sweep manifest, writing <name>-results.json next to their input files.
+# Summaries already in output store are only linked, new ones are stored
+def summarizeManifest(filename):
+    from ImpactTestStore import ImpactTestStore
+    with open(filename) as file:
+        manifest = json.load(file)
+    summaries = {}
+    for entry in manifest:
+        if entry['status'] != 'done':
+            continue
+        path = outputFile(entry, "-results.json")
+        store = ImpactTestStore(entry['store']) if entry.get('key') else None
+        if store is not None and isCurrentSummary(store.lookup(entry['key'], ".json")):
+            store.link(entry['key'], ".json", path)
+        else:
+            odbPath = outputFile(entry, ".odb")
+            if not os.path.exists(odbPath):
+                continue
+            # Summary may be a link to stored summary of earlier sweep, which must not be overwritten
+            if os.path.islink(path):
+                os.remove(path)
+            with open(path, 'w') as file:
+                json.dump(readResults(odbPath, entry['config']), file, indent=2, sort_keys=True)
+            if store is not None:
+                store.store(entry['key'], path)
+        with open(path) as file:
+            summaries[entry['name']] = json.load(file)
+    return summaries
+
+
+# Run as 'abaqus python ImpactTestResults.py Sweep-manifest.json'
+if __name__ == "__main__":
+    for manifest in sys.argv[1:]:
+        for name, summary in sorted(summarizeManifest(manifest).items()):
+            print("%s: %s, residual velocity %.1f [m/s]" % (
+                name,
+                'perforated' if summary['perforated'] else 'stopped',
+                summary['residualVelocity']
+            ))
@@ -0,0 +1,266 @@
+import argparse
+import json
+import multiprocessing
+import os
+import shlex
+import signal
+import subprocess
+import sys
+import time
+
+from ImpactTestStore import ImpactTestStore
+
+# Command solving single job - {job}, {input}, {cpus} and {memory} are substituted for each job
+DEFAULT_COMMAND = 'abaqus job={job} input={input} cpus={cpus} domains={cpus} memory="{memory} %" interactive'
+
+# Time in [s] interrupted jobs' processes are given to exit before they're killed
+TERMINATE_TIMEOUT = 30.0
+
+# Job states kept in queue state file
+QUEUED = 'queued'
+RUNNING = 'running'
+SOLVED = 'solved'
+FAILED = 'failed'
+
+
+# Local queue of explicit solver jobs, launching them so that allocated cores never exceed CPU budget
+class ImpactTestScheduler():
+    # Initialize scheduler with its persistent state file and resources
+    def __init__(self, stateFile, budget=None, cpusPerJob=None, minCpus=None, memory=90, command=DEFAULT_COMMAND,
+                 overBudget=False):
+        # Path of JSON file storing queue state so interrupted queue can be resumed
+        self.stateFile = os.path.abspath(stateFile)
+        # Total number of cores jobs may use at once
+        self.budget = int(budget or multiprocessing.cpu_count())
+        # Number of cores/domains assigned to each job
+        self.cpusPerJob = min(int(cpusPerJob or self.budget), self.budget)
+        # Least number of cores job may be started with when fewer than cpusPerJob are free
+        self.minCpus = min(int(minCpus or self.cpusPerJob), self.cpusPerJob)
+        # Percentage of memory shared by all jobs running at once
+        self.memory = memory
+        # Job command template
+        self.command = command
+        # Queue jobs whose pre-flight estimate exceeds its budget as well
+        self.overBudget = overBudget
+        # Queue state - list of job records
+        self.jobs = []
+        # Processes of running jobs by job name
+        self.processes = {}
+        self.loadState()
+
+    # Load queue state, resetting jobs interrupted while running
+    def loadState(self):
+        if not os.path.exists(self.stateFile):
+            return
+        with open(self.stateFile) as file:
+            self.jobs = json.load(file)['jobs']
+        for job in self.jobs:
+            if job['status'] == RUNNING:
+                job['status'] = QUEUED
+
+    # Write queue state to temporary file first, so the state file is never left truncated
+    def saveState(self):
+        temporary = self.stateFile + ".tmp"
+        with open(temporary, 'w') as file:
+            json.dump(
+                {
+                    'budget': self.budget,
+                    'jobs': self.jobs
+                },
+                file,
+                indent=2,
+                sort_keys=True
+            )
+        if os.path.exists(self.stateFile):
+            os.remove(self.stateFile)
+        os.rename(temporary, self.stateFile)
+
+    # Add successfully built cases from sweep manifest to the queue, skipping ones already queued and ones flagged as
+    # over budget by pre-flight estimate. Cases whose results are already in output store are linked to them and
+    # recorded as solved. Returns names of skipped over budget cases
+    def addManifest(self, filename):
+        with open(filename) as file:
+            manifest = json.load(file)
+        known = set(job['name'] for job in self.jobs)
+        skipped = []
+        for entry in manifest:
+            if entry['status'] != 'done' or entry['name'] in known:
+                continue
+            if entry.get('estimate', {}).get('overBudget') and not self.overBudget:
+                skipped.append(entry['name'])
+                continue
+            job = {
+                'name': entry['name'],
+                'input': entry['input'],
+                'status': QUEUED
+            }
+            if entry.get('key'):
+                job['key'] = entry['key']
+                job['store'] = entry['store']
+                store = ImpactTestStore(entry['store'])
+                if store.lookup(entry['key'], ".odb") is not None:
+                    store.link(entry['key'], ".odb", self.outputFile(job, ".odb"))
+                    job['status'] = SOLVED
+                    job['stored'] = True
+            self.jobs.append(job)
+        self.saveState()
+        return skipped
+
+    # Queued jobs, largest input files first so long jobs don't end up trailing at the end of the queue
+    def queuedJobs(self):
+        queued = [job for job in self.jobs if job['status'] == QUEUED]
+        return sorted(
+            queued,
+            key=lambda job: os.path.getsize(job['input']) if os.path.exists(job['input']) else 0,
+            reverse=True
+        )
+
+    # Path of job's output file with given extension - solver writes it next to job's input file
+    def outputFile(self, job, extension):
+        return os.path.join(os.path.dirname(os.path.abspath(job['input'])), job['name'] + extension)
+
+    # Number of cores allocated to running jobs
+    def allocatedCpus(self):
+        return sum(job['cpus'] for job in self.jobs if job['status'] == RUNNING)
+
+    # Launch job's solver process with given number of cores and proportional share of memory
+    def launch(self, job, cpus):
+        job['cpus'] = cpus
+        job['memory'] = max(1, int(self.memory * cpus / self.budget))
+        directory = os.path.dirname(os.path.abspath(job['input']))
+        args = shlex.split(
+            self.command.format(
+                job=job['name'],
+                input=os.path.basename(job['input']),
+                cpus=cpus,
+                memory=job['memory']
+            ),
+            posix=(os.name != 'nt')
+        )
+        log = open(os.path.join(directory, job['name'] + ".scheduler.log"), 'w')
+        # Abaqus launcher is a batch file on Windows and has to be run by the shell. Job runs in its own process group,
+        # so the solver started by the launcher can be stopped along with it
+        if os.name == 'nt':
+            group = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+        else:
+            group = {'preexec_fn': os.setsid}
+        try:
+            process = subprocess.Popen(
+                args,
+                cwd=directory,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                shell=(os.name == 'nt'),
+                **group
+            )
+        except Exception:
+            log.close()
+            raise
+        self.processes[job['name']] = (process, log)
+        job['status'] = RUNNING
+        job['started'] = time.time()
+        self.saveState()
+
+    # Start as many queued jobs as fit into free cores
+    def fill(self):
+        for job in self.queuedJobs():
+            free = self.budget - self.allocatedCpus()
+            if free < self.minCpus:
+                break
+            self.launch(job, min(self.cpusPerJob, free))
+
+    # Record finished jobs and release their cores
+    def poll(self):
+        for name in list(self.processes.keys()):
+            process, log = self.processes[name]
+            returnCode = process.poll()
+            if returnCode is None:
+                continue
+            log.close()
+            del self.processes[name]
+            job = [job for job in self.jobs if job['name'] == name][0]
+            job['status'] = SOLVED if returnCode == 0 else FAILED
+            job['returnCode'] = returnCode
+            job['finished'] = time.time()
+            if job['status'] == SOLVED and job.get('key') and os.path.exists(self.outputFile(job, ".odb")):
+                ImpactTestStore(job['store']).store(job['key'], self.outputFile(job, ".odb"))
+            self.saveState()
+
+    # Stop job's process along with all processes it started, and wait until they exit - terminating the launcher
+    # alone leaves the solver running
+    def terminate(self, process):
+        if os.name == 'nt':
+            with open(os.devnull, 'w') as null:
+                subprocess.call(['taskkill', '/F', '/T', '/PID', str(process.pid)], stdout=null, stderr=null)
+            process.wait()
+            return
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+        except OSError:
+            pass
+        deadline = time.time() + TERMINATE_TIMEOUT
+        while process.poll() is None and time.time() < deadline:
+            time.sleep(0.1)
+        # Processes of the group still running, launcher's or solver's, are killed
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except OSError:
+            pass
+        process.wait()
+
+    # Run the queue until all jobs are finished
+    def run(self, interval=5.0):
+        try:
+            while True:
+                self.poll()
+                self.fill()
+                if not self.processes:
+                    break
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            # Interrupted jobs are stopped and queued again, so they will be rerun on resume. Lock files of their
+            # stopped solvers would keep them from being rerun
+            for name, (process, log) in self.processes.items():
+                self.terminate(process)
+                log.close()
+                job = [job for job in self.jobs if job['name'] == name][0]
+                if os.path.exists(self.outputFile(job, ".lck")):
+                    os.remove(self.outputFile(job, ".lck"))
+            for job in self.jobs:
+                if job['status'] == RUNNING:
+                    job['status'] = QUEUED
+            self.saveState()
+            raise
+        return self.jobs
+
+
+# Run as 'python ImpactTestScheduler.py Sweep-manifest.json --cpus 16 --cpus-per-job 4'
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve sweep's jobs within CPU budget")
+    parser.add_argument('manifest', nargs='*', help="sweep manifests listing input files")
+    parser.add_argument('--state', default="ImpactTest-queue.json", help="queue state file")
+    parser.add_argument('--cpus', type=int, default=None, help="total number of cores, defaults to all")
+    parser.add_argument('--cpus-per-job', type=int, default=None, help="cores assigned to each job")
+    parser.add_argument('--min-cpus', type=int, default=None, help="least cores job may be started with")
+    parser.add_argument('--memory', type=int, default=90, help="percentage of memory shared by running jobs")
+    parser.add_argument('--interval', type=float, default=5.0, help="polling interval in seconds")
+    parser.add_argument('-c', '--command', default=DEFAULT_COMMAND, help="job command template")
+    parser.add_argument('--over-budget', action='store_true', help="queue jobs estimated over budget as well")
+    args = parser.parse_args()
+    scheduler = ImpactTestScheduler(
+        args.state,
+        budget=args.cpus,
+        cpusPerJob=args.cpus_per_job,
+        minCpus=args.min_cpus,
+        memory=args.memory,
+        command=args.command,
+        overBudget=args.over_budget
+    )
+    for manifest in args.manifest:
+        for name in scheduler.addManifest(manifest):
+            print("Over budget, skipped: " + name)
+    jobs = scheduler.run(args.interval)
+    failed = [job['name'] for job in jobs if job['status'] == FAILED]
+    for name in failed:
+        print("Failed: " + name)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+
+from ImpactTestCache import fileHash
+from ImpactTestLibrary import MATERIALS_DIRECTORY, PARTS_DIRECTORY, PLUGIN_DIRECTORY, materialIndex, \
+    referencedMaterials
+
+# Default location of output store
+STORE_DIRECTORY = os.path.join(PLUGIN_DIRECTORY, "Store")
+# Version of stored entries' key - entries of other versions are never matched
+STORE_VERSION = 1
+# Description of stored entry - its configuration and information about its files
+ENTRY_FILE = "entry.json"
+# Configuration entries which don't affect generated model - model's name, profiling, job's resources, the store and
+# the surrogate
+IGNORED_KEYS = ('modelName', 'profile', 'job', 'store', 'surrogate')
+
+
+# Configuration in canonical form - numbers as floats, so 800 and 800.0 are the same velocity, and entries which
+# don't affect generated model removed
+def normalizeConfig(config, ignored=IGNORED_KEYS):
+    if isinstance(config, dict):
+        return dict(
+            (str(key), normalizeConfig(value, ())) for key, value in config.items() if key not in ignored
+        )
+    if isinstance(config, (list, tuple)):
+        return [normalizeConfig(value, ()) for value in config]
+    if isinstance(config, bool) or config is None:
+        return config
+    if isinstance(config, (int, float)):
+        return float(config)
+    return str(config)
+
+
+# Generated models' input files and their results stored under hash of their normalized configuration, materials'
+# data and projectile's part files. Cases sharing the hash are linked to stored files instead of being built or
+# solved again
+class ImpactTestStore():
+    def __init__(self, directory=STORE_DIRECTORY, materialsDirectory=MATERIALS_DIRECTORY,
+                 partsDirectory=PARTS_DIRECTORY):
+        # Directory holding store's entries - one subdirectory per key
+        self.directory = os.path.abspath(directory)
+        self.materialsDirectory = materialsDirectory
+        self.partsDirectory = partsDirectory
+        # Material index, loaded once per store
+        self.materials = None
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+
+    # Create store configured by configuration's 'store' entry - true or dictionary of store's directory
+    @staticmethod
+    def fromConfig(config):
+        settings = config.get('store')
+        if isinstance(settings, dict):
+            return ImpactTestStore(settings.get('directory', STORE_DIRECTORY))
+        return ImpactTestStore()
+
+    # Key identifying generated model - hash of normalized configuration along with hashes of its materials' data
+    # and projectile's part files
+    def key(self, config):
+        if self.materials is None:
+            self.materials = materialIndex(self.materialsDirectory)
+        materials = {}
+        for name in referencedMaterials(config, self.partsDirectory):
+            path, version, data = self.materials.get(name, (None, None, ''))
+            digest = hashlib.sha1(repr(version).encode('utf-8'))
+            # Data strings are byte strings in Python 2
+            digest.update(data if isinstance(data, bytes) else data.encode('utf-8'))
+            materials[name] = digest.hexdigest()
+        directory = os.path.join(self.partsDirectory, str(config['projectile']['type']))
+        description = json.dumps(
+            [
+                STORE_VERSION,
+                normalizeConfig(config),
+                materials,
+                fileHash(os.path.join(directory, "Projectile.sat")),
+                fileHash(os.path.join(directory, "elements.cfg"))
+            ],
+            sort_keys=True
+        )
+        return hashlib.sha1(description.encode('utf-8')).hexdigest()
+
+    # Path of entry's stored file with given extension, None if it isn't stored
+    def lookup(self, key, extension):
+        path = os.path.join(self.directory, key, "model" + extension)
+        if not os.path.exists(path):
+            return None
+        return path
+
+    # Description of stored entry, empty if there's no such entry
+    def entry(self, key):
+        path = os.path.join(self.directory, key, ENTRY_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as file:
+            return json.load(file)
+
+    # Move file to entry of given key and link it back to its original path. Information, f.e. model's configuration,
+    # is added to entry's description
+    def store(self, key, path, **info):
+        entry = os.path.join(self.directory, key)
+        if not os.path.exists(entry):
+            os.makedirs(entry)
+        extension = os.path.splitext(path)[1]
+        stored = os.path.join(entry, "model" + extension)
+        # File is moved under temporary name first, so incomplete files are never matched
+        temporary = stored + ".tmp"
+        shutil.move(path, temporary)
+        if os.path.exists(stored):
+            os.remove(stored)
+        os.rename(temporary, stored)
+        description = self.entry(key)
+        description.update(info)
+        description.setdefault('created', time.time())
+        description.setdefault('files', [])
+        if extension not in description['files']:
+            description['files'].append(extension)
+        with open(os.path.join(entry, ENTRY_FILE), 'w') as file:
+            json.dump(description, file, indent=2, sort_keys=True)
+        self.link(key, extension, path)
+        return stored
+
+    # Link entry's stored file of given extension to path - symbolic link, or copy where links can't be created
+    def link(self, key, extension, path):
+        stored = self.lookup(key, extension)
+        if os.path.lexists(path):
+            os.remove(path)
+        try:
+            os.symlink(stored, path)
+        except (AttributeError, NotImplementedError, OSError):
+            shutil.copyfile(stored, path)
+        return path
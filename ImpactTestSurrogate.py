@@ -0,0 +1,379 @@
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+import numpy
+
+from ImpactTestConfig import getConfigValue, loadSweep
+from ImpactTestLibrary import PLUGIN_DIRECTORY
+from ImpactTestResults import isCurrentSummary, outputFile, targetPathLength
+from ImpactTestStore import ENTRY_FILE, STORE_DIRECTORY, normalizeConfig
+
+# Default location of surrogate model
+SURROGATE_FILE = os.path.join(PLUGIN_DIRECTORY, "Surrogate.json")
+# Version of surrogate model's file - files of other versions are retrained from scratch
+SURROGATE_VERSION = 2
+# Numeric features of configurations, followed by each layer's numeric features
+NUMERIC_FEATURES = ('projectile.velocity', 'armor.obliquity', 'meshElementSize', 'failureCoefficient')
+LAYER_FEATURES = ('thickness', 'spacing')
+# Length scales of standardized features and noise to signal variance ratios tried when fitting Gaussian process -
+# the pair of greatest marginal likelihood is chosen
+LENGTH_SCALES = (0.25, 0.5, 1.0, 2.0, 4.0)
+NOISE_RATIOS = (1.0e-4, 1.0e-3, 1.0e-2, 1.0e-1)
+# Smallest number of samples needed before any case is skipped
+MIN_SAMPLES = 20
+# Number of predictive standard deviations by which predicted margin must differ from perforation threshold for the
+# case to be skipped
+DEFAULT_CONFIDENCE = 3.0
+# Largest ratio of posterior to prior variance of case's margin for the case to lie among training samples - cases
+# farther from the samples, or outside range of samples' numeric features, are never skipped
+MAX_VARIANCE_RATIO = 0.1
+
+
+# Margin of impact's outcome - residual velocity as a fraction of impact velocity if the target was perforated,
+# negative fraction of target's path length left unpenetrated otherwise, so perforation threshold is at zero
+def outcomeMargin(config, results):
+    if results['perforated']:
+        return results['residualVelocity'] / float(config['projectile']['velocity'])
+    return min(results['penetration'] / targetPathLength(config), 1.0) - 1.0
+
+
+# Samples of solved cases - configurations along with summaries of their results - from output store's entries and
+# from sweep manifests' cases summarized next to their input files. Stored summaries of earlier format are skipped
+def collectSamples(storeDirectory=None, manifests=()):
+    samples = []
+    if storeDirectory is not None and os.path.isdir(storeDirectory):
+        for key in sorted(os.listdir(storeDirectory)):
+            entryFile = os.path.join(storeDirectory, key, ENTRY_FILE)
+            results = os.path.join(storeDirectory, key, "model.json")
+            if not os.path.exists(entryFile) or not isCurrentSummary(results):
+                continue
+            with open(entryFile) as file:
+                entry = json.load(file)
+            if 'config' not in entry:
+                continue
+            with open(results) as file:
+                samples.append({'config': entry['config'], 'results': json.load(file)})
+    for filename in manifests:
+        with open(filename) as file:
+            manifest = json.load(file)
+        for entry in manifest:
+            if entry['status'] != 'done':
+                continue
+            results = outputFile(entry, "-results.json")
+            if os.path.exists(results):
+                with open(results) as file:
+                    samples.append({'config': entry['config'], 'results': json.load(file)})
+    return samples
+
+
+# Key identifying sample's configuration - samples of the same configuration replace each other
+def sampleKey(config):
+    return json.dumps(normalizeConfig(config), sort_keys=True)
+
+
+# Gaussian process surrogate of impact's outcome - predicts outcome's margin from configuration's velocity,
+# obliquity, element size, failure coefficient, each layer's thickness, spacing and material, and projectile's type.
+# Numeric features are standardized, materials and projectile types are one-hot encoded. Prior mean of the margin is
+# the perforation threshold itself, so predictions away from training samples fall back to no confidence at all
+class ImpactTestSurrogate():
+    def __init__(self, path=SURROGATE_FILE):
+        self.path = os.path.abspath(path)
+        # Training samples - configurations and summaries of their results
+        self.samples = []
+        self.trained = None
+        # Encoding of features, fitted to training samples
+        self.materials = []
+        self.projectiles = []
+        self.layers = 0
+        self.center = None
+        self.spread = None
+        # Hyperparameters of Gaussian process
+        self.lengthScale = None
+        self.noise = None
+        self.variance = None
+        # Training samples' features, Cholesky factor of their correlation matrix and weights of their margins
+        self.points = None
+        self.factor = None
+        self.weights = None
+        if os.path.exists(self.path):
+            self.load()
+
+    # Load model's samples and hyperparameters, unless they're of another version
+    def load(self):
+        with open(self.path) as file:
+            model = json.load(file)
+        if model.get('version') != SURROGATE_VERSION:
+            return
+        self.samples = model['samples']
+        self.trained = model['trained']
+        for key in ('materials', 'projectiles', 'layers', 'lengthScale', 'noise', 'variance'):
+            setattr(self, key, model[key])
+        self.center = numpy.array(model['center'])
+        self.spread = numpy.array(model['spread'])
+        if self.samples:
+            self.factorize()
+
+    # Write model's samples and hyperparameters
+    def save(self):
+        model = {
+            'version': SURROGATE_VERSION,
+            'trained': self.trained,
+            'samples': self.samples,
+            'materials': self.materials,
+            'projectiles': self.projectiles,
+            'layers': self.layers,
+            'center': self.center.tolist(),
+            'spread': self.spread.tolist(),
+            'lengthScale': self.lengthScale,
+            'noise': self.noise,
+            'variance': self.variance
+        }
+        with open(self.path, 'w') as file:
+            json.dump(model, file, indent=2, sort_keys=True)
+
+    # Numeric and one-hot features of configuration, along with whether all of its materials, projectile and layers
+    # were seen in training samples
+    def encode(self, config):
+        values = [float(getConfigValue(config, path)) for path in NUMERIC_FEATURES]
+        layers = config['armor']['layers']
+        projectile = str(config['projectile']['type'])
+        known = len(layers) <= self.layers and projectile in self.projectiles
+        for i in range(self.layers):
+            values += [float(layers[i][key]) if i < len(layers) else 0.0 for key in LAYER_FEATURES]
+        categories = [float(projectile == name) for name in self.projectiles]
+        for i in range(self.layers):
+            material = str(layers[i]['material']) if i < len(layers) else None
+            if material is not None and material not in self.materials:
+                known = False
+            categories += [float(material == name) for name in self.materials]
+        return values, categories, known
+
+    # Feature matrix of configurations and whether each of them is known
+    def features(self, configs):
+        rows = []
+        known = []
+        for config in configs:
+            values, categories, isKnown = self.encode(config)
+            rows.append(numpy.concatenate(((numpy.array(values) - self.center) / self.spread, categories)))
+            known.append(isKnown)
+        return numpy.array(rows).reshape(len(configs), -1), numpy.array(known, dtype=bool)
+
+    # Correlation of feature matrices' rows
+    def correlation(self, first, second, lengthScale):
+        distances = ((first[:, numpy.newaxis, :] - second[numpy.newaxis, :, :]) ** 2).sum(axis=2)
+        return numpy.exp(-0.5 * distances / lengthScale ** 2)
+
+    # Cholesky factor of training samples' correlation matrix and weights of their margins
+    def factorize(self):
+        self.points = self.features([sample['config'] for sample in self.samples])[0]
+        margins = numpy.array([outcomeMargin(sample['config'], sample['results']) for sample in self.samples])
+        matrix = self.correlation(self.points, self.points, self.lengthScale) + self.noise * numpy.eye(len(margins))
+        self.factor = numpy.linalg.cholesky(matrix)
+        self.weights = numpy.linalg.solve(
+            self.factor.T,
+            numpy.linalg.solve(self.factor, margins)
+        )
+
+    # Fold new samples into training samples and fit the process again - samples of configurations solved again
+    # replace the old ones. Encoding is fitted to all samples, and hyperparameters are chosen by marginal likelihood
+    def train(self, samples):
+        merged = dict((sampleKey(sample['config']), sample) for sample in self.samples)
+        for sample in samples:
+            try:
+                self.checkSample(sample)
+            except (KeyError, IndexError, TypeError, ValueError):
+                # Samples of incomplete configurations or results are left out
+                continue
+            merged[sampleKey(sample['config'])] = sample
+        self.samples = [merged[key] for key in sorted(merged)]
+        if not self.samples:
+            raise ValueError("There are no samples to train surrogate model on")
+        configs = [sample['config'] for sample in self.samples]
+        self.materials = sorted(set(str(layer['material']) for config in configs for layer in config['armor']['layers']))
+        self.projectiles = sorted(set(str(config['projectile']['type']) for config in configs))
+        self.layers = max(len(config['armor']['layers']) for config in configs)
+        values = numpy.array([self.encode(config)[0] for config in configs])
+        self.center = values.mean(axis=0)
+        spread = values.std(axis=0)
+        self.spread = numpy.where(spread > 0.0, spread, 1.0)
+        points = self.features(configs)[0]
+        margins = numpy.array([outcomeMargin(sample['config'], sample['results']) for sample in self.samples])
+        best = None
+        for lengthScale in LENGTH_SCALES:
+            correlation = self.correlation(points, points, lengthScale)
+            for noise in NOISE_RATIOS:
+                try:
+                    factor = numpy.linalg.cholesky(correlation + noise * numpy.eye(len(margins)))
+                except numpy.linalg.LinAlgError:
+                    continue
+                solved = numpy.linalg.solve(factor, margins)
+                # Signal variance maximizing the likelihood for given length scale and noise ratio
+                variance = max(solved.dot(solved) / len(margins), 1.0e-12)
+                likelihood = -0.5 * len(margins) * math.log(variance) - numpy.log(numpy.diag(factor)).sum()
+                if best is None or likelihood > best[0]:
+                    best = (likelihood, lengthScale, noise, variance)
+        likelihood, self.lengthScale, self.noise, self.variance = best
+        self.lengthScale = float(self.lengthScale)
+        self.variance = float(self.variance)
+        self.trained = time.time()
+        self.factorize()
+        self.save()
+
+    # Check that sample's configuration and results have all values the model needs
+    def checkSample(self, sample):
+        config = sample['config']
+        for path in NUMERIC_FEATURES:
+            float(getConfigValue(config, path))
+        for layer in config['armor']['layers']:
+            for key in LAYER_FEATURES:
+                float(layer[key])
+            str(layer['material'])
+        str(config['projectile']['type'])
+        outcomeMargin(config, sample['results'])
+
+    # Predicted outcomes of configurations - predicted margin, its standard deviation, confidence as the number of
+    # standard deviations between margin and perforation threshold, whether the case is covered by training samples,
+    # i.e. it's within range of their numeric features and its posterior variance is well below prior variance, and
+    # summary of results in ImpactTestResults' form
+    def predict(self, configs):
+        if not self.samples or not configs:
+            return [None for config in configs]
+        points, known = self.features(configs)
+        correlation = self.correlation(points, self.points, self.lengthScale)
+        margins = correlation.dot(self.weights)
+        solved = numpy.linalg.solve(self.factor, correlation.T)
+        # Ratio of margin's posterior to prior variance, leaving out noise
+        ratios = numpy.maximum(1.0 - (solved ** 2).sum(axis=0), 0.0)
+        numeric = len(self.center)
+        inside = numpy.all(
+            (points[:, :numeric] >= self.points[:, :numeric].min(axis=0) - 1.0e-9) &
+            (points[:, :numeric] <= self.points[:, :numeric].max(axis=0) + 1.0e-9),
+            axis=1
+        )
+        variances = self.variance * (ratios + self.noise)
+        predictions = []
+        covered = inside & (ratios <= MAX_VARIANCE_RATIO)
+        for config, margin, variance, isCovered, isKnown in zip(configs, margins, variances, covered, known):
+            deviation = math.sqrt(variance)
+            velocity = float(config['projectile']['velocity'])
+            perforated = bool(margin > 0.0)
+            predictions.append(
+                {
+                    'margin': float(margin),
+                    'deviation': deviation,
+                    'confidence': abs(margin) / deviation if deviation > 0.0 else float('inf'),
+                    'known': bool(isKnown),
+                    'covered': bool(isCovered),
+                    'samples': len(self.samples),
+                    'trained': self.trained,
+                    'predicted': True,
+                    'impactVelocity': velocity,
+                    'perforated': perforated,
+                    'residualVelocity': float(margin) * velocity if perforated else 0.0,
+                    'penetration': None if perforated else (1.0 + float(margin)) * targetPathLength(config)
+                }
+            )
+        return predictions
+
+
+# Whether predicted case may be skipped - the model must be trained on enough samples, know case's materials and
+# projectile, cover the case with its samples and predict its outcome with given confidence
+def isSkippable(prediction, confidence):
+    return prediction is not None and prediction['samples'] >= MIN_SAMPLES and prediction['known'] and \
+        prediction['covered'] and prediction['confidence'] >= confidence
+
+
+# Settings of configuration's surrogate - its 'surrogate' entry is true or dictionary of model's file, confidence
+# and skip log, which defaults to <model>-skipped.json next to model's file
+def surrogateSettings(config):
+    settings = config.get('surrogate')
+    if not isinstance(settings, dict):
+        settings = {}
+    model = os.path.abspath(settings.get('model', SURROGATE_FILE))
+    return (
+        model,
+        float(settings.get('confidence', DEFAULT_CONFIDENCE)),
+        os.path.abspath(settings.get('log', os.path.splitext(model)[0] + "-skipped.json"))
+    )
+
+
+# Cases whose outcome surrogate predicts confidently, so they may be skipped - cases of configurations with
+# 'surrogate' entry are scored by their surrogate model and skipped where isSkippable allows it. Each skip is appended to the skip log as single line of JSON. Returns
+# predictions of skipped cases by model name
+def skippedCases(cases):
+    groups = {}
+    for name, config in cases:
+        if config.get('surrogate'):
+            groups.setdefault(surrogateSettings(config), []).append((name, config))
+    skipped = {}
+    for (model, confidence, log), group in sorted(groups.items()):
+        surrogate = ImpactTestSurrogate(model)
+        if len(surrogate.samples) < MIN_SAMPLES:
+            continue
+        predictions = surrogate.predict([config for (name, config) in group])
+        lines = []
+        for (name, config), prediction in zip(group, predictions):
+            if isSkippable(prediction, confidence):
+                skipped[name] = prediction
+                lines.append(json.dumps(
+                    {
+                        'name': name,
+                        'time': time.time(),
+                        'config': config,
+                        'prediction': prediction
+                    },
+                    sort_keys=True
+                ))
+        if lines:
+            with open(log, 'a') as file:
+                file.write("\n".join(lines) + "\n")
+    return skipped
+
+
+# Run as 'python ImpactTestSurrogate.py train Sweep-manifest.json ...' to fold new results into surrogate model, or
+# 'python ImpactTestSurrogate.py predict sweep.json' to score sweep's cases
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train surrogate model of impacts' outcomes or score sweep's cases")
+    parser.add_argument('command', choices=('train', 'predict'), help="command")
+    parser.add_argument('files', nargs='*', help="manifests to train on, or sweep specifications to score")
+    parser.add_argument('-m', '--model', default=SURROGATE_FILE, help="surrogate model's file")
+    parser.add_argument('-s', '--store', default=STORE_DIRECTORY, help="output store to train on")
+    parser.add_argument('-c', '--confidence', type=float, default=DEFAULT_CONFIDENCE,
+                        help="standard deviations between predicted margin and threshold needed to skip a case")
+    args = parser.parse_args()
+    surrogate = ImpactTestSurrogate(args.model)
+    if args.command == 'train':
+        count = len(surrogate.samples)
+        surrogate.train(collectSamples(args.store, args.files))
+        print("Surrogate trained on %d samples, %d new, length scale %g, noise ratio %g" % (
+            len(surrogate.samples),
+            len(surrogate.samples) - count,
+            surrogate.lengthScale,
+            surrogate.noise
+        ))
+        sys.exit(0)
+    cases = []
+    for filename in args.files:
+        cases += loadSweep(filename)[1]
+    predictions = surrogate.predict([config for (name, config) in cases])
+    skipped = 0
+    for (name, config), prediction in zip(cases, predictions):
+        if prediction is None:
+            print("%s: no surrogate model" % name)
+            continue
+        skip = isSkippable(prediction, args.confidence)
+        skipped += skip
+        print("%s: %s, margin %.3f +/- %.3f%s%s" % (
+            name,
+            'perforated' if prediction['perforated'] else 'stopped',
+            prediction['margin'],
+            prediction['deviation'],
+            '' if prediction['covered'] else ', outside training samples',
+            ', skipped' if skip else ''
+        ))
+    print("%d of %d cases would be skipped" % (skipped, len(cases)))
+    sys.exit(0)
@@ -0,0 +1,385 @@
+import math
+
+import numpy
+
+# Name of section controls shared by all target layers' sections
+SECTION_CONTROLS = "Target-controls"
+
+
+# Target plate's mesh written directly to input file, bypassing Abaqus/CAE sketches, sweeps and meshing. Naming of
+# parts, instances, sets, surfaces and ties follows ImpactTestKernel, so the result is equivalent to CAE-built target
+class ImpactTestTarget():
+    # Initialize target with its layers and dimensions in [m] and obliquity in [deg]. Outer parts are graded radially if
+    # grading - growth ratio and maximum element size in [m] - is given. Half target keeps only layers' side of positive
+    # X coordinates, with symmetry boundary condition on their cut faces
+    def __init__(self, layers, radius, innerRadius, obliquity, meshElementSize, grading=None, half=False):
+        # List of target layers - describing layers thickness in [m], spacing in [m] and material
+        self.layers = layers
+        # Target semi-minor axis in [m]
+        self.radius = radius
+        # Target center semi-minor axis in [m]
+        self.innerRadius = innerRadius
+        # Target obliquity in [deg]
+        self.obliquity = obliquity
+        # Average mesh element size of inner parts in [m]
+        self.meshElementSize = meshElementSize
+        # Outer parts are meshed four times coarser, like in ImpactTestKernel.createTargetMesh
+        self.outerElementSize = meshElementSize * 4.0
+        # Conversion from [deg] to [rad]
+        radians = math.pi * obliquity / 180.0
+        # Stretch ratio of elliptic target, same as in target sketches
+        self.stretch = 1.0 / math.cos(radians)
+        self.sine = math.sin(radians)
+        # Planar meshes shared by all layers
+        self.half = half
+        self.innerNodes, self.innerQuads, self.innerRim = discMesh(innerRadius, meshElementSize, even=half)
+        # Outer parts' radial element sizes grow from inner parts' element size, like in ImpactTestKernel's graded
+        # seeding - graded over semi-major axis' stretched length, then scaled back to unit-stretch ring
+        radialSizes = None
+        if grading is not None:
+            radialSizes = [
+                element / self.stretch for element in
+                gradedSizes((radius - innerRadius) * self.stretch, meshElementSize, grading[0], grading[1])
+            ]
+        self.outerNodes, self.outerQuads, self.outerInnerRim, self.outerSides = ringMesh(
+            innerRadius,
+            radius,
+            self.outerElementSize,
+            radialSizes
+        )
+        # Nodes on symmetry plane, none unless target is halved
+        self.innerSymmetry = numpy.zeros(0, dtype=int)
+        self.outerSymmetry = numpy.zeros(0, dtype=int)
+        if half:
+            self.innerNodes, self.innerQuads, self.innerRim, nodeMap = halfMesh(
+                self.innerNodes,
+                self.innerQuads,
+                self.innerRim
+            )
+            self.outerNodes, self.outerQuads, self.outerInnerRim, nodeMap = halfMesh(
+                self.outerNodes,
+                self.outerQuads,
+                self.outerInnerRim
+            )
+            self.outerSides = nodeMap[self.outerSides]
+            self.outerSides = self.outerSides[self.outerSides >= 0]
+            self.innerSymmetry = numpy.flatnonzero(self.innerNodes[:, 0] == 0.0)
+            self.outerSymmetry = numpy.flatnonzero(self.outerNodes[:, 0] == 0.0)
+
+    # Names, thicknesses, spacings, materials and offsets of layers' instances, as in createModelAssembly
+    def layerPlacement(self):
+        placement = []
+        offset = 0.0
+        previousSpacing = 0.0
+        for i, layer in enumerate(self.layers):
+            offset -= layer['thickness'] + previousSpacing
+            verticalOffset = -self.sine * offset
+            placement.append(
+                (
+                    'Target-L' + str(i + 1).zfill(3),
+                    layer,
+                    (0.0, verticalOffset, offset)
+                )
+            )
+            previousSpacing = layer['spacing']
+        return placement
+
+    # Number of elements of all target layers
+    def elementCount(self):
+        return sum(count for (name, count) in self.instanceElementCounts())
+
+    # Names of layers' instances and their element counts
+    def instanceElementCounts(self):
+        counts = []
+        for name, layer, translation in self.layerPlacement():
+            counts.append((name + "I", len(self.innerQuads) * self.__divisions(layer, self.meshElementSize)))
+            counts.append((name + "O", len(self.outerQuads) * self.__divisions(layer, self.outerElementSize)))
+        return counts
+
+    # Names, layers, node coordinates and hexahedra's node indices of all layers' parts
+    def layerMeshes(self):
+        for name, layer, translation in self.layerPlacement():
+            for suffix, planar, quads, size in (
+                    ("I", self.innerNodes, self.innerQuads, self.meshElementSize),
+                    ("O", self.outerNodes, self.outerQuads, self.outerElementSize)
+            ):
+                nodes, hexes = self.__sweep(planar, quads, layer, size)
+                yield name + suffix, layer, nodes, hexes
+
+    # Part definitions - to be placed before assembly
+    def partLines(self):
+        for name, layer, nodes, hexes in self.layerMeshes():
+            yield "*Part, name=" + name
+            yield "*Node"
+            for line in nodeLines(nodes):
+                yield line
+            yield "*Element, type=C3D8RT"
+            for line in elementLines(hexes):
+                yield line
+            yield "*Nset, nset=volume, generate"
+            yield " 1, %d, 1" % len(nodes)
+            yield "*Elset, elset=volume, generate"
+            yield " 1, %d, 1" % len(hexes)
+            yield "** Section: " + name
+            yield "*Solid Section, elset=volume, controls=%s, material=%s" % (
+                SECTION_CONTROLS,
+                inputName(layer['material'])
+            )
+            yield ","
+            yield "*End Part"
+            yield "**"
+
+    # Instances of layers' parts - to be placed at the beginning of assembly
+    def instanceLines(self):
+        for name, layer, translation in self.layerPlacement():
+            for suffix in ("I", "O"):
+                yield "*Instance, name=%s, part=%s" % (name + suffix, name + suffix)
+                yield "%.9g, %.9g, %.9g" % translation
+                yield "*End Instance"
+                yield "**"
+
+    # Sets, tie surfaces and ties - to be placed at the end of assembly
+    def assemblyLines(self):
+        for name, layer, translation in self.layerPlacement():
+            innerLevels = self.__divisions(layer, self.meshElementSize)
+            outerLevels = self.__divisions(layer, self.outerElementSize)
+            innerCount = len(self.innerNodes) * (innerLevels + 1)
+            outerCount = len(self.outerNodes) * (outerLevels + 1)
+            # Whole target is a part of initial temperature field's region
+            for suffix, nodeCount, elementCount in (
+                    ("I", innerCount, len(self.innerQuads) * innerLevels),
+                    ("O", outerCount, len(self.outerQuads) * outerLevels)
+            ):
+                yield "*Nset, nset=Entire-mass, instance=%s, generate" % (name + suffix)
+                yield " 1, %d, 1" % nodeCount
+                yield "*Elset, elset=Entire-mass, instance=%s, generate" % (name + suffix)
+                yield " 1, %d, 1" % elementCount
+                # Inner parts make target's impact region, to which field output may be limited
+                if suffix == "I":
+                    yield "*Nset, nset=Target-inner, instance=%s, generate" % (name + suffix)
+                    yield " 1, %d, 1" % nodeCount
+                    yield "*Elset, elset=Target-inner, instance=%s, generate" % (name + suffix)
+                    yield " 1, %d, 1" % elementCount
+            # Nodes on symmetry plane of half target
+            for suffix, symmetry, nodeCount, levels in (
+                    ("I", self.innerSymmetry, len(self.innerNodes), innerLevels),
+                    ("O", self.outerSymmetry, len(self.outerNodes), outerLevels)
+            ):
+                if len(symmetry):
+                    yield "*Nset, nset=Target-symmetry, instance=%s" % (name + suffix)
+                    for line in labelLines(levelLabels(symmetry, nodeCount, levels + 1)):
+                        yield line
+            # Nodes on sides of outer part are fixed
+            yield "*Nset, nset=Target-sides, instance=%s" % (name + "O")
+            sides = levelLabels(self.outerSides, len(self.outerNodes), outerLevels + 1)
+            for line in labelLines(sides):
+                yield line
+            # Surfaces tying inner part's rim to outer part's inner rim
+            for suffix, rim, quadCount, levels, face in (
+                    ("I", self.innerRim, len(self.innerQuads), innerLevels, "S4"),
+                    ("O", self.outerInnerRim, len(self.outerQuads), outerLevels, "S6")
+            ):
+                surface = name + suffix + "_TIE"
+                yield "*Elset, elset=_%s_%s, internal, instance=%s" % (surface, face, name + suffix)
+                for line in labelLines(levelLabels(rim, quadCount, levels)):
+                    yield line
+                yield "*Surface, type=ELEMENT, name=%s" % surface
+                yield "_%s_%s, %s" % (surface, face, face)
+            yield "** Constraint: %s_TIE" % name
+            yield "*Tie, name=%s_TIE, adjust=yes, type=SURFACE TO SURFACE" % name
+            yield "%s, %s" % (name + "I_TIE", name + "O_TIE")
+
+    # Section controls and boundary conditions - to be placed after assembly
+    def modelLines(self):
+        yield "*Section Controls, name=%s, element deletion=YES, hourglass=ENHANCED, " \
+              "kinematic split=AVERAGE STRAIN, max degradation=0.99" % SECTION_CONTROLS
+        yield "1., 1., 1."
+        yield "** Name: Fix-sides Type: Symmetry/Antisymmetry/Encastre"
+        yield "*Boundary"
+        yield "Target-sides, ENCASTRE"
+        if self.half:
+            yield "** Name: Target-symmetry Type: Symmetry/Antisymmetry/Encastre"
+            yield "*Boundary"
+            yield "Target-symmetry, XSYMM"
+
+    # Number of element layers through layer's thickness
+    def __divisions(self, layer, size):
+        return max(1, int(math.ceil(layer['thickness'] / size)))
+
+    # Sweep planar mesh through layer's thickness along oblique path, as in createTargetParts
+    def __sweep(self, planar, quads, layer, size):
+        levels = self.__divisions(layer, size)
+        fractions = numpy.linspace(0.0, 1.0, levels + 1)
+        count = len(planar)
+        depth = numpy.repeat(fractions * layer['thickness'], count)
+        nodes = numpy.empty((count * (levels + 1), 3))
+        nodes[:, 0] = numpy.tile(planar[:, 0], levels + 1)
+        nodes[:, 1] = numpy.tile(planar[:, 1] * self.stretch, levels + 1) - depth * self.sine
+        nodes[:, 2] = depth
+        offsets = numpy.repeat(numpy.arange(levels) * count, len(quads))
+        bottom = numpy.tile(quads, (levels, 1)) + offsets[:, numpy.newaxis]
+        hexes = numpy.hstack((bottom, bottom + count))
+        return nodes, hexes
+
+
+# Quad mesh of unit-stretch disc - square core surrounded by rings blending square's perimeter into the circle.
+# Returns node coordinates, quads' node indices (counterclockwise) and indices of quads on disc's rim. Even number of
+# square's divisions places nodes on disc's axes, so that the mesh may be halved
+def discMesh(radius, size, even=False):
+    half = 0.5 * radius
+    n = max(2, int(math.ceil(2.0 * half / size)))
+    if even and n % 2:
+        n += 1
+    m = max(1, int(math.ceil((radius - half) / size)))
+    ticks = numpy.linspace(-half, half, n + 1)
+    square = numpy.empty(((n + 1) * (n + 1), 2))
+    square[:, 0] = numpy.tile(ticks, n + 1)
+    square[:, 1] = numpy.repeat(ticks, n + 1)
+    # Square's quads
+    i = numpy.tile(numpy.arange(n), n)
+    j = numpy.repeat(numpy.arange(n), n)
+    first = j * (n + 1) + i
+    quads = [numpy.column_stack((first, first + 1, first + n + 2, first + n + 1))]
+    # Square's perimeter, counterclockwise
+    steps = numpy.arange(n)
+    perimeter = numpy.concatenate((
+        steps,
+        n + steps * (n + 1),
+        (n + 1) * (n + 1) - 1 - steps,
+        (n - steps) * (n + 1)
+    ))
+    inner = square[perimeter]
+    angles = numpy.arctan2(inner[:, 1], inner[:, 0])
+    outer = radius * numpy.column_stack((numpy.cos(angles), numpy.sin(angles)))
+    # Rings between square's perimeter and the circle
+    count = len(perimeter)
+    rings = [perimeter]
+    points = [square]
+    for k in range(1, m + 1):
+        points.append(inner + (outer - inner) * float(k) / m)
+        rings.append(len(square) + (k - 1) * count + numpy.arange(count))
+    following = numpy.roll(numpy.arange(count), -1)
+    for k in range(m):
+        quads.append(
+            numpy.column_stack((
+                rings[k],
+                rings[k + 1],
+                rings[k + 1][following],
+                rings[k][following]
+            ))
+        )
+    quads = numpy.vstack(quads)
+    rim = numpy.arange(len(quads) - count, len(quads))
+    return numpy.vstack(points), quads, rim
+
+
+# Quad mesh of unit-stretch ring, uniform or with given radial element sizes. Returns node coordinates, quads' node
+# indices (counterclockwise), indices of quads on ring's inner rim and indices of nodes on its outer rim
+def ringMesh(innerRadius, radius, size, radialSizes=None):
+    segments = 4 * max(2, int(math.ceil(2.0 * math.pi * innerRadius / size / 4.0)))
+    if radialSizes is None:
+        radii = numpy.linspace(innerRadius, radius, max(1, int(math.ceil((radius - innerRadius) / size))) + 1)
+    else:
+        radii = innerRadius + numpy.concatenate(([0.0], numpy.cumsum(radialSizes)))
+        radii[-1] = radius
+    return polarMesh(radii, segments)
+
+
+# Half of planar mesh whose quads lie on side of positive X coordinates, with nodes on Y axis placed exactly on it.
+# Returns node coordinates, quads' node indices, indices of given quads kept in the half and map of nodes' indices,
+# -1 for removed nodes
+def halfMesh(nodes, quads, indices):
+    keep = nodes[quads][:, :, 0].mean(axis=1) > 0.0
+    used = numpy.unique(quads[keep])
+    nodeMap = numpy.full(len(nodes), -1, dtype=int)
+    nodeMap[used] = numpy.arange(len(used))
+    quadMap = numpy.full(len(quads), -1, dtype=int)
+    quadMap[keep] = numpy.arange(numpy.count_nonzero(keep))
+    halved = nodes[used]
+    tolerance = 1.0e-9 * numpy.max(numpy.abs(nodes))
+    halved[numpy.abs(halved[:, 0]) < tolerance, 0] = 0.0
+    indices = quadMap[indices]
+    return halved, nodeMap[quads[keep]], indices[indices >= 0], nodeMap
+
+
+# Element sizes in [m] of edge of given length seeded with single bias - geometric progression starting at given size,
+# growing by at most growth ratio per element and ending at most at maximum size. The fewest elements satisfying both
+# limits are used, so progression is the same as Abaqus/CAE's seedEdgeByBias with resulting number and ratio
+def gradedSizes(length, size, growthRatio, maxSize):
+    n = 1
+    while True:
+        if size * n >= length:
+            # Uniform seeding is fine enough
+            return [length / n] * n
+        if progressionLength(size, growthRatio, n) >= length:
+            low, high = 1.0, growthRatio
+            for i in range(60):
+                growth = 0.5 * (low + high)
+                if progressionLength(size, growth, n) < length:
+                    low = growth
+                else:
+                    high = growth
+            growth = 0.5 * (low + high)
+            if size * growth ** (n - 1) <= maxSize:
+                sizes = [size * growth ** i for i in range(n)]
+                return [element * length / sum(sizes) for element in sizes]
+        n += 1
+
+
+# Length of geometric progression of given number of elements
+def progressionLength(size, growth, n):
+    if growth == 1.0:
+        return size * n
+    return size * (growth ** n - 1.0) / (growth - 1.0)
+
+
+# Quad mesh of ring with given radial node positions and number of circumferential segments
+def polarMesh(radii, segments):
+    count = len(radii)
+    angles = numpy.repeat(numpy.arange(segments) * 2.0 * math.pi / segments, count)
+    rho = numpy.tile(radii, segments)
+    nodes = numpy.column_stack((rho * numpy.cos(angles), rho * numpy.sin(angles)))
+    a = numpy.repeat(numpy.arange(segments), count - 1)
+    b = numpy.tile(numpy.arange(count - 1), segments)
+    following = (a + 1) % segments
+    quads = numpy.column_stack((
+        a * count + b,
+        a * count + b + 1,
+        following * count + b + 1,
+        following * count + b
+    ))
+    rim = numpy.arange(segments) * (count - 1)
+    sides = numpy.arange(segments) * count + count - 1
+    return nodes, quads, rim, sides
+
+
+# One-based labels of given planar entities repeated on each of given number of levels
+def levelLabels(indices, perLevel, levels):
+    return (numpy.arange(levels)[:, numpy.newaxis] * perLevel + indices[numpy.newaxis, :]).ravel() + 1
+
+
+# Node definition data lines
+def nodeLines(nodes):
+    for label, (x, y, z) in enumerate(nodes.tolist()):
+        yield "%d, %.9g, %.9g, %.9g" % (label + 1, x, y, z)
+
+
+# Element definition data lines
+def elementLines(elements):
+    for label, nodes in enumerate((elements + 1).tolist()):
+        yield "%d, " % (label + 1) + ", ".join([str(node) for node in nodes])
+
+
+# Set data lines - at most 16 labels per line
+def labelLines(labels):
+    labels = [str(label) for label in numpy.sort(labels).tolist()]
+    for i in range(0, len(labels), 16):
+        yield ", ".join(labels[i:i + 16])
+
+
+# Quote name for input file if it contains characters other than letters, digits, dashes and underscores
+def inputName(name):
+    name = str(name)
+    if all(c.isalnum() or c in "-_" for c in name):
+        return name
+    return '"' + name + '"'
@@ -0,0 +1,329 @@
+import argparse
+import json
+import math
+import os
+import shlex
+import subprocess
+import sys
+
+import numpy
+
+from ImpactTestConfig import LIMITS
+from ImpactTestPool import DEFAULT_COMMAND as BUILD_COMMAND, runPool
+from ImpactTestScheduler import DEFAULT_COMMAND as SOLVE_COMMAND, ImpactTestScheduler
+
+# Command summarizing results of round's manifest - {script} is results reader, {manifest} is round's manifest
+RESULTS_COMMAND = "abaqus python {script} {manifest}"
+# Half-width in [m/s] of V50's confidence interval at which the search stops
+DEFAULT_TOLERANCE = 10.0
+# Number of velocities solved in parallel in each round
+DEFAULT_CANDIDATES = 4
+# Largest number of rounds
+DEFAULT_ROUNDS = 8
+# Two-sided 95 [%] confidence interval's quantile of normal distribution
+CONFIDENCE_QUANTILE = 1.96
+# Ridge penalty of logistic fit's coefficients, keeping the fit finite when outcomes are separated by velocity
+LOGISTIC_RIDGE = 0.01
+# Velocities closer than this in [m/s] are considered the same shot
+VELOCITY_RESOLUTION = 0.1
+
+
+# Build, solve and summarize named configurations in working directory - given number of Abaqus/CAE sessions builds
+# them, incrementally where they differ only by velocity, and scheduler solves them in parallel. Returns summaries of
+# results by model name, surrogate's predictions of skipped models, and nothing for models which failed to build,
+# solve or summarize
+def solveCases(cases, name, directory, scheduler, workers=1, buildCommand=BUILD_COMMAND,
+               resultsCommand=RESULTS_COMMAND):
+    spec = os.path.join(directory, name + ".json")
+    with open(spec, 'w') as file:
+        json.dump(
+            {
+                'modelName': name,
+                'incremental': True,
+                'cases': cases
+            },
+            file,
+            indent=2
+        )
+    runPool(spec, workers, directory, buildCommand)
+    manifest = os.path.join(directory, name + "-manifest.json")
+    scheduler.addManifest(manifest)
+    scheduler.run(1.0)
+    script = os.path.join(os.path.dirname(os.path.realpath(__file__)), "ImpactTestResults.py")
+    subprocess.call(
+        shlex.split(resultsCommand.format(script=script, manifest=manifest), posix=(os.name != 'nt')),
+        cwd=directory,
+        shell=(os.name == 'nt')
+    )
+    summaries = {}
+    with open(manifest) as file:
+        for entry in json.load(file):
+            if entry['status'] == 'predicted':
+                summaries[entry['name']] = entry['prediction']
+    for config in cases:
+        results = os.path.join(directory, config['modelName'] + "-results.json")
+        if os.path.exists(results):
+            with open(results) as file:
+                summaries[config['modelName']] = json.load(file)
+    return summaries
+
+
+# Penalized maximum likelihood fit of perforation probability P(v) = 1 / (1 + exp(-(v - v50) / scale)) to shots'
+# velocities in [m/s] and outcomes. Returns V50, scale and V50's standard error in [m/s]
+def fitLogistic(velocities, outcomes):
+    velocities = numpy.asarray(velocities, dtype=float)
+    outcomes = numpy.asarray(outcomes, dtype=float)
+    # Velocities are normalized, so the penalty doesn't depend on their units
+    center = numpy.mean(velocities)
+    width = max(numpy.std(velocities), VELOCITY_RESOLUTION)
+    design = numpy.column_stack((numpy.ones(len(velocities)), (velocities - center) / width))
+    coefficients = numpy.zeros(2)
+    hessian = numpy.eye(2)
+    for i in range(100):
+        probabilities = 1.0 / (1.0 + numpy.exp(-design.dot(coefficients)))
+        gradient = design.T.dot(outcomes - probabilities) - LOGISTIC_RIDGE * coefficients
+        weights = probabilities * (1.0 - probabilities)
+        hessian = (design.T * weights).dot(design) + LOGISTIC_RIDGE * numpy.eye(2)
+        step = numpy.linalg.solve(hessian, gradient)
+        coefficients = coefficients + step
+        if numpy.max(numpy.abs(step)) < 1.0e-8:
+            break
+    intercept, slope = coefficients
+    slope = max(slope, 1.0e-12)
+    # Standard error of -intercept / slope by delta method
+    covariance = numpy.linalg.inv(hessian)
+    derivative = numpy.array([-1.0 / slope, intercept / slope ** 2])
+    error = math.sqrt(max(derivative.dot(covariance).dot(derivative), 0.0))
+    return center - intercept / slope * width, width / slope, error * width
+
+
+# Bracketing and bisection search - velocities are spread over search range until there are both perforating and
+# stopped shots, then the bracket between the fastest stopped and the slowest perforating shot is split evenly
+class BisectionStrategy():
+    def __init__(self, low, high, candidates=DEFAULT_CANDIDATES, tolerance=DEFAULT_TOLERANCE):
+        # Initial search range in [m/s]
+        self.low = float(low)
+        self.high = float(high)
+        self.candidates = max(1, int(candidates))
+        self.tolerance = float(tolerance)
+        # Velocities the search may extend to
+        self.minimum, self.maximum = LIMITS['projectile.velocity'][:2]
+
+    # Fastest stopped and slowest perforating shot's velocity, None if there's no such shot
+    def bracket(self, shots):
+        stopped = [shot['velocity'] for shot in shots if not shot['perforated']]
+        perforating = [shot['velocity'] for shot in shots if shot['perforated']]
+        return max(stopped) if stopped else None, min(perforating) if perforating else None
+
+    # V50 and half-width of its interval in [m/s], None until it's bracketed. Overlapping outcomes, f.e. stopped shot
+    # faster than perforating one, form zone of mixed results whose middle is taken
+    def estimate(self, shots):
+        low, high = self.bracket(shots)
+        if low is None or high is None:
+            return None
+        return 0.5 * (low + high), 0.5 * abs(high - low)
+
+    # Velocities of next round's shots, empty once the search is finished
+    def nextVelocities(self, shots):
+        low, high = self.bracket(shots)
+        width = self.high - self.low
+        if not shots:
+            velocities = numpy.linspace(self.low, self.high, max(2, self.candidates))
+        elif high is None:
+            # Nothing perforated yet - search range is moved above the fastest shot
+            velocities = low + width * numpy.arange(1, self.candidates + 1) / self.candidates
+        elif low is None:
+            # Everything perforated - search range is moved below the slowest shot
+            velocities = high - width * numpy.arange(1, self.candidates + 1) / self.candidates
+        elif high - low <= 2.0 * self.tolerance:
+            # Bracket is narrow enough - or outcomes are mixed, which further shots won't resolve
+            return []
+        else:
+            velocities = low + (high - low) * numpy.arange(1, self.candidates + 1) / (self.candidates + 1)
+        return self.newVelocities(velocities, shots)
+
+    # Velocities within limits which haven't been shot yet
+    def newVelocities(self, velocities, shots):
+        result = []
+        for velocity in numpy.clip(velocities, self.minimum, self.maximum):
+            velocity = round(float(velocity), 1)
+            if all(abs(velocity - other) >= VELOCITY_RESOLUTION for other in [shot['velocity'] for shot in shots] + result):
+                result.append(velocity)
+        return result
+
+
+# Logistic fit search - once there are both perforating and stopped shots, perforation probability is fitted to all
+# of them and next shots are placed around fitted V50, spread over its confidence interval. Suits models whose
+# outcomes overlap, f.e. due to mesh sensitivity, while bisection suits deterministic ones
+class LogisticStrategy(BisectionStrategy):
+    # V50 and half-width of its confidence interval in [m/s], None until both outcomes are present
+    def estimate(self, shots):
+        low, high = self.bracket(shots)
+        if low is None or high is None:
+            return None
+        v50, scale, error = fitLogistic(
+            [shot['velocity'] for shot in shots],
+            [shot['perforated'] for shot in shots]
+        )
+        return v50, CONFIDENCE_QUANTILE * error
+
+    # Velocities of next round's shots, empty once the search is finished
+    def nextVelocities(self, shots):
+        estimate = self.estimate(shots)
+        if estimate is None:
+            return BisectionStrategy.nextVelocities(self, shots)
+        v50, halfWidth = estimate
+        if halfWidth <= self.tolerance:
+            return []
+        if self.candidates == 1:
+            return self.newVelocities([v50], shots)
+        return self.newVelocities(v50 + halfWidth * numpy.linspace(-1.0, 1.0, self.candidates), shots)
+
+
+# Search strategies by name
+STRATEGIES = {
+    'bisection': BisectionStrategy,
+    'logistic': LogisticStrategy
+}
+
+
+# Ballistic limit search - each round builds and solves models of base configuration at velocities chosen by search
+# strategy, in parallel, and reads whether they perforated the target from their results
+class ImpactTestV50():
+    def __init__(self, config, prefix, low, high, strategy='bisection', tolerance=DEFAULT_TOLERANCE,
+                 candidates=DEFAULT_CANDIDATES, rounds=DEFAULT_ROUNDS, directory=None, cpus=None, cpusPerJob=None,
+                 buildCommand=BUILD_COMMAND, solveCommand=SOLVE_COMMAND, resultsCommand=RESULTS_COMMAND):
+        self.config = config
+        # Prefix of rounds' model names and of search's files
+        self.prefix = str(prefix)
+        if strategy not in STRATEGIES:
+            raise ValueError("Unknown search strategy: %s" % strategy)
+        self.strategyName = strategy
+        self.strategy = STRATEGIES[strategy](low, high, candidates, tolerance)
+        self.rounds = int(rounds)
+        # Working directory of all rounds' models, results and search report
+        self.directory = os.path.abspath(directory or os.getcwd())
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+        self.scheduler = ImpactTestScheduler(
+            os.path.join(self.directory, self.prefix + "-queue.json"),
+            budget=cpus,
+            cpusPerJob=cpusPerJob,
+            command=solveCommand
+        )
+        self.buildCommand = buildCommand
+        self.resultsCommand = resultsCommand
+        # Shots - velocity, outcome and residual velocity of each solved model
+        self.shots = []
+        # Names of models which failed to build, solve or summarize
+        self.failed = []
+
+    # Run search until V50 is known within tolerance, or rounds are exhausted. Returns search report
+    def run(self):
+        for i in range(self.rounds):
+            velocities = self.strategy.nextVelocities(self.shots)
+            if not velocities:
+                break
+            shots = self.shoot(i + 1, velocities)
+            if not shots:
+                # The same velocities would be chosen again
+                break
+            self.shots += shots
+            self.writeReport()
+        return self.writeReport()
+
+    # Build, solve and summarize round's models at given velocities in [m/s], returning their shots
+    def shoot(self, round, velocities):
+        name = "%s-R%02d" % (self.prefix, round)
+        cases = []
+        for i, velocity in enumerate(velocities):
+            config = json.loads(json.dumps(self.config))
+            config['projectile']['velocity'] = velocity
+            config['modelName'] = "%s-%03d" % (name, i + 1)
+            cases.append(config)
+        # Round's models differ only by velocity, so single session builds them incrementally
+        summaries = solveCases(
+            cases,
+            name,
+            self.directory,
+            self.scheduler,
+            buildCommand=self.buildCommand,
+            resultsCommand=self.resultsCommand
+        )
+        shots = []
+        for config in cases:
+            summary = summaries.get(config['modelName'])
+            if summary is None:
+                self.failed.append(config['modelName'])
+                continue
+            shots.append(
+                {
+                    'name': config['modelName'],
+                    'round': round,
+                    'velocity': config['projectile']['velocity'],
+                    'perforated': summary['perforated'],
+                    'residualVelocity': summary['residualVelocity'],
+                    'predicted': summary.get('predicted', False)
+                }
+            )
+        return shots
+
+    # Write search report to <prefix>-v50.json - V50 estimate, its interval and all shots
+    def writeReport(self):
+        estimate = self.strategy.estimate(self.shots)
+        report = {
+            'strategy': self.strategyName,
+            'tolerance': self.strategy.tolerance,
+            'v50': estimate[0] if estimate else None,
+            'halfWidth': estimate[1] if estimate else None,
+            'converged': bool(estimate) and not self.strategy.nextVelocities(self.shots),
+            'shots': self.shots,
+            'failed': self.failed
+        }
+        with open(os.path.join(self.directory, self.prefix + "-v50.json"), 'w') as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+        return report
+
+
+# Run as 'python ImpactTestV50.py base.cfg --low 400 --high 1200 --cpus 16 --cpus-per-job 4'
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search for ballistic limit V50 of configuration's target")
+    parser.add_argument('config', help="base configuration file")
+    parser.add_argument('--low', type=float, required=True, help="lower bound of initial search range in [m/s]")
+    parser.add_argument('--high', type=float, required=True, help="upper bound of initial search range in [m/s]")
+    parser.add_argument('-s', '--strategy', default='bisection', choices=sorted(STRATEGIES), help="search strategy")
+    parser.add_argument('-t', '--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="half-width of V50's interval in [m/s] to stop at")
+    parser.add_argument('-n', '--candidates', type=int, default=DEFAULT_CANDIDATES, help="velocities per round")
+    parser.add_argument('-r', '--rounds', type=int, default=DEFAULT_ROUNDS, help="largest number of rounds")
+    parser.add_argument('-o', '--output', default=None, help="working directory of models and report")
+    parser.add_argument('--cpus', type=int, default=None, help="total number of cores, defaults to all")
+    parser.add_argument('--cpus-per-job', type=int, default=None, help="cores assigned to each job")
+    parser.add_argument('--build-command', default=BUILD_COMMAND, help="model building command template")
+    parser.add_argument('--solve-command', default=SOLVE_COMMAND, help="job command template")
+    parser.add_argument('--results-command', default=RESULTS_COMMAND, help="results summarizing command template")
+    args = parser.parse_args()
+    with open(args.config) as file:
+        config = json.load(file)
+    prefix = config.get('modelName') or os.path.splitext(os.path.basename(args.config))[0]
+    report = ImpactTestV50(
+        config,
+        prefix,
+        args.low,
+        args.high,
+        strategy=args.strategy,
+        tolerance=args.tolerance,
+        candidates=args.candidates,
+        rounds=args.rounds,
+        directory=args.output,
+        cpus=args.cpus,
+        cpusPerJob=args.cpus_per_job,
+        buildCommand=args.build_command,
+        solveCommand=args.solve_command,
+        resultsCommand=args.results_command
+    ).run()
+    if report['v50'] is None:
+        print("V50 not bracketed after %d shots" % len(report['shots']))
+    else:
+        print("V50 = %.1f +/- %.1f [m/s] after %d shots" % (report['v50'], report['halfWidth'], len(report['shots'])))
+    sys.exit(0 if report['converged'] else 1)
@@ -0,0 +1,318 @@
+import argparse
+import json
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import time
+
+# Plugin's modules and stand-in abaqus modules are importable without Abaqus/CAE
+__benchmarkDirectory = os.path.dirname(os.path.realpath(__file__))
+for __path in (os.path.join(__benchmarkDirectory, "fakeabaqus"), os.path.dirname(__benchmarkDirectory)):
+    if __path not in sys.path:
+        sys.path.insert(0, __path)
+
+import abaqusFake
+import ImpactTestKernel
+import ImpactTestLibrary
+from ImpactTestInput import InputIndex, InputRewriter, isComment, isKeyword
+
+# Baseline of scenarios' times, stored along with the suite
+BASELINE = os.path.join(__benchmarkDirectory, "baseline.json")
+# Differences in [s] below timer's practical resolution are never reported as regressions
+RESOLUTION = 0.005
+# Mesh element sizes in [m] of coarse and fine scenarios
+MESH_SIZES = (
+    ('coarse', 0.002),
+    ('fine', 0.0005)
+)
+
+
+# Configuration of benchmarked model with given number of layers and mesh element size
+def modelConfig(layers, meshElementSize, fastTarget=False):
+    return {
+        'projectile': {
+            'type': 'Bench',
+            'velocity': 800.0
+        },
+        'armor': {
+            'radius': 0.05,
+            'innerRadius': 0.01,
+            'obliquity': 30.0,
+            'layers': [
+                {
+                    'material': 'Steel',
+                    'thickness': 0.004,
+                    'spacing': 0.001 if i < layers - 1 else 0.0
+                } for i in range(layers)
+            ]
+        },
+        'meshElementSize': meshElementSize,
+        'failureCoefficient': 1.0,
+        'fastTarget': fastTarget
+    }
+
+
+# Fresh stand-in model database with projectile's parts and material in template model
+def resetDatabase():
+    abaqusFake.Mdb()
+    abaqusFake.resetCalls()
+    ImpactTestKernel.meshedModels.clear()
+    model = abaqusFake.mdb.models['Model-1']
+    for name in ('Projectile-Bench-00', 'Projectile-Bench-01'):
+        model.PartFromGeometryFile(name, None)
+    abaqusFake.createMaterialFromDataString('Model-1', 'Steel', 1.0, '')
+
+
+# Write material library of given number of materials as text pickle, like Abaqus/CAE does
+def writeLibrary(path, count):
+    lib = [(0, -1, 'Bench', 0, {})]
+    for i in range(count):
+        name = "Material-%05d" % i
+        lib.append((1, 0, name, 0, {'Vendor material name': name, 'version': 1.0, 'Data': "x" * 2000}))
+    with open(path, 'wb') as file:
+        pickle.dump(lib, file, 0)
+
+
+# Write projectile directories with ACIS file placeholder and elements.cfg
+def writeParts(directory, count):
+    for i in range(count):
+        path = os.path.join(directory, "Bench%02d" % i)
+        os.makedirs(path)
+        with open(os.path.join(path, "Projectile.sat"), 'w') as file:
+            file.write("ACIS placeholder\n")
+        with open(os.path.join(path, "elements.cfg"), 'w') as file:
+            json.dump([{'material': 'Steel', 'id': 1}, {'material': 'Steel', 'id': 2}], file)
+
+
+# Write input file with given number of elements, laid out like the ones written by Abaqus/CAE
+def writeInput(path, elements):
+    with open(path, 'w') as file:
+        file.write("*Heading\n**\n** PARTS\n**\n")
+        for part in ('Projectile-Bench-00', 'Target-L001I'):
+            file.write("*Part, name=%s\n*Node\n" % part)
+            for i in range(1, elements + 1):
+                file.write("%7d, %13.9f, %13.9f, %13.9f\n" % (i, i * 1e-6, 0.0, 0.0))
+            file.write("*Element, type=C3D8RT\n")
+            for i in range(1, elements + 1):
+                file.write("%d, %d, %d, %d, %d, %d, %d, %d, %d\n" % ((i,) + (i,) * 8))
+            file.write("*End Part\n**\n")
+        file.write("**\n** ASSEMBLY\n**\n*Assembly, name=Assembly\n**\n")
+        for instance in ('Projectile-Bench-00', 'Target-L001I'):
+            file.write("*Instance, name=%s, part=%s\n*End Instance\n**\n" % (instance, instance))
+        file.write("*Nset, nset=Target-sides, instance=Target-L001I, generate\n 1, %d, 1\n" % elements)
+        file.write("*End Assembly\n**\n** MATERIALS\n**\n*Material, name=Steel\n*Density\n 7850.,\n")
+
+
+# Benchmark scenario - timed run, preceded by untimed setup before each repeat
+class Scenario():
+    def __init__(self, name, run, setup=None):
+        self.name = name
+        self.run = run
+        self.setup = setup
+
+
+# Scenarios building whole models with the kernel
+def kernelScenarios():
+    scenarios = []
+    for layers in (1, 5, 20):
+        for label, size in MESH_SIZES:
+            scenarios.append(
+                Scenario(
+                    "kernel-L%02d-%s" % (layers, label),
+                    (lambda layers, size: lambda: ImpactTestKernel.ImpactTestKernel(
+                        modelConfig(layers, size), "Bench", template='Model-1'
+                    ).run())(layers, size),
+                    setup=resetDatabase
+                )
+            )
+    for layers in (1, 5):
+        scenarios.append(
+            Scenario(
+                "kernel-fast-L%02d-coarse" % layers,
+                (lambda layers: lambda: ImpactTestKernel.ImpactTestKernel(
+                    modelConfig(layers, MESH_SIZES[0][1], fastTarget=True), "Bench", template='Model-1'
+                ).run())(layers),
+                setup=resetDatabase
+            )
+        )
+    return scenarios
+
+
+# Scenarios reading material libraries
+def materialScenarios(directory):
+    scenarios = []
+    for count in (100, 2000):
+        libraries = os.path.join(directory, "Materials-%d" % count)
+
+        def write(libraries=libraries, count=count):
+            if not os.path.exists(libraries):
+                os.makedirs(libraries)
+                writeLibrary(os.path.join(libraries, "Bench.lib"), count)
+            index = os.path.join(libraries, ImpactTestLibrary.INDEX_FILE)
+            if os.path.exists(index):
+                os.remove(index)
+
+        def warm(libraries=libraries, count=count):
+            write(libraries, count)
+            ImpactTestLibrary.loadIndex(libraries)
+
+        def importFive(libraries=libraries, count=count):
+            warm(libraries, count)
+            resetDatabase()
+
+        scenarios.append(
+            Scenario(
+                "materials-index-cold-%d" % count,
+                (lambda libraries: lambda: ImpactTestLibrary.loadIndex(libraries))(libraries),
+                setup=write
+            )
+        )
+        scenarios.append(
+            Scenario(
+                "materials-index-warm-%d" % count,
+                (lambda libraries: lambda: ImpactTestLibrary.materialNames(libraries))(libraries),
+                setup=warm
+            )
+        )
+        scenarios.append(
+            Scenario(
+                "materials-import-%d" % count,
+                (lambda libraries: lambda: ImpactTestLibrary.importMaterials(
+                    'Model-1', ["Material-%05d" % i for i in range(5)], libraries
+                ))(libraries),
+                setup=importFive
+            )
+        )
+    return scenarios
+
+
+# Scenarios listing and importing projectiles' parts
+def partScenarios(directory):
+    parts = os.path.join(directory, "Parts")
+
+    def write():
+        if not os.path.exists(parts):
+            writeParts(parts, 30)
+        resetDatabase()
+
+    return [
+        Scenario(
+            "parts-catalog-30",
+            lambda: ImpactTestLibrary.partCatalog(parts),
+            setup=write
+        ),
+        Scenario(
+            "parts-import-30",
+            lambda: ImpactTestLibrary.importProjectile('Model-1', 'Bench15', parts),
+            setup=write
+        )
+    ]
+
+
+# Scenarios rewriting and indexing input files
+def inputScenarios(directory):
+    scenarios = []
+    for elements in (50000, 500000):
+        path = os.path.join(directory, "Bench-%d.inp" % elements)
+
+        def write(path=path, elements=elements):
+            writeInput(path, elements)
+            if os.path.exists(path + ".idx"):
+                os.remove(path + ".idx")
+
+        def rewrite(path=path):
+            rewriter = InputRewriter(path)
+            rewriter.insertBefore(isComment('** ASSEMBLY'), ["*Part, name=Inserted", "*End Part"])
+            rewriter.insertBefore(isKeyword('*End Assembly'), ["*Nset, nset=Inserted", " 1,"])
+            rewriter.remove(isKeyword('*Density'))
+            rewriter.rewrite()
+
+        def lookup(path=path):
+            with InputIndex(path) as index:
+                index.elementCount('Target-L001I')
+                index.labelCount(index.first('*Nset', nset='Target-sides'))
+
+        def indexed(path=path, elements=elements):
+            write(path, elements)
+            InputIndex(path).close()
+
+        scenarios.append(Scenario("input-rewrite-%d" % elements, rewrite, setup=write))
+        scenarios.append(
+            Scenario(
+                "input-index-%d" % elements,
+                (lambda path: lambda: InputIndex(path).close())(path),
+                setup=write
+            )
+        )
+        scenarios.append(Scenario("input-lookup-%d" % elements, lookup, setup=indexed))
+    return scenarios
+
+
+# Time scenario's run - the best of given number of repeats, each preceded by scenario's setup
+def measure(scenario, repeats):
+    best = None
+    for i in range(repeats):
+        if scenario.setup is not None:
+            scenario.setup()
+        start = time.time()
+        scenario.run()
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+# Run scenarios matching filter, compare them with baseline and report ones slower than threshold in [%]
+def runSuite(repeats=3, threshold=25.0, update=False, only=None, baseline=BASELINE):
+    results = {}
+    previous = {}
+    if os.path.exists(baseline):
+        with open(baseline) as file:
+            previous = json.load(file)
+    directory = tempfile.mkdtemp(prefix="ImpactTest-benchmark-")
+    workingDirectory = os.getcwd()
+    # Kernel writes input files to working directory
+    os.chdir(directory)
+    regressions = []
+    try:
+        scenarios = kernelScenarios() + materialScenarios(directory) + partScenarios(directory)
+        scenarios += inputScenarios(directory)
+        for scenario in scenarios:
+            if only and only not in scenario.name:
+                continue
+            elapsed = measure(scenario, repeats)
+            results[scenario.name] = elapsed
+            reference = previous.get(scenario.name)
+            change = ''
+            if reference:
+                ratio = 100.0 * (elapsed - reference) / reference
+                change = "%+.1f %%" % ratio
+                if ratio > threshold and elapsed - reference > RESOLUTION:
+                    regressions.append(scenario.name)
+                    change += " REGRESSION"
+            print("%-28s %10.4f s %s" % (scenario.name, elapsed, change))
+    finally:
+        os.chdir(workingDirectory)
+        shutil.rmtree(directory, ignore_errors=True)
+    if update:
+        previous.update(results)
+        with open(baseline, 'w') as file:
+            json.dump(previous, file, indent=2, sort_keys=True)
+    return results, regressions
+
+
+# Run as 'python benchmarks/benchmark.py' to compare with baseline, '--update' to store current times as baseline
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark model generation against stand-in abaqus modules")
+    parser.add_argument('-r', '--repeats', type=int, default=3, help="repeats of each scenario, the best is taken")
+    parser.add_argument('-t', '--threshold', type=float, default=25.0, help="allowed slowdown in %%")
+    parser.add_argument('-k', '--only', default=None, help="run only scenarios whose names contain given text")
+    parser.add_argument('-u', '--update', action='store_true', help="store results as new baseline")
+    parser.add_argument('-b', '--baseline', default=BASELINE, help="baseline file")
+    args = parser.parse_args()
+    results, regressions = runSuite(args.repeats, args.threshold, args.update, args.only, args.baseline)
+    for name in regressions:
+        print("Regressed: " + name)
+    sys.exit(1 if regressions and not args.update else 0)
@@ -0,0 +1,2 @@
+# Stand-in for Abaqus/CAE's abaqus module
+from abaqusFake import mdb, session, Mdb
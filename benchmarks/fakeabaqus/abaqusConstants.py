@@ -0,0 +1,115 @@
+# Stand-in for Abaqus/CAE's symbolic constants - each constant is a string of its own name
+class SymbolicConstant(str):
+    pass
+
+
+ABS = SymbolicConstant('ABS')
+ADVANCING_FRONT = SymbolicConstant('ADVANCING_FRONT')
+ALL = SymbolicConstant('ALL')
+ANALYSIS = SymbolicConstant('ANALYSIS')
+AUXILIARY = SymbolicConstant('AUXILIARY')
+AVERAGE_STRAIN = SymbolicConstant('AVERAGE_STRAIN')
+AXISYMMETRIC = SymbolicConstant('AXISYMMETRIC')
+BOTTOM = SymbolicConstant('BOTTOM')
+C3D4T = SymbolicConstant('C3D4T')
+C3D8RT = SymbolicConstant('C3D8RT')
+CARTESIAN = SymbolicConstant('CARTESIAN')
+CAX3T = SymbolicConstant('CAX3T')
+CAX4RT = SymbolicConstant('CAX4RT')
+CENTER = SymbolicConstant('CENTER')
+COARSER = SymbolicConstant('COARSER')
+COMPUTED = SymbolicConstant('COMPUTED')
+CONSTANT_THROUGH_THICKNESS = SymbolicConstant('CONSTANT_THROUGH_THICKNESS')
+COPLANAR_EDGES = SymbolicConstant('COPLANAR_EDGES')
+CSTRESS = SymbolicConstant('CSTRESS')
+DEFAULT = SymbolicConstant('DEFAULT')
+DEFORMABLE_BODY = SymbolicConstant('DEFORMABLE_BODY')
+DOMAIN = SymbolicConstant('DOMAIN')
+DOUBLE = SymbolicConstant('DOUBLE')
+ELEMENT = SymbolicConstant('ELEMENT')
+ENHANCED = SymbolicConstant('ENHANCED')
+ENTRIES = SymbolicConstant('ENTRIES')
+ER = SymbolicConstant('ER')
+ERV = SymbolicConstant('ERV')
+EVERY_TIME_INCREMENT = SymbolicConstant('EVERY_TIME_INCREMENT')
+EVF = SymbolicConstant('EVF')
+EXPLICIT = SymbolicConstant('EXPLICIT')
+FINER = SymbolicConstant('FINER')
+FIRST = SymbolicConstant('FIRST')
+FIXME = SymbolicConstant('FIXME')
+FRACTION = SymbolicConstant('FRACTION')
+FREE = SymbolicConstant('FREE')
+GLOBAL = SymbolicConstant('GLOBAL')
+GUI = SymbolicConstant('GUI')
+HFL = SymbolicConstant('HFL')
+HOMOGENEOUS = SymbolicConstant('HOMOGENEOUS')
+ID = SymbolicConstant('ID')
+INDEX = SymbolicConstant('INDEX')
+INTERACTIONS = SymbolicConstant('INTERACTIONS')
+ISOTROPIC = SymbolicConstant('ISOTROPIC')
+JSON = SymbolicConstant('JSON')
+L001I = SymbolicConstant('L001I')
+LE = SymbolicConstant('LE')
+LEFT = SymbolicConstant('LEFT')
+LOAD = SymbolicConstant('LOAD')
+MAGNITUDE = SymbolicConstant('MAGNITUDE')
+MAX = SymbolicConstant('MAX')
+MEDIAL_AXIS = SymbolicConstant('MEDIAL_AXIS')
+MIN = SymbolicConstant('MIN')
+NONE = SymbolicConstant('NONE')
+NT = SymbolicConstant('NT')
+NW = SymbolicConstant('NW')
+ODB = SymbolicConstant('ODB')
+OFF = SymbolicConstant('OFF')
+ON = SymbolicConstant('ON')
+PE = SymbolicConstant('PE')
+PEEQ = SymbolicConstant('PEEQ')
+PEEQVAVG = SymbolicConstant('PEEQVAVG')
+PENALTY = SymbolicConstant('PENALTY')
+PERCENTAGE = SymbolicConstant('PERCENTAGE')
+PEVAVG = SymbolicConstant('PEVAVG')
+PRESELECT = SymbolicConstant('PRESELECT')
+PROCEED = SymbolicConstant('PROCEED')
+QUAD = SymbolicConstant('QUAD')
+QUAD_DOMINATED = SymbolicConstant('QUAD_DOMINATED')
+README = SymbolicConstant('README')
+RF = SymbolicConstant('RF')
+RFL = SymbolicConstant('RFL')
+RIGHT = SymbolicConstant('RIGHT')
+S1 = SymbolicConstant('S1')
+S2 = SymbolicConstant('S2')
+S3 = SymbolicConstant('S3')
+S4 = SymbolicConstant('S4')
+SAVE = SymbolicConstant('SAVE')
+SDEG = SymbolicConstant('SDEG')
+SE = SymbolicConstant('SE')
+SELF = SymbolicConstant('SELF')
+SETS = SymbolicConstant('SETS')
+SIDE1 = SymbolicConstant('SIDE1')
+SIDE2 = SymbolicConstant('SIDE2')
+SINGLE = SymbolicConstant('SINGLE')
+STATUS = SymbolicConstant('STATUS')
+STRUCTURED = SymbolicConstant('STRUCTURED')
+SURFACE = SymbolicConstant('SURFACE')
+SURFACE_TO_SURFACE = SymbolicConstant('SURFACE_TO_SURFACE')
+SVAVG = SymbolicConstant('SVAVG')
+SW = SymbolicConstant('SW')
+SWEEP = SymbolicConstant('SWEEP')
+TABULAR = SymbolicConstant('TABULAR')
+TET = SymbolicConstant('TET')
+THREE_D = SymbolicConstant('THREE_D')
+TIME_INTERVAL = SymbolicConstant('TIME_INTERVAL')
+TODO = SymbolicConstant('TODO')
+TOP = SymbolicConstant('TOP')
+TWO_D_PLANAR = SymbolicConstant('TWO_D_PLANAR')
+UNIFORM = SymbolicConstant('UNIFORM')
+UNSET = SymbolicConstant('UNSET')
+WHOLE_SURFACE = SymbolicConstant('WHOLE_SURFACE')
+XAXIS = SymbolicConstant('XAXIS')
+XOR = SymbolicConstant('XOR')
+XSYMM = SymbolicConstant('XSYMM')
+XYPLANE = SymbolicConstant('XYPLANE')
+XZPLANE = SymbolicConstant('XZPLANE')
+YAXIS = SymbolicConstant('YAXIS')
+YZPLANE = SymbolicConstant('YZPLANE')
+ZAXIS = SymbolicConstant('ZAXIS')
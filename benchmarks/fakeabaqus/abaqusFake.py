@@ -0,0 +1,557 @@
+# Recording stand-in for Abaqus/CAE scripting interface - just enough of mdb, parts, assemblies, meshes and jobs to
+# run plugin's model generation outside Abaqus/CAE. Calls are counted in calls dictionary, jobs write synthetic input
+# files resembling ones written by Abaqus/CAE
+import os
+import re
+
+
+# Log of calls made against fake Abaqus objects - keyed by method name
+calls = {}
+
+
+def record(name):
+    calls[name] = calls.get(name, 0) + 1
+
+
+def resetCalls():
+    calls.clear()
+
+
+# Generic stand-in for any Abaqus object the fake does not model explicitly
+class Recorder(object):
+    def __init__(self, name="Recorder", **kwargs):
+        self.__dict__['_name'] = name
+        self.__dict__['_values'] = dict(kwargs)
+
+    def __getattr__(self, item):
+        if item.startswith('__'):
+            raise AttributeError(item)
+        values = self.__dict__['_values']
+        if item in values:
+            return values[item]
+        child = Recorder(self.__dict__['_name'] + "." + item)
+        self.__dict__[item] = child
+        return child
+
+    def __setattr__(self, key, value):
+        self.__dict__['_values'][key] = value
+
+    def __call__(self, *args, **kwargs):
+        record(self.__dict__['_name'])
+        return Recorder(self.__dict__['_name'] + "()", **kwargs)
+
+    def __getitem__(self, item):
+        return Recorder(self.__dict__['_name'] + "[]")
+
+    def __add__(self, other):
+        return self
+
+    def __iter__(self):
+        return iter([])
+
+    def __len__(self):
+        return 1
+
+    def setValues(self, *args, **kwargs):
+        record(self.__dict__['_name'] + ".setValues")
+        self.__dict__['_values'].update(kwargs)
+
+
+# Dictionary-like Abaqus repository
+class Repository(dict):
+    def keys(self):
+        return list(dict.keys(self))
+
+    def values(self):
+        return list(dict.values(self))
+
+    def items(self):
+        return list(dict.items(self))
+
+
+# Datum repository - Abaqus numbers datums by feature ids, which the fake only approximates
+class Datums(Repository):
+    def __missing__(self, key):
+        return Recorder("Datum")
+
+
+class Entity(object):
+    def __init__(self, index, point=(0.0, 0.0, 0.0)):
+        self.index = index
+        self.pointOn = (point,)
+
+    def getVertices(self):
+        return ()
+
+    def getCells(self):
+        return (0,)
+
+
+# Sequence of geometric entities (cells, faces, edges, vertices)
+class GeomArray(object):
+    def __init__(self, count, low=(-0.01, -0.01, -0.01), high=(0.01, 0.01, 0.01)):
+        self.count = count
+        self.low = low
+        self.high = high
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return iter([Entity(i) for i in range(self.count)])
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return GeomArray(len(range(*item.indices(self.count))), self.low, self.high)
+        return Entity(item)
+
+    def __add__(self, other):
+        return GeomArray(self.count + len(other), self.low, self.high)
+
+    def getSequenceFromMask(self, mask):
+        record("getSequenceFromMask")
+        bits = int(re.search(r'#([0-9a-fA-F]+)', mask[0]).group(1), 16)
+        return GeomArray(max(1, bin(bits).count('1')), self.low, self.high)
+
+    def findAt(self, *points, **kwargs):
+        record("findAt")
+        return GeomArray(len(points), self.low, self.high)
+
+    def getByBoundingBox(self, **kwargs):
+        record("getByBoundingBox")
+        return GeomArray(1, self.low, self.high)
+
+    def getBoundingBox(self):
+        return {'low': self.low, 'high': self.high}
+
+
+class MeshElement(object):
+    def __init__(self, label, connectivity, coordinates):
+        self.label = label
+        self.connectivity = connectivity
+        self.type = "C3D8RT"
+        self._coordinates = coordinates
+
+    def getNodes(self):
+        return [MeshNode(i + 1, self._coordinates[i]) for i in self.connectivity]
+
+
+class MeshNode(object):
+    def __init__(self, label, coordinates):
+        self.label = label
+        self.coordinates = coordinates
+
+
+# Mesh of unit cube scaled to element size - enough to exercise loops over elements and nodes
+class MeshArray(object):
+    def __init__(self, count, size=0.001):
+        self.count = count
+        self.size = size
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        s = self.size
+        coordinates = [(0.0, 0.0, 0.0), (s, 0.0, 0.0), (s, s, 0.0), (0.0, s, 0.0),
+                       (0.0, 0.0, s), (s, 0.0, s), (s, s, s), (0.0, s, s)]
+        for i in range(self.count):
+            yield MeshElement(i + 1, tuple(range(8)), coordinates)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return MeshArray(len(range(*item.indices(self.count))), self.size)
+        return list(iter(MeshArray(1, self.size)))[0]
+
+    def __add__(self, other):
+        return MeshArray(self.count + len(other), self.size)
+
+    def getBoundingBox(self):
+        return {'low': (-0.005, -0.005, -0.02), 'high': (0.005, 0.005, 0.02)}
+
+    def getByBoundingBox(self, **kwargs):
+        record("getByBoundingBox")
+        return self[0:max(1, self.count // 10)]
+
+
+class MeshNodeArray(MeshArray):
+    def __iter__(self):
+        for i in range(self.count):
+            yield MeshNode(i + 1, (0.0, 0.0, self.size * i))
+
+
+class Feature(object):
+    def __init__(self, id):
+        self.id = id
+
+
+class FakePart(object):
+    def __init__(self, model, name, extent=1.0e-6, orphan=False):
+        self.model = model
+        self.name = name
+        self.extent = extent
+        self.cells = GeomArray(0 if orphan else 1)
+        self.faces = GeomArray(6)
+        self.edges = GeomArray(12)
+        self.vertices = GeomArray(8)
+        self.datums = Datums()
+        self.features = Repository()
+        self.sets = Repository()
+        self.surfaces = Repository()
+        self.seedSize = None
+        self.elements = MeshArray(1000 if orphan else 0)
+        self.nodes = MeshNodeArray(1000 if orphan else 0)
+        self._featureId = 0
+
+    def __feature(self):
+        self._featureId += 1
+        feature = Feature(self._featureId)
+        self.datums[self._featureId] = Recorder("Datum")
+        return feature
+
+    def __getattr__(self, item):
+        if item.startswith('__'):
+            raise AttributeError(item)
+        record("Part." + item)
+        return Recorder("Part." + item)
+
+    def DatumCsysByDefault(self, *args, **kwargs):
+        return self.__feature()
+
+    def ReferencePoint(self, *args, **kwargs):
+        return self.__feature()
+
+    def InterestingPoint(self, *args, **kwargs):
+        return Recorder("InterestingPoint")
+
+    def DatumPlaneByPrincipalPlane(self, *args, **kwargs):
+        return self.__feature()
+
+    def DatumAxisByPrincipalAxis(self, *args, **kwargs):
+        return self.__feature()
+
+    def BaseShell(self, *args, **kwargs):
+        record("Part.BaseShell")
+        self.__feature()
+
+    def SolidSweep(self, *args, **kwargs):
+        record("Part.SolidSweep")
+        self.__feature()
+
+    def PartitionCellByDatumPlane(self, *args, **kwargs):
+        record("Part.PartitionCellByDatumPlane")
+        self.cells = GeomArray(len(self.cells) * 2)
+        self.__feature()
+
+    def RemoveCells(self, cellList):
+        record("Part.RemoveCells")
+        self.cells = GeomArray(max(1, len(self.cells) - len(cellList)))
+
+    def seedPart(self, size, **kwargs):
+        record("Part.seedPart")
+        self.seedSize = size
+
+    def generateMesh(self, *args, **kwargs):
+        record("Part.generateMesh")
+        size = self.seedSize or 0.001
+        count = max(1, int(self.extent / size ** 3))
+        self.elements = MeshArray(count, size)
+        self.nodes = MeshNodeArray(max(8, count), size)
+
+    def deleteMesh(self, *args, **kwargs):
+        record("Part.deleteMesh")
+        self.elements = MeshArray(0)
+        self.nodes = MeshArray(0)
+
+    def Set(self, name, **kwargs):
+        self.sets[name] = Recorder("Set", **kwargs)
+        return self.sets[name]
+
+    def PartFromMesh(self, name, **kwargs):
+        record("Part.PartFromMesh")
+        part = FakePart(self.model, name, orphan=True)
+        part.elements = self.elements
+        part.nodes = self.nodes
+        self.model.parts[name] = part
+        return part
+
+
+class FakeInstance(object):
+    def __init__(self, name, part):
+        self.name = name
+        self.part = part
+        self.partName = part.name
+        self.cells = part.cells
+        self.faces = part.faces
+        self.edges = part.edges
+        self.vertices = part.vertices
+        self.sets = part.sets
+
+    @property
+    def elements(self):
+        return self.part.elements
+
+    @property
+    def nodes(self):
+        return self.part.nodes
+
+
+class FakeAssembly(object):
+    def __init__(self, model):
+        self.model = model
+        self.instances = Repository()
+        self.sets = Repository()
+        self.surfaces = Repository()
+
+    def __getattr__(self, item):
+        if item.startswith('__'):
+            raise AttributeError(item)
+        return Recorder("Assembly." + item)
+
+    def Instance(self, name, part, dependent=None):
+        record("Assembly.Instance")
+        self.instances[name] = FakeInstance(name, part)
+        return self.instances[name]
+
+    def Set(self, name, **kwargs):
+        record("Assembly.Set")
+        self.sets[name] = Recorder("Set", **kwargs)
+        return self.sets[name]
+
+    def Surface(self, name, **kwargs):
+        record("Assembly.Surface")
+        self.surfaces[name] = Recorder("Surface", **kwargs)
+        return self.surfaces[name]
+
+    def SurfaceFromElsets(self, name, **kwargs):
+        record("Assembly.SurfaceFromElsets")
+        self.surfaces[name] = Recorder("Surface", **kwargs)
+        return self.surfaces[name]
+
+
+class Table(object):
+    def __init__(self, table):
+        self.table = table
+
+
+class FakeMaterial(object):
+    def __init__(self, name, data=None):
+        self.name = name
+        self.data = data
+        self.density = Table(((7850.0,),))
+        self.elastic = Table(((2.0e11, 0.3),))
+
+
+class FakeModel(object):
+    def __init__(self, name):
+        self.name = name
+        self.parts = Repository()
+        self.materials = Repository()
+        self.sketches = Repository()
+        self.sections = Repository()
+        self.interactionProperties = Repository()
+        self.interactions = Repository()
+        self.constraints = Repository()
+        self.boundaryConditions = Repository()
+        self.predefinedFields = Repository()
+        self.steps = Repository()
+        self.historyOutputRequests = Repository()
+        self.fieldOutputRequests = Repository()
+        self.filters = Repository()
+        self.rootAssembly = FakeAssembly(self)
+
+    def __getattr__(self, item):
+        if item.startswith('__'):
+            raise AttributeError(item)
+        record("Model." + item)
+        return Recorder("Model." + item)
+
+    def setValues(self, **kwargs):
+        record("Model.setValues")
+
+    def copyFrom(self, other):
+        for name, part in other.parts.items():
+            copy = FakePart(self, name, part.extent)
+            copy.__dict__.update(dict((k, v) for k, v in part.__dict__.items() if k != 'model'))
+            self.parts[name] = copy
+        for name, material in other.materials.items():
+            self.materials[name] = FakeMaterial(name, material.data)
+        for repo in ('sketches', 'sections', 'interactionProperties', 'interactions', 'constraints',
+                     'boundaryConditions', 'predefinedFields', 'steps', 'historyOutputRequests',
+                     'fieldOutputRequests', 'filters'):
+            getattr(self, repo).update(getattr(other, repo))
+        for name, instance in other.rootAssembly.instances.items():
+            self.rootAssembly.instances[name] = FakeInstance(name, self.parts[instance.partName])
+        self.rootAssembly.sets.update(other.rootAssembly.sets)
+        self.rootAssembly.surfaces.update(other.rootAssembly.surfaces)
+
+    def Part(self, name, dimensionality=None, type=None, objectToCopy=None, **kwargs):
+        record("Model.Part")
+        extent = objectToCopy.extent if objectToCopy is not None else 1.0e-6
+        self.parts[name] = FakePart(self, name, extent)
+        return self.parts[name]
+
+    def PartFromGeometryFile(self, name, geometryFile, *args, **kwargs):
+        record("Model.PartFromGeometryFile")
+        self.parts[name] = FakePart(self, name, 2.0e-7)
+        return self.parts[name]
+
+    def PartFromInputFile(self, inputFileName):
+        record("Model.PartFromInputFile")
+        with open(inputFileName) as f:
+            for line in f:
+                if line.lower().startswith('*part'):
+                    name = line.split('=')[1].strip()
+                    self.parts[name] = FakePart(self, name, orphan=True)
+
+    def ConstrainedSketch(self, name, sheetSize, **kwargs):
+        record("Model.ConstrainedSketch")
+        sketch = Recorder("Sketch")
+        self.sketches[name] = sketch
+        return sketch
+
+    def HomogeneousSolidSection(self, name, material, **kwargs):
+        self.sections[name] = Recorder("Section", material=material)
+        return self.sections[name]
+
+    def ContactProperty(self, name):
+        self.interactionProperties[name] = Recorder("ContactProperty")
+        return self.interactionProperties[name]
+
+    def ContactExp(self, name, createStepName):
+        self.interactions[name] = Recorder("ContactExp")
+        return self.interactions[name]
+
+    def Tie(self, name, **kwargs):
+        self.constraints[name] = Recorder("Tie", **kwargs)
+
+    def EncastreBC(self, name, **kwargs):
+        self.boundaryConditions[name] = Recorder("EncastreBC", **kwargs)
+
+    def XsymmBC(self, name, **kwargs):
+        self.boundaryConditions[name] = Recorder("XsymmBC", **kwargs)
+
+    def Velocity(self, name, **kwargs):
+        self.predefinedFields[name] = Recorder("Velocity", **kwargs)
+
+    def Temperature(self, name, **kwargs):
+        self.predefinedFields[name] = Recorder("Temperature", **kwargs)
+
+    def TempDisplacementDynamicsStep(self, name, previous, **kwargs):
+        record("Model.TempDisplacementDynamicsStep")
+        self.steps[name] = Recorder("Step", **kwargs)
+        if 'H-Output-1' not in self.historyOutputRequests:
+            self.historyOutputRequests['H-Output-1'] = Recorder("HistoryOutput")
+        if 'F-Output-1' not in self.fieldOutputRequests:
+            self.fieldOutputRequests['F-Output-1'] = Recorder("FieldOutput")
+
+    def HistoryOutputRequest(self, name, **kwargs):
+        self.historyOutputRequests[name] = Recorder("HistoryOutput", **kwargs)
+
+    def FieldOutputRequest(self, name, **kwargs):
+        self.fieldOutputRequests[name] = Recorder("FieldOutput", **kwargs)
+
+    def ButterworthFilter(self, name, **kwargs):
+        self.filters[name] = Recorder("Filter", **kwargs)
+
+
+class FakeJob(object):
+    def __init__(self, name, model, **kwargs):
+        self.name = name
+        self.model = model
+        self.options = kwargs
+
+    def writeInput(self, consistencyChecking=None):
+        record("Job.writeInput")
+        writeSyntheticInput(mdb.models[self.model], self.name + ".inp")
+
+
+# Write input file resembling the one written by Abaqus/CAE for given fake model
+def writeSyntheticInput(model, filename):
+    with open(filename, 'w') as f:
+        f.write("*Heading\n** Job name: %s Model name: %s\n" % (model.name, model.name))
+        f.write("**\n** PARTS\n**\n")
+        for name, part in sorted(model.parts.items()):
+            f.write("*Part, name=%s\n*Node\n" % name)
+            count = len(part.elements)
+            for i in range(1, count + 1):
+                f.write("%7d, %13.9f, %13.9f, %13.9f\n" % (i, i * 1e-4, 0.0, 0.0))
+            f.write("*Element, type=C3D8RT\n")
+            for i in range(1, count + 1):
+                f.write("%d, %d, %d, %d, %d, %d, %d, %d, %d\n" % ((i,) + (i,) * 8))
+            f.write("*End Part\n**\n")
+        f.write("**\n** ASSEMBLY\n**\n*Assembly, name=Assembly\n**\n")
+        for name, instance in sorted(model.rootAssembly.instances.items()):
+            f.write("*Instance, name=%s, part=%s\n*End Instance\n**\n" % (name, instance.partName))
+        for name in sorted(model.rootAssembly.sets.keys()):
+            f.write("*Nset, nset=%s\n 1,\n*Elset, elset=%s\n 1,\n" % (name, name))
+        for name in sorted(model.rootAssembly.surfaces.keys()):
+            f.write("*Surface, type=ELEMENT, name=%s\n_%s_S1, S1\n" % (name, name))
+        f.write("*End Assembly\n**\n** MATERIALS\n**\n")
+        for name in sorted(model.materials.keys()):
+            f.write("*Material, name=%s\n*Density\n 7850.,\n" % name)
+        f.write("**\n** INTERACTION PROPERTIES\n**\n*Surface Interaction, name=InteractionProperties\n")
+        f.write("**\n** BOUNDARY CONDITIONS\n**\n*Boundary\nTarget-sides, ENCASTRE\n")
+        f.write("**\n** PREDEFINED FIELDS\n**\n*Initial Conditions, type=TEMPERATURE\nEntire-mass, 293.15\n")
+        f.write("**\n** INTERACTIONS\n**\n** Interaction: Contact\n*Contact, op=NEW\n")
+        f.write("*Contact Inclusions\nExterior , \n*Contact Property Assignment\n ,  , InteractionProperties\n")
+        f.write("** ----------------------------------------------------------------\n**\n")
+        f.write("** STEP: Impact\n**\n*Step, name=Impact, nlgeom=YES\n*Dynamic Temperature-displacement, Explicit\n")
+        f.write(", 0.0001\n*End Step\n")
+
+
+class FakeMdb(object):
+    def __init__(self):
+        self.models = Repository()
+        self.jobs = Repository()
+        self.models['Model-1'] = FakeModel('Model-1')
+        self.auxModels = None
+
+    def Model(self, name, objectToCopy=None, **kwargs):
+        record("Mdb.Model")
+        self.models[name] = FakeModel(name)
+        if objectToCopy is not None:
+            self.models[name].copyFrom(objectToCopy)
+        return self.models[name]
+
+    def Job(self, name, model, **kwargs):
+        record("Mdb.Job")
+        self.jobs[name] = FakeJob(name, model, **kwargs)
+        return self.jobs[name]
+
+    def openAcis(self, fileName, **kwargs):
+        record("Mdb.openAcis")
+        return Recorder("AcisFile")
+
+    def saveAs(self, pathName):
+        record("Mdb.saveAs")
+        with open(pathName, 'w') as f:
+            f.write("fake cae\n")
+
+    def openAuxMdb(self, pathName):
+        record("Mdb.openAuxMdb")
+        self.auxModels = pathName
+
+    def copyAuxMdbModel(self, fromName, toName):
+        record("Mdb.copyAuxMdbModel")
+        self.models[toName] = FakeModel(toName)
+
+    def closeAuxMdb(self):
+        self.auxModels = None
+
+
+mdb = FakeMdb()
+session = Recorder("session")
+
+
+def Mdb():
+    global mdb
+    fresh = FakeMdb()
+    mdb.__dict__.clear()
+    mdb.__dict__.update(fresh.__dict__)
+    return mdb
+
+
+def createMaterialFromDataString(modelName, name, version, data):
+    record("createMaterialFromDataString")
+    mdb.models[modelName].materials[name] = FakeMaterial(name, data)
@@ -0,0 +1,2 @@
+# Stand-in for Abaqus/CAE's material module
+from abaqusFake import createMaterialFromDataString
@@ -0,0 +1,4 @@
+# Stand-in for Abaqus/CAE's mesh module
+from abaqusFake import Recorder
+
+ElemType = Recorder("ElemType")
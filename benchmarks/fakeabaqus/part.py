@@ -0,0 +1 @@
+# Stand-in for Abaqus/CAE's part module
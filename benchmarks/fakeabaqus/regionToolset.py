@@ -0,0 +1,4 @@
+# Stand-in for Abaqus/CAE's regionToolset module
+from abaqusFake import Recorder
+
+Region = Recorder("Region")